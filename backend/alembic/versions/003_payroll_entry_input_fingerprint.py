@@ -0,0 +1,31 @@
+"""Add input fingerprint to payroll entries
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16
+
+Changes:
+- payroll_entries: add input_fingerprint, a hash of the attendance, salary
+  structure, working-day and employee master inputs the entry was
+  calculated from, used to recalculate only employees whose inputs changed
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing entries have no fingerprint and are recalculated on the next run
+    op.add_column('payroll_entries', sa.Column('input_fingerprint', sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('payroll_entries', 'input_fingerprint')
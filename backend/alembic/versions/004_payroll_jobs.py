@@ -0,0 +1,67 @@
+"""Add payroll jobs for background calculation
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16
+
+Changes:
+- payroll_jobs: new table tracking background payroll calculations with
+  status, phase, employees processed/total, timing and error
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ENUM as PgENUM
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def create_enum_if_not_exists(name: str, *values: str) -> None:
+    """Create a PostgreSQL enum type only if it doesn't already exist."""
+    op.execute(f"""
+        DO $$ BEGIN
+            CREATE TYPE {name} AS ENUM ({', '.join(f"'{v}'" for v in values)});
+        EXCEPTION WHEN duplicate_object THEN null;
+        END $$;
+    """)
+
+
+def upgrade() -> None:
+    create_enum_if_not_exists('payrolljobstatus', 'PENDING', 'RUNNING', 'COMPLETED', 'FAILED')
+    payrolljobstatus = PgENUM('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='payrolljobstatus', create_type=False)
+
+    op.create_table(
+        'payroll_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('college_id', sa.Integer(), sa.ForeignKey('colleges.id'), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False),
+        sa.Column('payroll_cycle_id', sa.Integer(), sa.ForeignKey('payroll_cycles.id'), nullable=True),
+        sa.Column('status', payrolljobstatus, nullable=False, server_default='PENDING'),
+        sa.Column('phase', sa.String(50), nullable=False, server_default='QUEUED'),
+        sa.Column('employees_processed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('employees_total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error_message', sa.String(1000), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_payroll_jobs_id', 'payroll_jobs', ['id'])
+    op.create_index('ix_payroll_jobs_college_id', 'payroll_jobs', ['college_id'])
+    op.create_index('ix_payroll_jobs_payroll_cycle_id', 'payroll_jobs', ['payroll_cycle_id'])
+    op.create_index('ix_payroll_jobs_status', 'payroll_jobs', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_payroll_jobs_status', table_name='payroll_jobs')
+    op.drop_index('ix_payroll_jobs_payroll_cycle_id', table_name='payroll_jobs')
+    op.drop_index('ix_payroll_jobs_college_id', table_name='payroll_jobs')
+    op.drop_index('ix_payroll_jobs_id', table_name='payroll_jobs')
+    op.drop_table('payroll_jobs')
+    op.execute('DROP TYPE IF EXISTS payrolljobstatus')
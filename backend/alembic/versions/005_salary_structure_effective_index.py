@@ -0,0 +1,33 @@
+"""Add effective-date index to employee salary structures
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16
+
+Changes:
+- employee_salary_structures: add a composite (employee_id, effective_from,
+  effective_to) index supporting the "structures effective during a
+  period" lookup used by payroll and arrears calculation
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_employee_salary_structures_effective',
+        'employee_salary_structures',
+        ['employee_id', 'effective_from', 'effective_to']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_employee_salary_structures_effective', table_name='employee_salary_structures')
@@ -0,0 +1,118 @@
+"""Add the leave ledger
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16
+
+Changes:
+- leave_ledger_entries: new append-only table with one row per leave
+  credit or debit, tagged with employee, payroll cycle and leave year
+- Backfills the ledger from existing payroll entries (paid and comp leave
+  used) and weekend-work attendance (comp leave earned)
+- Rebuilds the used/earned counters of employee_leave_balances from the
+  ledger, discarding leave counted twice by earlier recalculations
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ENUM as PgENUM
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def create_enum_if_not_exists(name: str, *values: str) -> None:
+    """Create a PostgreSQL enum type only if it doesn't already exist."""
+    op.execute(f"""
+        DO $$ BEGIN
+            CREATE TYPE {name} AS ENUM ({', '.join(f"'{v}'" for v in values)});
+        EXCEPTION WHEN duplicate_object THEN null;
+        END $$;
+    """)
+
+
+def upgrade() -> None:
+    create_enum_if_not_exists('leavetransactiontype', 'PAID_LEAVE_USED', 'COMP_LEAVE_EARNED', 'COMP_LEAVE_USED')
+    leavetransactiontype = PgENUM(
+        'PAID_LEAVE_USED', 'COMP_LEAVE_EARNED', 'COMP_LEAVE_USED',
+        name='leavetransactiontype', create_type=False
+    )
+
+    op.create_table(
+        'leave_ledger_entries',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('employee_id', sa.Integer(), sa.ForeignKey('employees.id'), nullable=False),
+        sa.Column('payroll_cycle_id', sa.Integer(), sa.ForeignKey('payroll_cycles.id'), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('transaction_type', leavetransactiontype, nullable=False),
+        sa.Column('days', sa.Numeric(5, 2), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index('ix_leave_ledger_entries_id', 'leave_ledger_entries', ['id'])
+    op.create_index('ix_leave_ledger_entries_employee_id', 'leave_ledger_entries', ['employee_id'])
+    op.create_index('ix_leave_ledger_entries_payroll_cycle_id', 'leave_ledger_entries', ['payroll_cycle_id'])
+    op.create_index('ix_leave_ledger_entries_employee_year', 'leave_ledger_entries', ['employee_id', 'year'])
+
+    # Backfill from the entries already calculated
+    for column, transaction_type in (
+        ('paid_leaves_used', 'PAID_LEAVE_USED'),
+        ('comp_leaves_used', 'COMP_LEAVE_USED'),
+    ):
+        op.execute(f"""
+            INSERT INTO leave_ledger_entries (employee_id, payroll_cycle_id, year, transaction_type, days)
+            SELECT pe.employee_id, pc.id, pc.year, '{transaction_type}'::leavetransactiontype, pe.{column}
+            FROM payroll_entries pe
+            JOIN payroll_cycles pc ON pc.id = pe.payroll_cycle_id
+            WHERE pe.{column} > 0
+        """)
+
+    op.execute("""
+        INSERT INTO leave_ledger_entries (employee_id, payroll_cycle_id, year, transaction_type, days)
+        SELECT pe.employee_id, pc.id, pc.year, 'COMP_LEAVE_EARNED'::leavetransactiontype, COUNT(ar.id)
+        FROM payroll_entries pe
+        JOIN payroll_cycles pc ON pc.id = pe.payroll_cycle_id
+        JOIN attendance_records ar ON ar.employee_id = pe.employee_id
+            AND ar.status = 'WEEKEND_WORK'
+            AND EXTRACT(YEAR FROM ar.date) = pc.year
+            AND EXTRACT(MONTH FROM ar.date) = pc.month
+        GROUP BY pe.employee_id, pc.id, pc.year
+    """)
+
+    # Materialized balances become the sum of their ledger rows
+    op.execute("""
+        UPDATE employee_leave_balances b SET
+            paid_leaves_used = COALESCE((
+                SELECT SUM(l.days) FROM leave_ledger_entries l
+                WHERE l.employee_id = b.employee_id AND l.year = b.year
+                AND l.transaction_type = 'PAID_LEAVE_USED'
+            ), 0),
+            comp_leaves_earned = COALESCE((
+                SELECT SUM(l.days) FROM leave_ledger_entries l
+                WHERE l.employee_id = b.employee_id AND l.year = b.year
+                AND l.transaction_type = 'COMP_LEAVE_EARNED'
+            ), 0),
+            comp_leaves_used = COALESCE((
+                SELECT SUM(l.days) FROM leave_ledger_entries l
+                WHERE l.employee_id = b.employee_id AND l.year = b.year
+                AND l.transaction_type = 'COMP_LEAVE_USED'
+            ), 0)
+        WHERE EXISTS (
+            SELECT 1 FROM payroll_entries pe
+            JOIN payroll_cycles pc ON pc.id = pe.payroll_cycle_id
+            WHERE pe.employee_id = b.employee_id AND pc.year = b.year
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_leave_ledger_entries_employee_year', table_name='leave_ledger_entries')
+    op.drop_index('ix_leave_ledger_entries_payroll_cycle_id', table_name='leave_ledger_entries')
+    op.drop_index('ix_leave_ledger_entries_employee_id', table_name='leave_ledger_entries')
+    op.drop_index('ix_leave_ledger_entries_id', table_name='leave_ledger_entries')
+    op.drop_table('leave_ledger_entries')
+    op.execute('DROP TYPE IF EXISTS leavetransactiontype')
@@ -0,0 +1,29 @@
+"""Add month ranges to payroll jobs
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16
+
+Changes:
+- payroll_jobs: add month_to, the last month of a multi-month calculation
+  (NULL for a single-month job)
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('payroll_jobs', sa.Column('month_to', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('payroll_jobs', 'month_to')
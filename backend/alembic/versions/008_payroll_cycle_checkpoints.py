@@ -0,0 +1,33 @@
+"""Add chunk checkpoints to payroll cycles
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16
+
+Changes:
+- payroll_cycles: add checkpoint_employee_id, the last employee committed by
+  an unfinished chunked calculation, and chunks_completed / chunks_total
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('payroll_cycles', sa.Column('checkpoint_employee_id', sa.Integer(), nullable=True))
+    op.add_column('payroll_cycles', sa.Column('chunks_completed', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('payroll_cycles', sa.Column('chunks_total', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('payroll_cycles', 'chunks_total')
+    op.drop_column('payroll_cycles', 'chunks_completed')
+    op.drop_column('payroll_cycles', 'checkpoint_employee_id')
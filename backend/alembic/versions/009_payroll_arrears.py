@@ -0,0 +1,48 @@
+"""Add payroll arrears
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16
+
+Changes:
+- payroll_arrears: new table with one row per employee and locked cycle
+  made up for by a retroactive salary revision, tagged with the cycle the
+  arrears are paid in
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'payroll_arrears',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('employee_id', sa.Integer(), sa.ForeignKey('employees.id'), nullable=False),
+        sa.Column('payroll_cycle_id', sa.Integer(), sa.ForeignKey('payroll_cycles.id'), nullable=False),
+        sa.Column('arrears_cycle_id', sa.Integer(), sa.ForeignKey('payroll_cycles.id'), nullable=False),
+        sa.Column('amount', sa.Numeric(12, 2), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index('ix_payroll_arrears_id', 'payroll_arrears', ['id'])
+    op.create_index('ix_payroll_arrears_employee_id', 'payroll_arrears', ['employee_id'])
+    op.create_index('ix_payroll_arrears_payroll_cycle_id', 'payroll_arrears', ['payroll_cycle_id'])
+    op.create_index(
+        'ix_payroll_arrears_employee_arrears_cycle', 'payroll_arrears', ['employee_id', 'arrears_cycle_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_payroll_arrears_employee_arrears_cycle', table_name='payroll_arrears')
+    op.drop_index('ix_payroll_arrears_payroll_cycle_id', table_name='payroll_arrears')
+    op.drop_index('ix_payroll_arrears_employee_id', table_name='payroll_arrears')
+    op.drop_index('ix_payroll_arrears_id', table_name='payroll_arrears')
+    op.drop_table('payroll_arrears')
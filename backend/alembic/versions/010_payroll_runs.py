@@ -0,0 +1,66 @@
+"""Add payroll run statistics
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-16
+
+Changes:
+- payroll_runs: new table with one row per payroll calculation run (range,
+  outcome, employees, chunks, SQL statements and wall time)
+- payroll_run_stages: new table with the wall time, SQL statement count and
+  row count of each stage of a run
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'payroll_runs',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('college_id', sa.Integer(), sa.ForeignKey('colleges.id'), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('month_from', sa.Integer(), nullable=False),
+        sa.Column('month_to', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('employees', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('chunks', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('statements', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('seconds', sa.Numeric(10, 3), nullable=False, server_default='0'),
+        sa.Column('error_message', sa.String(1000), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_payroll_runs_id', 'payroll_runs', ['id'])
+    op.create_index('ix_payroll_runs_college_year', 'payroll_runs', ['college_id', 'year'])
+
+    op.create_table(
+        'payroll_run_stages',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('payroll_run_id', sa.Integer(), sa.ForeignKey('payroll_runs.id'), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('stage', sa.String(50), nullable=False),
+        sa.Column('seconds', sa.Numeric(10, 3), nullable=False, server_default='0'),
+        sa.Column('statements', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rows', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.create_index('ix_payroll_run_stages_id', 'payroll_run_stages', ['id'])
+    op.create_index('ix_payroll_run_stages_payroll_run_id', 'payroll_run_stages', ['payroll_run_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_payroll_run_stages_payroll_run_id', table_name='payroll_run_stages')
+    op.drop_index('ix_payroll_run_stages_id', table_name='payroll_run_stages')
+    op.drop_table('payroll_run_stages')
+    op.drop_index('ix_payroll_runs_college_year', table_name='payroll_runs')
+    op.drop_index('ix_payroll_runs_id', table_name='payroll_runs')
+    op.drop_table('payroll_runs')
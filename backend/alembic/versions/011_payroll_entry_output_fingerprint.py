@@ -0,0 +1,38 @@
+"""Add output fingerprint to payroll entries
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-16
+
+Changes:
+- payroll_entries: add output_fingerprint, a hash of the figures,
+  components and leave an entry writes, so a recalculation only rewrites
+  entries whose output changed
+- payroll_runs: add entries_new, entries_updated and entries_unchanged
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing entries have no output fingerprint and are rewritten once
+    op.add_column('payroll_entries', sa.Column('output_fingerprint', sa.String(64), nullable=True))
+    op.add_column('payroll_runs', sa.Column('entries_new', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('payroll_runs', sa.Column('entries_updated', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('payroll_runs', sa.Column('entries_unchanged', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('payroll_runs', 'entries_unchanged')
+    op.drop_column('payroll_runs', 'entries_updated')
+    op.drop_column('payroll_runs', 'entries_new')
+    op.drop_column('payroll_entries', 'output_fingerprint')
@@ -0,0 +1,39 @@
+"""Add processing progress to attendance uploads
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-16
+
+Changes:
+- attendance_uploads: add rows_processed, rows_total, started_at and
+  finished_at, so clients polling an upload processed in the background
+  can follow its progress
+- attendance_uploads: index status, which workers scan for PENDING uploads
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('attendance_uploads', sa.Column('rows_processed', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('attendance_uploads', sa.Column('rows_total', sa.Integer(), nullable=True))
+    op.add_column('attendance_uploads', sa.Column('started_at', sa.DateTime(), nullable=True))
+    op.add_column('attendance_uploads', sa.Column('finished_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_attendance_uploads_status', 'attendance_uploads', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attendance_uploads_status', table_name='attendance_uploads')
+    op.drop_column('attendance_uploads', 'finished_at')
+    op.drop_column('attendance_uploads', 'started_at')
+    op.drop_column('attendance_uploads', 'rows_total')
+    op.drop_column('attendance_uploads', 'rows_processed')
@@ -0,0 +1,31 @@
+"""Add size and content hash to attendance uploads
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-16
+
+Changes:
+- attendance_uploads: add file_size and content_hash (hex SHA-256 of the
+  file), computed while the upload is streamed to disk
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '013'
+down_revision: Union[str, None] = '012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('attendance_uploads', sa.Column('file_size', sa.Integer(), nullable=True))
+    op.add_column('attendance_uploads', sa.Column('content_hash', sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('attendance_uploads', 'content_hash')
+    op.drop_column('attendance_uploads', 'file_size')
@@ -24,6 +24,7 @@ class Settings(BaseSettings):
     PAYSLIP_PATH: str = "storage/payslips"
     REPORT_PATH: str = "storage/reports"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # Bytes read from an upload at a time
 
     # Pagination
     DEFAULT_PAGE_SIZE: int = 50
@@ -42,6 +43,16 @@ class Settings(BaseSettings):
     # Salary Calculation
     ANNUAL_MONTHS: int = 12
     WEEKEND_DAYS: list = [5, 6]  # Saturday=5, Sunday=6 (0=Monday)
+    BASIC_COMPONENT_NAME: str = "Basic Salary"  # Component that BASIC percentages are based on
+
+    # Payroll Processing
+    PAYROLL_MAX_WORKERS: int = 4  # Most colleges calculated concurrently in a group run
+    PAYROLL_JOB_WORKERS: int = 4  # Background payroll jobs run concurrently per process
+    PAYROLL_CHUNK_SIZE: int = 500  # Employees calculated and committed per checkpoint
+
+    # Attendance Processing
+    ATTENDANCE_BATCH_SIZE: int = 2000  # Attendance records written per batched statement
+    ATTENDANCE_UPLOAD_WORKERS: int = 4  # Attendance uploads ingested concurrently per process
 
     # Security (for future use)
     SECRET_KEY: str = "aurora-payroll-secret-key-change-in-production"
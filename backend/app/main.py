@@ -13,6 +13,9 @@ from app.routers import (
     payslips,
     reports,
 )
+from app.services.attendance_job_service import resume_pending_uploads
+from app.services.payroll_job_service import fail_interrupted_jobs
+from app.utils.uploads import UploadSizeLimitMiddleware
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -20,6 +23,10 @@ app = FastAPI(
     description="Aurora Group Payroll Management System API"
 )
 
+# Oversized uploads are refused before their body is read (added first so
+# the CORS middleware wraps its 413 responses too)
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -30,6 +37,18 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+def fail_interrupted_payroll_jobs():
+    # Jobs that were queued or running when the last server stopped
+    fail_interrupted_jobs()
+
+
+@app.on_event("startup")
+def resume_attendance_uploads():
+    # Uploads saved but not processed before the last shutdown
+    resume_pending_uploads()
+
+
 # Health check endpoint
 @app.get("/")
 def root():
@@ -7,12 +7,16 @@ from app.models.employees import Employee, StaffType
 from app.models.employee_salary_structures import EmployeeSalaryStructure
 from app.models.leave_policies import LeavePolicy
 from app.models.employee_leave_balances import EmployeeLeaveBalance
+from app.models.leave_ledger_entries import LeaveLedgerEntry, LeaveTransactionType
 from app.models.attendance_uploads import AttendanceUpload, UploadStatus
 from app.models.attendance_records import AttendanceRecord, AttendanceStatus
 from app.models.holidays import Holiday
 from app.models.payroll_cycles import PayrollCycle, PayrollCycleStatus
 from app.models.payroll_entries import PayrollEntry
 from app.models.payroll_entry_components import PayrollEntryComponent
+from app.models.payroll_jobs import PayrollJob, PayrollJobStatus
+from app.models.payroll_arrears import PayrollArrear
+from app.models.payroll_runs import PayrollRun, PayrollRunStage
 from app.models.payslips import Payslip
 from app.models.reports import Report
 
@@ -29,6 +33,8 @@ __all__ = [
     "EmployeeSalaryStructure",
     "LeavePolicy",
     "EmployeeLeaveBalance",
+    "LeaveLedgerEntry",
+    "LeaveTransactionType",
     "AttendanceUpload",
     "UploadStatus",
     "AttendanceRecord",
@@ -38,6 +44,11 @@ __all__ = [
     "PayrollCycleStatus",
     "PayrollEntry",
     "PayrollEntryComponent",
+    "PayrollJob",
+    "PayrollJobStatus",
+    "PayrollArrear",
+    "PayrollRun",
+    "PayrollRunStage",
     "Payslip",
     "Report",
 ]
@@ -21,10 +21,16 @@ class AttendanceUpload(Base):
     month = Column(Integer, nullable=False, index=True)
     file_name = Column(String(255), nullable=False)
     file_path = Column(String(500), nullable=False)
+    file_size = Column(Integer, nullable=True)
+    content_hash = Column(String(64), nullable=True)
     uploaded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    status = Column(SAEnum(UploadStatus), default=UploadStatus.PENDING, nullable=False)
+    status = Column(SAEnum(UploadStatus), default=UploadStatus.PENDING, nullable=False, index=True)
     error_message = Column(String(1000), nullable=True)
     records_count = Column(Integer, default=0, nullable=False)
+    rows_processed = Column(Integer, default=0, nullable=False)
+    rows_total = Column(Integer, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
 
     # Relationships
     college = relationship("College", back_populates="attendance_uploads")
@@ -22,5 +22,7 @@ class College(Base):
     attendance_uploads = relationship("AttendanceUpload", back_populates="college", cascade="all, delete-orphan")
     holidays = relationship("Holiday", back_populates="college", cascade="all, delete-orphan")
     payroll_cycles = relationship("PayrollCycle", back_populates="college", cascade="all, delete-orphan")
+    payroll_jobs = relationship("PayrollJob", back_populates="college", cascade="all, delete-orphan")
+    payroll_runs = relationship("PayrollRun", back_populates="college", cascade="all, delete-orphan")
     designations = relationship("Designation", back_populates="college", cascade="all, delete-orphan")
     reports = relationship("Report", back_populates="college")
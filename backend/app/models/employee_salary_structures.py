@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Numeric, Date, UniqueConstraint
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Numeric, Date, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -9,6 +9,8 @@ class EmployeeSalaryStructure(Base):
     __table_args__ = (
         UniqueConstraint('employee_id', 'salary_component_id', 'effective_from',
                          name='uq_employee_component_effective'),
+        Index('ix_employee_salary_structures_effective',
+              'employee_id', 'effective_from', 'effective_to'),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -50,6 +50,8 @@ class Employee(Base):
     designation = relationship("Designation", back_populates="employees")
     salary_structures = relationship("EmployeeSalaryStructure", back_populates="employee", cascade="all, delete-orphan")
     leave_balances = relationship("EmployeeLeaveBalance", back_populates="employee", cascade="all, delete-orphan")
+    leave_ledger_entries = relationship("LeaveLedgerEntry", back_populates="employee", cascade="all, delete-orphan")
     attendance_records = relationship("AttendanceRecord", back_populates="employee", cascade="all, delete-orphan")
     payroll_entries = relationship("PayrollEntry", back_populates="employee", cascade="all, delete-orphan")
+    payroll_arrears = relationship("PayrollArrear", back_populates="employee", cascade="all, delete-orphan")
     payslips = relationship("Payslip", back_populates="employee", cascade="all, delete-orphan")
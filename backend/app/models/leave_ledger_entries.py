@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Numeric, Index, Enum as SAEnum
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import enum
+from app.database import Base
+
+
+class LeaveTransactionType(enum.Enum):
+    PAID_LEAVE_USED = "PAID_LEAVE_USED"
+    COMP_LEAVE_EARNED = "COMP_LEAVE_EARNED"
+    COMP_LEAVE_USED = "COMP_LEAVE_USED"
+
+
+class LeaveLedgerEntry(Base):
+    __tablename__ = "leave_ledger_entries"
+    __table_args__ = (
+        Index('ix_leave_ledger_entries_employee_year', 'employee_id', 'year'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False, index=True)
+    payroll_cycle_id = Column(Integer, ForeignKey("payroll_cycles.id"), nullable=False, index=True)
+    year = Column(Integer, nullable=False)
+    transaction_type = Column(SAEnum(LeaveTransactionType), nullable=False)
+    days = Column(Numeric(5, 2), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    employee = relationship("Employee", back_populates="leave_ledger_entries")
+    payroll_cycle = relationship("PayrollCycle", back_populates="leave_ledger_entries")
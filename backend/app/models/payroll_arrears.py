@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Numeric, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.database import Base
+
+
+class PayrollArrear(Base):
+    __tablename__ = "payroll_arrears"
+    __table_args__ = (
+        Index('ix_payroll_arrears_employee_arrears_cycle', 'employee_id', 'arrears_cycle_id'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False, index=True)
+    # Cycle the arrears are paid in
+    payroll_cycle_id = Column(Integer, ForeignKey("payroll_cycles.id"), nullable=False, index=True)
+    # Locked cycle the arrears make up for
+    arrears_cycle_id = Column(Integer, ForeignKey("payroll_cycles.id"), nullable=False)
+    amount = Column(Numeric(12, 2), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    employee = relationship("Employee", back_populates="payroll_arrears")
+    payroll_cycle = relationship(
+        "PayrollCycle", back_populates="payroll_arrears", foreign_keys=[payroll_cycle_id]
+    )
@@ -28,7 +28,21 @@ class PayrollCycle(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     locked_at = Column(DateTime, nullable=True)
 
+    # Progress of a chunked calculation; checkpoint_employee_id is the last
+    # employee committed and stays set while the run is unfinished
+    checkpoint_employee_id = Column(Integer, nullable=True)
+    chunks_completed = Column(Integer, default=0, nullable=False)
+    chunks_total = Column(Integer, default=0, nullable=False)
+
     # Relationships
     college = relationship("College", back_populates="payroll_cycles")
     payroll_entries = relationship("PayrollEntry", back_populates="payroll_cycle", cascade="all, delete-orphan")
     payslips = relationship("Payslip", back_populates="payroll_cycle", cascade="all, delete-orphan")
+    payroll_jobs = relationship("PayrollJob", back_populates="payroll_cycle")
+    leave_ledger_entries = relationship("LeaveLedgerEntry", back_populates="payroll_cycle", cascade="all, delete-orphan")
+    payroll_arrears = relationship(
+        "PayrollArrear",
+        back_populates="payroll_cycle",
+        foreign_keys="PayrollArrear.payroll_cycle_id",
+        cascade="all, delete-orphan"
+    )
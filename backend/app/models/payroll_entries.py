@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Numeric, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Numeric, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -26,6 +26,11 @@ class PayrollEntry(Base):
     total_deductions = Column(Numeric(12, 2), nullable=False)
     net_pay = Column(Numeric(12, 2), nullable=False)
 
+    # Hash of the inputs the entry was calculated from (see payroll_service)
+    input_fingerprint = Column(String(64), nullable=True)
+    # Hash of the figures, components and leave the entry writes
+    output_fingerprint = Column(String(64), nullable=True)
+
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
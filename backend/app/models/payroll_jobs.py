@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SAEnum
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import enum
+from app.database import Base
+
+
+class PayrollJobStatus(enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+class PayrollJob(Base):
+    __tablename__ = "payroll_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    college_id = Column(Integer, ForeignKey("colleges.id"), nullable=False, index=True)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    month_to = Column(Integer, nullable=True)  # Last month of a multi-month run
+    payroll_cycle_id = Column(Integer, ForeignKey("payroll_cycles.id"), nullable=True, index=True)
+    status = Column(SAEnum(PayrollJobStatus), default=PayrollJobStatus.PENDING, nullable=False, index=True)
+    phase = Column(String(50), nullable=False, default="QUEUED")
+    employees_processed = Column(Integer, default=0, nullable=False)
+    employees_total = Column(Integer, default=0, nullable=False)
+    error_message = Column(String(1000), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    college = relationship("College", back_populates="payroll_jobs")
+    payroll_cycle = relationship("PayrollCycle", back_populates="payroll_jobs")
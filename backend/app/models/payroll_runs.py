@@ -0,0 +1,51 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Numeric, Index
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+
+class PayrollRun(Base):
+    __tablename__ = "payroll_runs"
+    __table_args__ = (
+        Index('ix_payroll_runs_college_year', 'college_id', 'year'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    college_id = Column(Integer, ForeignKey("colleges.id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    month_from = Column(Integer, nullable=False)
+    month_to = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False)  # COMPLETED or FAILED
+    employees = Column(Integer, default=0, nullable=False)
+    chunks = Column(Integer, default=0, nullable=False)
+    entries_new = Column(Integer, default=0, nullable=False)
+    entries_updated = Column(Integer, default=0, nullable=False)
+    entries_unchanged = Column(Integer, default=0, nullable=False)
+    statements = Column(Integer, default=0, nullable=False)
+    seconds = Column(Numeric(10, 3), default=0, nullable=False)
+    error_message = Column(String(1000), nullable=True)
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=False)
+
+    # Relationships
+    college = relationship("College", back_populates="payroll_runs")
+    stages = relationship(
+        "PayrollRunStage",
+        back_populates="payroll_run",
+        cascade="all, delete-orphan",
+        order_by="PayrollRunStage.position"
+    )
+
+
+class PayrollRunStage(Base):
+    __tablename__ = "payroll_run_stages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    payroll_run_id = Column(Integer, ForeignKey("payroll_runs.id"), nullable=False, index=True)
+    position = Column(Integer, nullable=False)
+    stage = Column(String(50), nullable=False)
+    seconds = Column(Numeric(10, 3), default=0, nullable=False)
+    statements = Column(Integer, default=0, nullable=False)
+    rows = Column(Integer, default=0, nullable=False)
+
+    # Relationships
+    payroll_run = relationship("PayrollRun", back_populates="stages")
@@ -5,7 +5,9 @@ from app.database import get_db
 from app.schemas.attendance import AttendanceUploadResponse, AttendanceRecordResponse, AttendanceSummary
 from app.models.attendance_uploads import AttendanceUpload
 from app.models.attendance_records import AttendanceRecord
-from app.services.attendance_service import process_attendance_upload, get_attendance_summary
+from app.services.attendance_service import get_attendance_summary
+from app.services.attendance_job_service import submit_attendance_upload
+from app.utils.uploads import UploadTooLargeError, receive_upload
 
 router = APIRouter(prefix="/attendance", tags=["attendance"])
 
@@ -45,7 +47,7 @@ def get_attendance_upload(upload_id: int, db: Session = Depends(get_db)):
     return upload
 
 
-@router.post("/upload", response_model=AttendanceUploadResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/upload", response_model=AttendanceUploadResponse, status_code=status.HTTP_202_ACCEPTED)
 async def upload_attendance(
     college_id: int,
     year: int,
@@ -53,17 +55,40 @@ async def upload_attendance(
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
-    """Upload attendance Excel file"""
+    """
+    Upload attendance Excel file.
+
+    The upload is saved as PENDING and processed in the background; poll
+    /attendance/uploads/{upload_id} for its progress and outcome.
+    """
     import os
+    import tempfile
     from app.config import settings
     from app.models.attendance_uploads import UploadStatus
 
     os.makedirs(settings.UPLOAD_PATH, exist_ok=True)
-    file_path = os.path.join(settings.UPLOAD_PATH, f"{college_id}_{year}_{month}_{file.filename}")
 
-    with open(file_path, "wb") as buffer:
-        content = await file.read()
-        buffer.write(content)
+    # Stream the file to disk, then name it after its content so an upload
+    # still waiting to be processed is never overwritten by a later one
+    buffer = tempfile.NamedTemporaryFile(dir=settings.UPLOAD_PATH, suffix=".part", delete=False)
+    try:
+        with buffer:
+            file_size, content_hash = await receive_upload(file, buffer)
+
+        file_path = os.path.join(
+            settings.UPLOAD_PATH,
+            f"{college_id}_{year}_{month}_{content_hash[:12]}_{file.filename}"
+        )
+        os.replace(buffer.name, file_path)
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    finally:
+        # Left behind if the file was refused or the client went away
+        if os.path.exists(buffer.name):
+            os.remove(buffer.name)
 
     db_upload = AttendanceUpload(
         college_id=college_id,
@@ -71,6 +96,8 @@ async def upload_attendance(
         month=month,
         file_name=file.filename,
         file_path=file_path,
+        file_size=file_size,
+        content_hash=content_hash,
         status=UploadStatus.PENDING,
         records_count=0
     )
@@ -78,15 +105,7 @@ async def upload_attendance(
     db.commit()
     db.refresh(db_upload)
 
-    # Process the upload immediately
-    try:
-        process_result = process_attendance_upload(db_upload.id, db)
-        db.refresh(db_upload)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error processing attendance file: {str(e)}"
-        )
+    submit_attendance_upload(db_upload.id)
 
     return db_upload
 
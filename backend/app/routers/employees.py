@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from app.database import get_db
 from app.schemas.employee import EmployeeCreate, EmployeeUpdate, EmployeeResponse, EmployeeBulkCreate, EmployeeBulkUploadResponse
 from app.schemas.employee_salary_structure import SalaryStructureResponse, SalaryStructureBulkCreate
@@ -11,6 +11,10 @@ from app.models.employees import Employee
 from app.models.employee_salary_structures import EmployeeSalaryStructure
 from app.models.employee_leave_balances import EmployeeLeaveBalance
 from app.models.attendance_records import AttendanceRecord
+from app.services.payroll_arrears_service import post_salary_arrears
+from app.services.payroll_locks import PayrollRunInProgressError
+from app.services.employee_codes import invalidate_employee_codes
+from app.utils.uploads import UploadTooLargeError, receive_upload
 
 router = APIRouter(prefix="/employees", tags=["employees"])
 
@@ -85,6 +89,7 @@ def create_employee(employee: EmployeeCreate, db: Session = Depends(get_db)):
     db.add(db_employee)
     db.commit()
     db.refresh(db_employee)
+    invalidate_employee_codes(db_employee.college_id)
     return _employee_to_dict(db_employee)
 
 
@@ -96,6 +101,7 @@ def create_employees_bulk(employees: EmployeeBulkCreate, db: Session = Depends(g
     db.commit()
     for emp in db_employees:
         db.refresh(emp)
+        invalidate_employee_codes(emp.college_id)
     return [_employee_to_dict(emp) for emp in db_employees]
 
 
@@ -107,10 +113,19 @@ async def upload_employees_excel(
 ):
     """Upload employee data from Excel file"""
     import openpyxl
-    import io
+    import tempfile
 
-    content = await file.read()
-    wb = openpyxl.load_workbook(io.BytesIO(content))
+    # Spool the file to disk in chunks rather than holding it in memory
+    with tempfile.TemporaryFile() as buffer:
+        try:
+            await receive_upload(file, buffer)
+        except UploadTooLargeError as e:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
+            )
+        buffer.seek(0)
+        wb = openpyxl.load_workbook(buffer)
     ws = wb.active
 
     errors = []
@@ -120,6 +135,23 @@ async def upload_employees_excel(
     headers = [cell.value for cell in ws[1]]
     header_map = {str(h).lower().strip(): i for i, h in enumerate(headers) if h}
 
+    # Employee codes are unique across colleges and include inactive
+    # employees, so the taken ones are read straight from the table in one
+    # query; codes repeated within the file are caught as rows are added
+    code_idx = header_map.get("employee_code")
+    existing_codes = set()
+    if code_idx is not None:
+        file_codes = {
+            str(row[code_idx]) for row in ws.iter_rows(min_row=2, values_only=True)
+            if code_idx < len(row) and row[code_idx] is not None
+        }
+        if file_codes:
+            existing_codes = {
+                code for (code,) in db.query(Employee.employee_code).filter(
+                    Employee.employee_code.in_(file_codes)
+                ).all()
+            }
+
     for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
         if not any(row):
             continue
@@ -132,8 +164,16 @@ async def upload_employees_excel(
                     return row[idx] if row[idx] is not None else default
                 return default
 
+            employee_code = str(get_val("employee_code", ""))
+            if employee_code in existing_codes:
+                errors.append({
+                    "row": row_idx,
+                    "error": f"Employee code '{get_val('employee_code')}' already exists"
+                })
+                continue
+
             emp = Employee(
-                employee_code=str(get_val("employee_code", "")),
+                employee_code=employee_code,
                 first_name=str(get_val("first_name", "")),
                 last_name=str(get_val("last_name", "")),
                 email=str(get_val("email", "")),
@@ -150,14 +190,18 @@ async def upload_employees_excel(
                 monthly_gross=float(get_val("monthly_gross", 0)),
                 is_active=True
             )
-            db.add(emp)
-            db.flush()
+            # A row that fails to insert is rolled back on its own and
+            # leaves the session usable for the rows after it
+            with db.begin_nested():
+                db.add(emp)
+            existing_codes.add(employee_code)
             successful += 1
         except Exception as e:
             errors.append({"row": row_idx, "error": str(e)})
 
     if successful > 0:
         db.commit()
+        invalidate_employee_codes(college_id)
 
     return EmployeeBulkUploadResponse(
         total=total,
@@ -181,12 +225,16 @@ def update_employee(
             detail=f"Employee with ID {employee_id} not found"
         )
 
+    previous_college_id = db_employee.college_id
     update_data = employee_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_employee, key, value)
 
     db.commit()
     db.refresh(db_employee)
+    invalidate_employee_codes(previous_college_id)
+    if db_employee.college_id != previous_college_id:
+        invalidate_employee_codes(db_employee.college_id)
     return _employee_to_dict(db_employee)
 
 
@@ -202,6 +250,7 @@ def delete_employee(employee_id: int, db: Session = Depends(get_db)):
 
     db_employee.is_active = False
     db.commit()
+    invalidate_employee_codes(db_employee.college_id)
     return None
 
 
@@ -223,12 +272,23 @@ def update_salary_structure(
     data: SalaryStructureBulkCreate,
     db: Session = Depends(get_db)
 ):
-    """Update salary structure for an employee (replace all active)"""
-    # End-date all current structures
+    """
+    Update salary structure for an employee (replace all active).
+
+    Current structures end the day before the new ones take effect. A
+    revision back-dated before the current month posts the arrears of the
+    locked cycles since then into this month's cycle.
+    """
+    revision_start = min(
+        (s.effective_from for s in data.structures), default=date.today() + timedelta(days=1)
+    )
+
+    # End-date the current structures that started before the revision
     db.query(EmployeeSalaryStructure).filter(
         EmployeeSalaryStructure.employee_id == employee_id,
-        EmployeeSalaryStructure.effective_to.is_(None)
-    ).update({"effective_to": date.today()})
+        EmployeeSalaryStructure.effective_to.is_(None),
+        EmployeeSalaryStructure.effective_from < revision_start
+    ).update({"effective_to": revision_start - timedelta(days=1)})
 
     # Create new structures
     new_structures = []
@@ -243,7 +303,19 @@ def update_salary_structure(
         db.add(structure)
         new_structures.append(structure)
 
-    db.commit()
+    try:
+        if revision_start < date.today().replace(day=1):
+            db.flush()
+            post_salary_arrears(revision_start, db, employee_ids=[employee_id])
+        # Arrears posting returns without committing when nothing was paid yet
+        db.commit()
+    except PayrollRunInProgressError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
     for s in new_structures:
         db.refresh(s)
 
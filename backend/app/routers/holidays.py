@@ -4,6 +4,7 @@ from typing import List
 from app.database import get_db
 from app.schemas.holiday import HolidayCreate, HolidayUpdate, HolidayResponse, HolidayBulkCreate
 from app.models.holidays import Holiday
+from app.services.working_calendar import invalidate_working_calendar
 
 router = APIRouter(prefix="/holidays", tags=["holidays"])
 
@@ -52,6 +53,7 @@ def create_holiday(holiday: HolidayCreate, db: Session = Depends(get_db)):
     db.add(db_holiday)
     db.commit()
     db.refresh(db_holiday)
+    invalidate_working_calendar(db_holiday.college_id, db_holiday.date.year)
     return db_holiday
 
 
@@ -63,6 +65,7 @@ def create_holidays_bulk(holidays: HolidayBulkCreate, db: Session = Depends(get_
     db.commit()
     for holiday in db_holidays:
         db.refresh(holiday)
+        invalidate_working_calendar(holiday.college_id, holiday.date.year)
     return db_holidays
 
 
@@ -86,6 +89,7 @@ def update_holiday(
 
     db.commit()
     db.refresh(db_holiday)
+    invalidate_working_calendar(db_holiday.college_id, db_holiday.date.year)
     return db_holiday
 
 
@@ -99,6 +103,8 @@ def delete_holiday(holiday_id: int, db: Session = Depends(get_db)):
             detail=f"Holiday with ID {holiday_id} not found"
         )
 
+    college_id, year = db_holiday.college_id, db_holiday.date.year
     db.delete(db_holiday)
     db.commit()
+    invalidate_working_calendar(college_id, year)
     return None
@@ -1,20 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
+from decimal import Decimal
+from datetime import datetime
 from app.database import get_db
 from app.schemas.payroll import (
+    PayrollArrearsRequest,
+    PayrollArrearsResponse,
     PayrollCycleResponse,
     PayrollEntryResponse,
     PayrollCalculateRequest,
-    PayrollSummaryResponse
+    PayrollGroupJobResponse,
+    PayrollJobResponse,
+    PayrollPreviewResponse,
+    PayrollRunResponse,
+    PayrollSummaryResponse,
+    PayrollVarianceResponse
 )
 from app.models.payroll_cycles import PayrollCycle
 from app.models.payroll_entries import PayrollEntry
-from app.services.payroll_service import calculate_payroll as run_payroll_calculation, lock_payroll_cycle
+from app.models.payroll_jobs import PayrollJob, PayrollJobStatus
+from app.services.payroll_service import preview_payroll, lock_payroll_cycle
+from app.services.payroll_job_service import submit_group_payroll_jobs, submit_payroll_job
+from app.services.payroll_locks import PayrollRunInProgressError
+from app.services.payroll_variance_service import compute_payroll_variance
+from app.services.payroll_arrears_service import post_salary_arrears
+from app.services.payroll_run_stats import list_cycle_runs
 
 router = APIRouter(prefix="/payroll", tags=["payroll"])
 
 
+def _job_to_dict(job: PayrollJob) -> dict:
+    elapsed_seconds = None
+    if job.started_at:
+        elapsed_seconds = ((job.finished_at or datetime.utcnow()) - job.started_at).total_seconds()
+
+    return {
+        "id": job.id,
+        "college_id": job.college_id,
+        "year": job.year,
+        "month": job.month,
+        "month_to": job.month_to,
+        "payroll_cycle_id": job.payroll_cycle_id,
+        "status": job.status,
+        "phase": job.phase,
+        "employees_processed": job.employees_processed,
+        "employees_total": job.employees_total,
+        "error_message": job.error_message,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "elapsed_seconds": elapsed_seconds,
+    }
+
+
 @router.get("/cycles", response_model=List[PayrollCycleResponse])
 def list_payroll_cycles(
     college_id: int = None,
@@ -50,24 +89,202 @@ def get_payroll_cycle(cycle_id: int, db: Session = Depends(get_db)):
     return cycle
 
 
-@router.post("/calculate", response_model=PayrollCycleResponse)
-def trigger_payroll_calculation(request: PayrollCalculateRequest, db: Session = Depends(get_db)):
-    """Trigger payroll calculation for a college/month"""
-    if not request.college_id:
+@router.post(
+    "/calculate",
+    response_model=Union[PayrollJobResponse, PayrollGroupJobResponse, PayrollPreviewResponse]
+)
+def trigger_payroll_calculation(
+    request: PayrollCalculateRequest,
+    response: Response,
+    db: Session = Depends(get_db)
+):
+    """
+    Trigger payroll calculation for a college/month.
+
+    A single-college calculation is queued as a background job and answered
+    with 202 and the job; poll GET /payroll/jobs/{id} for progress. Without a
+    college_id one job is queued per college, at most max_workers of them
+    running at once, and answered with 202 and the jobs. preview=true
+    returns the computed entries without saving them. month_to calculates
+    every month from month to month_to in one run. A locked cycle is
+    answered with 400, and a calculation of a college and month that is
+    already queued or running with 409.
+    """
+    if request.month_to is not None and not 1 <= request.month <= request.month_to <= 12:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="college_id is required"
+            detail="month_to must be a month of the same year, not before month"
+        )
+    if not request.college_id:
+        if request.employee_ids is not None or request.preview:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="employee_ids and preview require college_id"
+            )
+        if request.max_workers is not None and request.max_workers < 1:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="max_workers must be at least 1"
+            )
+        group = submit_group_payroll_jobs(
+            request.year,
+            request.month,
+            db,
+            request.max_workers,
+            month_to=request.month_to
         )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {**group, "jobs": [_job_to_dict(job) for job in group["jobs"]]}
+    if request.preview:
+        if request.month_to is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="preview calculates a single month"
+            )
+        return preview_payroll(
+            request.college_id,
+            request.year,
+            request.month,
+            db,
+            employee_ids=request.employee_ids
+        )
+
     try:
-        cycle = run_payroll_calculation(request.college_id, request.year, request.month, db)
-        return cycle
+        job = submit_payroll_job(
+            request.college_id,
+            request.year,
+            request.month,
+            db,
+            employee_ids=request.employee_ids,
+            force=request.force,
+            month_to=request.month_to
+        )
+    except PayrollRunInProgressError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    response.status_code = status.HTTP_202_ACCEPTED
+    return _job_to_dict(job)
+
+
+@router.post("/arrears", response_model=PayrollArrearsResponse)
+def post_arrears(request: PayrollArrearsRequest, db: Session = Depends(get_db)):
+    """
+    Post the arrears of a retroactive salary revision.
+
+    For revisions applied outside the salary structure endpoint (e.g. a
+    group-wide DA percentage change), compares the locked cycles since
+    effective_from with the structures now in force for every affected
+    employee in one batch and pays the difference in the cycle of as_of
+    (this month by default).
+    """
+    try:
+        return post_salary_arrears(
+            request.effective_from,
+            db,
+            employee_ids=request.employee_ids,
+            college_id=request.college_id,
+            as_of=request.as_of
+        )
+    except PayrollRunInProgressError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except ValueError as e:
+        db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except Exception as e:
+
+
+@router.get("/jobs", response_model=List[PayrollJobResponse])
+def list_payroll_jobs(
+    college_id: int = None,
+    payroll_cycle_id: int = None,
+    job_status: PayrollJobStatus = None,
+    skip: int = 0,
+    limit: int = 50,
+    db: Session = Depends(get_db)
+):
+    """List payroll jobs with filters, newest first"""
+    query = db.query(PayrollJob)
+
+    if college_id:
+        query = query.filter(PayrollJob.college_id == college_id)
+    if payroll_cycle_id:
+        query = query.filter(PayrollJob.payroll_cycle_id == payroll_cycle_id)
+    if job_status:
+        query = query.filter(PayrollJob.status == job_status)
+
+    jobs = query.order_by(PayrollJob.id.desc()).offset(skip).limit(limit).all()
+    return [_job_to_dict(job) for job in jobs]
+
+
+@router.get("/jobs/{job_id}", response_model=PayrollJobResponse)
+def get_payroll_job(job_id: int, db: Session = Depends(get_db)):
+    """Get a payroll job's status and progress"""
+    job = db.query(PayrollJob).filter(PayrollJob.id == job_id).first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Payroll job with ID {job_id} not found"
+        )
+    return _job_to_dict(job)
+
+
+@router.get("/cycles/{cycle_id}/variance", response_model=PayrollVarianceResponse)
+def get_cycle_variance(
+    cycle_id: int,
+    baseline_cycle_id: Optional[int] = None,
+    min_change: Optional[Decimal] = None,
+    min_percent_change: Optional[Decimal] = None,
+    min_component_change: Optional[Decimal] = None,
+    include_unchanged: bool = False,
+    sort: str = "abs_net_pay_change",
+    descending: bool = True,
+    skip: int = 0,
+    limit: int = 5000,
+    db: Session = Depends(get_db)
+):
+    """
+    Compare a cycle with a baseline cycle (the previous month by default).
+
+    Returns per-employee net pay, LOP and total deltas with per-component
+    deltas, filtered by the thresholds and ordered by sort (net_pay_change,
+    abs_net_pay_change, net_pay_percent_change, lop_days_change or
+    employee_code).
+    """
+    try:
+        return compute_payroll_variance(
+            cycle_id,
+            db,
+            baseline_cycle_id=baseline_cycle_id,
+            min_change=min_change,
+            min_percent_change=min_percent_change,
+            min_component_change=min_component_change,
+            include_unchanged=include_unchanged,
+            sort=sort,
+            descending=descending,
+            skip=skip,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/cycles/{cycle_id}/stats", response_model=List[PayrollRunResponse])
+def get_cycle_stats(cycle_id: int, limit: int = 10, db: Session = Depends(get_db)):
+    """
+    Get the stage timings of the most recent runs that calculated a cycle.
+
+    Each run reports its wall time, SQL statement count and row count per
+    stage (holiday load, employee load, attendance aggregation, leave
+    waterfall, entry writes, commit, ...), newest run first.
+    """
+    cycle = db.query(PayrollCycle).filter(PayrollCycle.id == cycle_id).first()
+    if not cycle:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Payroll calculation failed: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Payroll cycle with ID {cycle_id} not found"
         )
+    return list_cycle_runs(cycle, db, limit=limit)
 
 
 @router.post("/cycles/{cycle_id}/lock", response_model=PayrollCycleResponse)
@@ -76,6 +293,8 @@ def lock_cycle(cycle_id: int, db: Session = Depends(get_db)):
     try:
         cycle = lock_payroll_cycle(cycle_id, db)
         return cycle
+    except PayrollRunInProgressError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
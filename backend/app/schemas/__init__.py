@@ -65,11 +65,26 @@ from app.schemas.holiday import (
     HolidayBulkCreate,
 )
 from app.schemas.payroll import (
+    PayrollArrearsRequest,
+    PayrollArrearsResponse,
     PayrollCycleResponse,
     PayrollEntryResponse,
     PayrollEntryComponentResponse,
     PayrollCalculateRequest,
+    PayrollGroupJobRejection,
+    PayrollGroupJobResponse,
+    PayrollJobResponse,
+    PayrollPreviewComponent,
+    PayrollPreviewDifference,
+    PayrollPreviewEntry,
+    PayrollPreviewResponse,
+    PayrollRunResponse,
+    PayrollRunStageResponse,
     PayrollSummaryResponse,
+    PayrollVarianceAmount,
+    PayrollVarianceComponent,
+    PayrollVarianceEntry,
+    PayrollVarianceResponse,
 )
 from app.schemas.payslip import PayslipResponse
 from app.schemas.report import ReportGenerateRequest, ReportResponse
@@ -121,11 +136,26 @@ __all__ = [
     "HolidayUpdate",
     "HolidayResponse",
     "HolidayBulkCreate",
+    "PayrollArrearsRequest",
+    "PayrollArrearsResponse",
     "PayrollCycleResponse",
     "PayrollEntryResponse",
     "PayrollEntryComponentResponse",
     "PayrollCalculateRequest",
+    "PayrollGroupJobRejection",
+    "PayrollGroupJobResponse",
+    "PayrollJobResponse",
+    "PayrollPreviewComponent",
+    "PayrollPreviewDifference",
+    "PayrollPreviewEntry",
+    "PayrollPreviewResponse",
+    "PayrollRunResponse",
+    "PayrollRunStageResponse",
     "PayrollSummaryResponse",
+    "PayrollVarianceAmount",
+    "PayrollVarianceComponent",
+    "PayrollVarianceEntry",
+    "PayrollVarianceResponse",
     "PayslipResponse",
     "ReportGenerateRequest",
     "ReportResponse",
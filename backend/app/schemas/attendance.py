@@ -13,10 +13,16 @@ class AttendanceUploadResponse(BaseModel):
     month: int
     file_name: str
     file_path: str
+    file_size: Optional[int] = None
+    content_hash: Optional[str] = None
     uploaded_at: datetime
     status: UploadStatus
     error_message: Optional[str] = None
     records_count: int
+    rows_processed: int = 0
+    rows_total: Optional[int] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
 
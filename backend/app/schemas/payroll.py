@@ -1,8 +1,9 @@
 from pydantic import BaseModel, ConfigDict
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 from decimal import Decimal
 from app.models.payroll_cycles import PayrollCycleStatus
+from app.models.payroll_jobs import PayrollJobStatus
 from app.models.salary_components import ComponentType
 
 
@@ -16,6 +17,9 @@ class PayrollCycleResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     locked_at: Optional[datetime] = None
+    checkpoint_employee_id: Optional[int] = None
+    chunks_completed: int = 0
+    chunks_total: int = 0
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -39,7 +43,8 @@ class PayrollEntryResponse(BaseModel):
     days_absent: Decimal
     paid_leaves_used: Decimal
     comp_leaves_used: Decimal
-    unpaid_leaves: Decimal
+    lop_days: Decimal
+    arrears: Decimal
     loss_of_pay: Decimal
     gross_earnings: Decimal
     total_deductions: Decimal
@@ -54,7 +59,163 @@ class PayrollCalculateRequest(BaseModel):
     college_id: Optional[int] = None
     year: int
     month: int
+    month_to: Optional[int] = None
     employee_ids: Optional[list[int]] = None
+    force: bool = False
+    preview: bool = False
+    max_workers: Optional[int] = None
+
+
+class PayrollPreviewComponent(BaseModel):
+    salary_component_id: int
+    component_type: ComponentType
+    amount: Decimal
+
+
+class PayrollPreviewDifference(BaseModel):
+    stored: Optional[Decimal] = None
+    calculated: Optional[Decimal] = None
+
+
+class PayrollPreviewEntry(BaseModel):
+    employee_id: int
+    days_present: Decimal
+    days_absent: Decimal
+    paid_leaves_used: Decimal
+    comp_leaves_used: Decimal
+    lop_days: Decimal
+    loss_of_pay: Decimal
+    arrears: Decimal
+    gross_earnings: Decimal
+    total_deductions: Decimal
+    net_pay: Decimal
+    components: list[PayrollPreviewComponent] = []
+    change: str
+    differences: dict[str, PayrollPreviewDifference] = {}
+
+
+class PayrollPreviewResponse(BaseModel):
+    college_id: int
+    year: int
+    month: int
+    payroll_cycle_id: Optional[int] = None
+    total_working_days: int
+    new: int
+    changed: int
+    unchanged: int
+    removed_employee_ids: list[int] = []
+    entries: list[PayrollPreviewEntry]
+
+
+class PayrollVarianceAmount(BaseModel):
+    baseline: Optional[Decimal] = None
+    current: Optional[Decimal] = None
+    change: Decimal
+
+
+class PayrollVarianceComponent(BaseModel):
+    salary_component_id: int
+    component_name: str
+    component_type: ComponentType
+    baseline: Optional[Decimal] = None
+    current: Optional[Decimal] = None
+    change: Decimal
+
+
+class PayrollVarianceEntry(BaseModel):
+    employee_id: int
+    employee_code: Optional[str] = None
+    employee_name: str
+    status: str
+    net_pay_percent_change: Optional[Decimal] = None
+    changes: dict[str, PayrollVarianceAmount]
+    components: list[PayrollVarianceComponent] = []
+
+
+class PayrollVarianceResponse(BaseModel):
+    payroll_cycle_id: int
+    baseline_cycle_id: int
+    total: int
+    entries: list[PayrollVarianceEntry]
+
+
+class PayrollArrearsRequest(BaseModel):
+    effective_from: date
+    college_id: Optional[int] = None
+    employee_ids: Optional[list[int]] = None
+    as_of: Optional[date] = None
+
+
+class PayrollArrearsResponse(BaseModel):
+    effective_from: date
+    year: int
+    month: int
+    payroll_cycle_ids: list[int] = []
+    employees: int
+    months: int
+    total_arrears: Decimal
+
+
+class PayrollJobResponse(BaseModel):
+    id: int
+    college_id: int
+    year: int
+    month: int
+    month_to: Optional[int] = None
+    payroll_cycle_id: Optional[int] = None
+    status: PayrollJobStatus
+    phase: str
+    employees_processed: int
+    employees_total: int
+    error_message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    elapsed_seconds: Optional[float] = None
+
+
+class PayrollRunStageResponse(BaseModel):
+    stage: str
+    seconds: Decimal
+    statements: int
+    rows: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PayrollRunResponse(BaseModel):
+    id: int
+    college_id: int
+    year: int
+    month_from: int
+    month_to: int
+    status: str
+    employees: int
+    chunks: int
+    entries_new: int
+    entries_updated: int
+    entries_unchanged: int
+    statements: int
+    seconds: Decimal
+    error_message: Optional[str] = None
+    started_at: datetime
+    finished_at: datetime
+    stages: list[PayrollRunStageResponse] = []
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PayrollGroupJobRejection(BaseModel):
+    college_id: int
+    error: str
+
+
+class PayrollGroupJobResponse(BaseModel):
+    year: int
+    month: int
+    month_to: int
+    jobs: list[PayrollJobResponse]
+    rejected: list[PayrollGroupJobRejection] = []
 
 
 class PayrollSummaryResponse(BaseModel):
@@ -0,0 +1,214 @@
+from typing import Iterator, Optional, Set, Tuple
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models.attendance_uploads import AttendanceUpload, UploadStatus
+from app.services.attendance_service import process_attendance_upload
+from app.config import settings
+
+# Worker pool shared by all attendance uploads of this process
+_executor = ThreadPoolExecutor(
+    max_workers=settings.ATTENDANCE_UPLOAD_WORKERS,
+    thread_name_prefix="attendance-upload"
+)
+
+# Colleges a worker of this process is ingesting an upload for, so this
+# process never starts two uploads of one college at once
+_active_colleges = set()
+_active_colleges_lock = Lock()
+
+
+@contextmanager
+def _college_ingest_lock(college_id: int, db: Session) -> Iterator[bool]:
+    """
+    Try to hold a college's attendance ingest lock for the duration of a block.
+
+    On PostgreSQL this is a session-level advisory lock (single-key form,
+    keyed by college ID) on a dedicated connection, so only one process
+    ingests a college's uploads at a time and the lock is released by the
+    server if the process dies. Other databases are served by one process
+    and rely on _active_colleges alone.
+
+    Args:
+        college_id: College ID
+        db: Database session whose engine holds the lock
+
+    Yields:
+        True if the lock is held, False if another process holds it
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        yield True
+        return
+
+    connection = bind.connect()
+    locked = False
+    try:
+        locked = connection.execute(
+            text("SELECT pg_try_advisory_lock(:college_key)"), {"college_key": college_id}
+        ).scalar()
+        # Session-level locks outlive the transaction; don't sit idle in one
+        connection.commit()
+
+        yield bool(locked)
+
+    finally:
+        if locked:
+            connection.execute(
+                text("SELECT pg_advisory_unlock(:college_key)"), {"college_key": college_id}
+            )
+            connection.commit()
+        connection.close()
+
+
+def submit_attendance_upload(upload_id: int) -> None:
+    """
+    Have a background worker process PENDING attendance uploads.
+
+    The worker claims the oldest PENDING upload of any college not already
+    being ingested, which is upload_id unless earlier uploads are queued.
+
+    Args:
+        upload_id: AttendanceUpload ID just saved as PENDING
+    """
+    _executor.submit(_process_pending_uploads)
+
+
+def resume_pending_uploads() -> None:
+    """
+    Start workers on uploads left unfinished, e.g. by a restart of the server.
+
+    Uploads left PROCESSING by a stopped process never committed any
+    records, so they are put back to PENDING and ingested again. An upload
+    whose college is still being ingested by another process is left alone.
+    """
+    db = SessionLocal()
+    try:
+        stale = db.query(AttendanceUpload.id, AttendanceUpload.college_id).filter(
+            AttendanceUpload.status == UploadStatus.PROCESSING
+        ).all()
+
+        for upload in stale:
+            with _college_ingest_lock(upload.college_id, db) as locked:
+                if not locked:
+                    continue
+                db.query(AttendanceUpload).filter(
+                    AttendanceUpload.id == upload.id,
+                    AttendanceUpload.status == UploadStatus.PROCESSING
+                ).update({
+                    "status": UploadStatus.PENDING,
+                    "rows_processed": 0,
+                    "rows_total": None,
+                    "started_at": None
+                }, synchronize_session=False)
+                db.commit()
+    finally:
+        db.close()
+
+    for _ in range(settings.ATTENDANCE_UPLOAD_WORKERS):
+        _executor.submit(_process_pending_uploads)
+
+
+def _next_upload(skipped_colleges: Set[int]) -> Optional[Tuple[int, int]]:
+    """
+    Reserve the oldest PENDING upload of a college no worker is ingesting.
+
+    Args:
+        skipped_colleges: Colleges another process was found ingesting
+
+    Returns:
+        (upload ID, college ID), or None if there is nothing to pick up;
+        the college stays reserved until _release_college is called
+    """
+    db = SessionLocal()
+    try:
+        with _active_colleges_lock:
+            busy = _active_colleges | skipped_colleges
+            query = db.query(AttendanceUpload.id, AttendanceUpload.college_id).filter(
+                AttendanceUpload.status == UploadStatus.PENDING
+            )
+            if busy:
+                query = query.filter(AttendanceUpload.college_id.notin_(busy))
+            upload = query.order_by(AttendanceUpload.id).first()
+            if upload is None:
+                return None
+            _active_colleges.add(upload.college_id)
+            return upload.id, upload.college_id
+    finally:
+        db.close()
+
+
+def _release_college(college_id: int) -> None:
+    """Let the next upload of a college be picked up."""
+    with _active_colleges_lock:
+        _active_colleges.discard(college_id)
+
+
+def _update_upload(upload_id: int, **values) -> None:
+    """Write upload progress in its own short transaction so readers see it immediately."""
+    db = SessionLocal()
+    try:
+        db.query(AttendanceUpload).filter(AttendanceUpload.id == upload_id).update(values)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _process_pending_uploads() -> None:
+    """Process PENDING uploads until none is left that this worker may take."""
+    skipped_colleges = set()
+    while True:
+        reserved = _next_upload(skipped_colleges)
+        if reserved is None:
+            return
+        upload_id, college_id = reserved
+        try:
+            if not _process_upload(upload_id, college_id):
+                # That process picks up the college's remaining uploads
+                skipped_colleges.add(college_id)
+        finally:
+            _release_college(college_id)
+
+
+def _process_upload(upload_id: int, college_id: int) -> bool:
+    """
+    Ingest one attendance upload, recording its progress as batches are written.
+
+    Args:
+        upload_id: AttendanceUpload ID
+        college_id: The upload's college ID
+
+    Returns:
+        False if another process is ingesting the college's uploads
+    """
+    db = SessionLocal()
+    try:
+        with _college_ingest_lock(college_id, db) as locked:
+            if not locked:
+                return False
+
+            progress = None
+            # SQLite allows one writer at a time, and the upload's own
+            # transaction is open until it finishes; only record progress
+            # where rows can be updated alongside it
+            if db.get_bind().dialect.name == "postgresql":
+                def progress(processed: int, total: Optional[int]) -> None:
+                    # Progress is informational; failing to record it must not fail the upload
+                    try:
+                        _update_upload(upload_id, rows_processed=processed, rows_total=total)
+                    except Exception:
+                        pass
+
+            try:
+                process_attendance_upload(upload_id, db, progress=progress)
+            except ValueError:
+                # Claimed by another worker (or process) first
+                pass
+
+        return True
+
+    finally:
+        db.close()
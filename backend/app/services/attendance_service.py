@@ -1,24 +1,47 @@
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import date, datetime
 from decimal import Decimal
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, insert, literal_column, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.models.attendance_uploads import AttendanceUpload, UploadStatus
 from app.models.attendance_records import AttendanceRecord, AttendanceStatus
 from app.models.employees import Employee
 from app.schemas.attendance import AttendanceSummary
-from app.utils.excel_parser import parse_attendance_excel
+from app.services.payroll_batch import HALF_DAY_UNITS, UNITS_PER_DAY, from_units
+from app.utils.excel_parser import iter_attendance_excel
+from app.config import settings
 
+_attendance_table = AttendanceRecord.__table__
 
-def process_attendance_upload(upload_id: int, db: Session) -> Dict:
+# True for a row an upsert inserted, False for one it updated (an updated
+# row version carries the updating transaction in xmax)
+_inserted = literal_column("xmax = 0").label("inserted")
+
+
+def process_attendance_upload(
+    upload_id: int,
+    db: Session,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None
+) -> Dict:
     """
     Process an uploaded attendance Excel file.
 
+    The upload is claimed by moving it from PENDING to PROCESSING in one
+    conditional UPDATE, so of several workers offered the same upload only
+    one processes it.
+
     Args:
         upload_id: AttendanceUpload ID
         db: Database session
+        progress: Optional callback called as progress(rows_processed,
+            rows_total) after each batch of records is written
 
     Returns:
         Dictionary with processing results
+
+    Raises:
+        ValueError: If the upload does not exist or is not PENDING
     """
     # Get the upload record
     upload = db.query(AttendanceUpload).filter(AttendanceUpload.id == upload_id).first()
@@ -26,64 +49,77 @@ def process_attendance_upload(upload_id: int, db: Session) -> Dict:
     if not upload:
         raise ValueError(f"Attendance upload with ID {upload_id} not found")
 
-    if upload.status != UploadStatus.PENDING:
+    # Claim the upload and update status to PROCESSING
+    claimed = db.query(AttendanceUpload).filter(
+        AttendanceUpload.id == upload_id,
+        AttendanceUpload.status == UploadStatus.PENDING
+    ).update(
+        {"status": UploadStatus.PROCESSING, "started_at": datetime.utcnow()},
+        synchronize_session=False
+    )
+    db.commit()
+    if not claimed:
         raise ValueError(f"Upload {upload_id} is not in PENDING status")
 
-    # Update status to PROCESSING
-    upload.status = UploadStatus.PROCESSING
-    db.commit()
+    # Sheet rows read so far and the row count the sheet declares
+    position = {"rows": 0, "total": None}
+
+    def read_row(rows: int, total: Optional[int]) -> None:
+        position["rows"] = rows
+        position["total"] = total
+
+    def write_batch(batch: List) -> Tuple[int, int]:
+        written = _write_attendance_batch(batch, upload_id, db)
+        if progress:
+            progress(position["rows"], position["total"])
+        return written
 
     try:
-        # Parse the Excel file
-        parse_result = parse_attendance_excel(upload.file_path, upload.college_id, db)
+        # Stream records from the sheet straight into batched writes; nothing
+        # is committed unless the whole file parses cleanly
+        errors = []
+        records_created = 0
+        records_updated = 0
 
-        if parse_result["errors"]:
-            # If there are errors, mark as failed
+        batch = []
+        for record in iter_attendance_excel(
+            upload.file_path, upload.college_id, db, errors, progress=read_row
+        ):
+            batch.append(record)
+            if len(batch) >= settings.ATTENDANCE_BATCH_SIZE:
+                created, updated = write_batch(batch)
+                records_created += created
+                records_updated += updated
+                batch = []
+        if batch:
+            created, updated = write_batch(batch)
+            records_created += created
+            records_updated += updated
+
+        if errors:
+            # If there are errors, discard the written records and mark as failed
+            db.rollback()
             upload.status = UploadStatus.FAILED
-            upload.error_message = "; ".join(parse_result["errors"][:5])  # Store first 5 errors
+            upload.error_message = "; ".join(errors[:5])  # Store first 5 errors
             upload.records_count = 0
+            upload.rows_processed = position["rows"]
+            upload.rows_total = position["rows"]
+            upload.finished_at = datetime.utcnow()
             db.commit()
 
             return {
                 "success": False,
                 "upload_id": upload_id,
-                "errors": parse_result["errors"],
+                "errors": errors,
                 "records_created": 0
             }
 
-        # Create or update attendance records
-        records_created = 0
-        records_updated = 0
-
-        for record_data in parse_result["records"]:
-            # Check if record already exists
-            existing_record = db.query(AttendanceRecord).filter(
-                AttendanceRecord.employee_id == record_data["employee_id"],
-                AttendanceRecord.date == record_data["date"]
-            ).first()
-
-            if existing_record:
-                # Update existing record
-                existing_record.status = record_data["status"]
-                existing_record.attendance_upload_id = upload_id
-                records_updated += 1
-            else:
-                # Create new record
-                new_record = AttendanceRecord(
-                    employee_id=record_data["employee_id"],
-                    date=record_data["date"],
-                    status=record_data["status"],
-                    attendance_upload_id=upload_id
-                )
-                db.add(new_record)
-                records_created += 1
-
-        # Commit all records
-        db.commit()
-
-        # Update upload status
+        # Update upload status and commit it with the records
         upload.status = UploadStatus.COMPLETED
         upload.records_count = records_created + records_updated
+        upload.rows_processed = position["rows"]
+        upload.rows_total = position["rows"]
+        upload.finished_at = datetime.utcnow()
         db.commit()
 
         return {
@@ -97,8 +133,10 @@ def process_attendance_upload(upload_id: int, db: Session) -> Dict:
 
     except Exception as e:
         # Mark as failed
+        db.rollback()
         upload.status = UploadStatus.FAILED
-        upload.error_message = str(e)
+        upload.error_message = str(e)[:1000]
+        upload.finished_at = datetime.utcnow()
         db.commit()
 
         return {
@@ -109,6 +147,107 @@ def process_attendance_upload(upload_id: int, db: Session) -> Dict:
         }
 
 
+def _write_attendance_batch(
+    batch: List[Tuple[int, date, AttendanceStatus]],
+    upload_id: int,
+    db: Session
+) -> Tuple[int, int]:
+    """
+    Create or update a batch of attendance records with batched statements.
+
+    On PostgreSQL the batch is upserted with INSERT ... ON CONFLICT ON
+    CONSTRAINT uq_employee_date DO UPDATE, and each row's xmax tells
+    whether it was inserted (0) or updated. Other databases find the
+    batch's existing records in one query, then insert the new ones with
+    one executemany INSERT and update the rest with one executemany
+    UPDATE. A later row of the file for the same employee and date wins.
+
+    Args:
+        batch: (employee_id, date, status) tuples
+        upload_id: AttendanceUpload the records come from
+        db: Database session
+
+    Returns:
+        Tuple of (records created, records updated)
+    """
+    statuses = {(employee_id, day): status for employee_id, day, status in batch}
+
+    if db.get_bind().dialect.name == "postgresql":
+        return _upsert_attendance_batch(statuses, upload_id, db)
+
+    dates = [day for _, day in statuses]
+    existing = {
+        (row.employee_id, row.date): row.id
+        for row in db.query(
+            AttendanceRecord.id, AttendanceRecord.employee_id, AttendanceRecord.date
+        ).filter(
+            AttendanceRecord.employee_id.in_({employee_id for employee_id, _ in statuses}),
+            AttendanceRecord.date >= min(dates),
+            AttendanceRecord.date <= max(dates)
+        ).all()
+    }
+
+    new_rows = []
+    updated_rows = []
+    for (employee_id, day), status in statuses.items():
+        record_id = existing.get((employee_id, day))
+        if record_id is None:
+            new_rows.append({
+                "employee_id": employee_id,
+                "date": day,
+                "status": status,
+                "attendance_upload_id": upload_id
+            })
+        else:
+            updated_rows.append({
+                "id": record_id,
+                "status": status,
+                "attendance_upload_id": upload_id
+            })
+
+    if new_rows:
+        db.execute(insert(AttendanceRecord), new_rows)
+    if updated_rows:
+        db.execute(update(AttendanceRecord), updated_rows)
+
+    return len(new_rows), len(updated_rows)
+
+
+def _upsert_attendance_batch(statuses: Dict, upload_id: int, db: Session) -> Tuple[int, int]:
+    """
+    Upsert attendance records on PostgreSQL, counting inserts and updates.
+
+    Args:
+        statuses: (employee_id, date) -> AttendanceStatus, one per record
+        upload_id: AttendanceUpload the records come from
+        db: Database session
+
+    Returns:
+        Tuple of (records created, records updated)
+    """
+    rows = [
+        {
+            "employee_id": employee_id,
+            "date": day,
+            "status": status,
+            "attendance_upload_id": upload_id
+        }
+        for (employee_id, day), status in statuses.items()
+    ]
+
+    upsert = pg_insert(_attendance_table)
+    upsert = upsert.on_conflict_do_update(
+        constraint="uq_employee_date",
+        set_={
+            "status": upsert.excluded.status,
+            "attendance_upload_id": upsert.excluded.attendance_upload_id
+        }
+    ).returning(_inserted)
+
+    created = sum(1 for row in db.execute(upsert, rows) if row.inserted)
+    return created, len(rows) - created
+
+
 def get_attendance_summary(
     college_id: int,
     year: int,
@@ -139,52 +278,44 @@ def get_attendance_summary(
     employees = db.query(Employee).filter(
         Employee.college_id == college_id,
         Employee.is_active == True
-    ).all()
+    ).order_by(Employee.id).all()
+
+    # Records per employee and status for the month, counted in SQL
+    counts = {}
+    for row in db.query(
+        AttendanceRecord.employee_id,
+        AttendanceRecord.status,
+        func.count(AttendanceRecord.id).label("days")
+    ).join(
+        Employee, Employee.id == AttendanceRecord.employee_id
+    ).filter(
+        Employee.college_id == college_id,
+        Employee.is_active == True,
+        AttendanceRecord.date >= start_date,
+        AttendanceRecord.date <= end_date
+    ).group_by(AttendanceRecord.employee_id, AttendanceRecord.status).all():
+        counts.setdefault(row.employee_id, {})[row.status] = row.days
 
     summaries = []
 
     for employee in employees:
-        # Get attendance records for the month
-        records = db.query(AttendanceRecord).filter(
-            AttendanceRecord.employee_id == employee.id,
-            AttendanceRecord.date >= start_date,
-            AttendanceRecord.date <= end_date
-        ).all()
-
-        # Calculate statistics
-        present_days = Decimal(0)
-        absent_days = Decimal(0)
-        half_days = Decimal(0)
-        weekend_work_days = Decimal(0)
-        holidays = Decimal(0)
-        leaves = Decimal(0)
-
-        for record in records:
-            if record.status == AttendanceStatus.PRESENT:
-                present_days += Decimal(1)
-            elif record.status == AttendanceStatus.ABSENT:
-                absent_days += Decimal(1)
-            elif record.status == AttendanceStatus.HALF_DAY:
-                half_days += Decimal(1)
-                present_days += Decimal("0.5")
-            elif record.status == AttendanceStatus.WEEKEND_WORK:
-                weekend_work_days += Decimal(1)
-                present_days += Decimal(1)
-            elif record.status == AttendanceStatus.HOLIDAY:
-                holidays += Decimal(1)
-            elif record.status == AttendanceStatus.LEAVE:
-                leaves += Decimal(1)
+        # Whole days per status; a half day counts half a day present
+        days = counts.get(employee.id, {})
+        present = days.get(AttendanceStatus.PRESENT, 0)
+        half_days = days.get(AttendanceStatus.HALF_DAY, 0)
+        weekend_work_days = days.get(AttendanceStatus.WEEKEND_WORK, 0)
+        present_units = (present + weekend_work_days) * UNITS_PER_DAY + half_days * HALF_DAY_UNITS
 
         summary = AttendanceSummary(
             employee_id=employee.id,
-            employee_name=f"{employee.first_name} {employee.last_name}",
+            employee_name=employee.name,
             total_days=last_day,
-            present_days=present_days,
-            absent_days=absent_days,
-            half_days=half_days,
-            weekend_work_days=weekend_work_days,
-            holidays=holidays,
-            leaves=leaves
+            present_days=from_units(present_units),
+            absent_days=Decimal(days.get(AttendanceStatus.ABSENT, 0)),
+            half_days=Decimal(half_days),
+            weekend_work_days=Decimal(weekend_work_days),
+            holidays=Decimal(days.get(AttendanceStatus.HOLIDAY, 0)),
+            leaves=Decimal(days.get(AttendanceStatus.LEAVE, 0))
         )
 
         summaries.append(summary)
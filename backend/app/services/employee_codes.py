@@ -0,0 +1,73 @@
+from typing import Dict, Iterable, Optional
+from threading import Lock
+from sqlalchemy.orm import Session
+from app.models.employees import Employee
+
+# college_id -> {employee_code: employee_id} of the college's active
+# employees resolved so far, shared by every session of this process
+_codes: Dict[int, Dict[str, int]] = {}
+_codes_lock = Lock()
+
+# college_id -> invalidation count, so codes read before an invalidation are
+# never cached after it
+_generations: Dict[int, int] = {}
+
+
+def resolve_employee_codes(college_id: int, codes: Iterable[str], db: Session) -> Dict[str, int]:
+    """
+    Map employee codes to the IDs of a college's active employees.
+
+    Codes resolved before are answered from the in-process cache; the rest
+    are looked up together in one employee_code IN (...) query. Codes that
+    match no active employee of the college are left out of the result and
+    looked up again next time, so new employees are found without an
+    invalidation. Importers (attendance sheets, employee uploads) should
+    resolve their codes here rather than querying employee by employee.
+
+    Args:
+        college_id: College ID
+        codes: Employee codes to resolve (blank codes are ignored)
+        db: Database session
+
+    Returns:
+        Dictionary of employee_code -> employee ID for the codes found
+    """
+    wanted = {code for code in codes if code}
+    cached = _codes.get(college_id, {})
+    resolved = {code: cached[code] for code in wanted if code in cached}
+
+    missing = wanted - resolved.keys()
+    if missing:
+        generation = _generations.get(college_id, 0)
+        found = {
+            row.employee_code: row.id
+            for row in db.query(Employee.employee_code, Employee.id).filter(
+                Employee.college_id == college_id,
+                Employee.is_active == True,
+                Employee.employee_code.in_(missing)
+            ).all()
+        }
+        resolved.update(found)
+
+        with _codes_lock:
+            if found and _generations.get(college_id, 0) == generation:
+                _codes.setdefault(college_id, {}).update(found)
+
+    return resolved
+
+
+def invalidate_employee_codes(college_id: Optional[int] = None) -> None:
+    """
+    Drop cached employee codes so they are resolved again on next use.
+
+    The employees router calls this whenever an employee is created,
+    updated or deactivated.
+
+    Args:
+        college_id: Only drop this college's codes (every college if None)
+    """
+    with _codes_lock:
+        college_ids = list(_codes) if college_id is None else [college_id]
+        for cached_college_id in college_ids:
+            _generations[cached_college_id] = _generations.get(cached_college_id, 0) + 1
+            _codes.pop(cached_college_id, None)
@@ -0,0 +1,248 @@
+from typing import Dict, List, Optional, Tuple
+from decimal import Decimal
+from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, delete, func, insert, update
+from app.models.employees import Employee
+from app.models.employee_leave_balances import EmployeeLeaveBalance
+from app.models.leave_ledger_entries import LeaveLedgerEntry, LeaveTransactionType
+from app.models.payroll_cycles import PayrollCycle
+from app.config import settings
+
+# Leave balance column each ledger transaction type accumulates into
+LEDGER_BALANCE_COLUMNS = {
+    LeaveTransactionType.PAID_LEAVE_USED: "paid_leaves_used",
+    LeaveTransactionType.COMP_LEAVE_EARNED: "comp_leaves_earned",
+    LeaveTransactionType.COMP_LEAVE_USED: "comp_leaves_used",
+}
+
+# Leave balance columns read by the payroll engine
+LEAVE_BALANCE_COLUMNS = (
+    EmployeeLeaveBalance.id,
+    EmployeeLeaveBalance.employee_id,
+    EmployeeLeaveBalance.paid_leaves_total,
+    EmployeeLeaveBalance.paid_leaves_used,
+    EmployeeLeaveBalance.comp_leaves_earned,
+    EmployeeLeaveBalance.comp_leaves_used,
+    EmployeeLeaveBalance.carry_forward_leaves,
+)
+
+_balance_table = EmployeeLeaveBalance.__table__
+
+# Adds posted days to one employee-year balance; executed once per batch
+_apply_deltas = update(_balance_table).where(
+    _balance_table.c.employee_id == bindparam("balance_employee_id"),
+    _balance_table.c.year == bindparam("balance_year")
+).values({
+    column: _balance_table.c[column] + bindparam(f"{column}_delta")
+    for column in LEDGER_BALANCE_COLUMNS.values()
+})
+
+
+def new_leave_balance(employee_id: int, year: int) -> Dict:
+    """Column values for an employee's first leave balance of the year."""
+    return {
+        "employee_id": employee_id,
+        "year": year,
+        "paid_leaves_total": Decimal(settings.DEFAULT_PAID_LEAVES_PER_YEAR),
+        "paid_leaves_used": Decimal(0),
+        "comp_leaves_earned": Decimal(0),
+        "comp_leaves_used": Decimal(0),
+        "carry_forward_leaves": Decimal(0)
+    }
+
+
+def load_opening_balances(
+    employee_filter: List,
+    employee_ids: List[int],
+    year: int,
+    month: int,
+    db: Session
+) -> Dict:
+    """
+    Load each employee's leave balance as it stood at the start of a month.
+
+    The materialized balance includes everything posted for the year; the
+    days posted by this and later months' cycles are taken back out using
+    the ledger, so recalculating a month never counts its own leave twice.
+
+    Args:
+        employee_filter: Criteria on Employee selecting the employees
+        employee_ids: Employees to return a balance for
+        year: Leave year
+        month: Month the balance opens
+        db: Database session
+
+    Returns:
+        employee_id -> balance dictionary with id (None when the employee
+        has no balance for the year yet), the balance columns as of the
+        start of the month, and "posted": month -> {balance column: days}
+        already posted by the cycles of this and later months
+    """
+    balances = db.query(*LEAVE_BALANCE_COLUMNS).join(
+        Employee, Employee.id == EmployeeLeaveBalance.employee_id
+    ).filter(
+        *employee_filter,
+        EmployeeLeaveBalance.year == year
+    ).all()
+
+    posted_rows = db.query(
+        LeaveLedgerEntry.employee_id,
+        LeaveLedgerEntry.transaction_type,
+        PayrollCycle.month,
+        func.sum(LeaveLedgerEntry.days).label("days")
+    ).join(
+        PayrollCycle, PayrollCycle.id == LeaveLedgerEntry.payroll_cycle_id
+    ).join(
+        Employee, Employee.id == LeaveLedgerEntry.employee_id
+    ).filter(
+        *employee_filter,
+        LeaveLedgerEntry.year == year,
+        PayrollCycle.month >= month
+    ).group_by(
+        LeaveLedgerEntry.employee_id,
+        LeaveLedgerEntry.transaction_type,
+        PayrollCycle.month
+    ).all()
+
+    opening = {}
+    for employee_id in employee_ids:
+        opening[employee_id] = {"id": None, **new_leave_balance(employee_id, year), "posted": {}}
+    for balance in balances:
+        if balance.employee_id in opening:
+            opening[balance.employee_id].update(balance._asdict())
+
+    for row in posted_rows:
+        balance = opening.get(row.employee_id)
+        if balance is None:
+            continue
+        column = LEDGER_BALANCE_COLUMNS[row.transaction_type]
+        balance[column] -= row.days
+        posted = balance["posted"].setdefault(row.month, {})
+        posted[column] = posted.get(column, Decimal(0)) + row.days
+
+    return opening
+
+
+def create_missing_balances(balances: Dict, year: int, db: Session) -> None:
+    """
+    Insert a default leave balance for every employee that has none for the year.
+
+    Args:
+        balances: Output of load_opening_balances
+        year: Leave year
+        db: Database session
+    """
+    new_balances = [
+        new_leave_balance(employee_id, year)
+        for employee_id, balance in balances.items()
+        if balance["id"] is None
+    ]
+    if new_balances:
+        db.execute(insert(EmployeeLeaveBalance), new_balances)
+
+
+def _apply_balance_deltas(deltas: Dict, year: int, db: Session) -> None:
+    """Add per-employee day deltas (employee_id -> {column: days}) to the year's balances."""
+    rows = [
+        {
+            "balance_employee_id": employee_id,
+            "balance_year": year,
+            **{
+                f"{column}_delta": columns.get(column, Decimal(0))
+                for column in LEDGER_BALANCE_COLUMNS.values()
+            }
+        }
+        for employee_id, columns in deltas.items()
+        if any(columns.values())
+    ]
+    if rows:
+        db.execute(_apply_deltas, rows)
+
+
+def write_cycle_ledger(
+    year: int,
+    recalculated: List[Tuple[int, int, List[int]]],
+    ledger_rows: List[Dict],
+    balances: Dict,
+    db: Session
+) -> None:
+    """
+    Replace the ledger rows cycles posted for the employees they recalculated.
+
+    Each cycle's previous rows for those employees are deleted, the new rows
+    of every cycle are inserted in one batch, and each materialized balance
+    is moved by the difference between the two.
+
+    Args:
+        year: Leave year
+        recalculated: (cycle_id, month, employee_ids) for every cycle written
+        ledger_rows: Dictionaries with payroll_cycle_id, employee_id,
+            transaction_type and days
+        balances: employee_id -> balance from load_opening_balances
+        db: Database session
+    """
+    deltas = {}
+    for cycle_id, month, employee_ids in recalculated:
+        if not employee_ids:
+            continue
+        db.execute(
+            delete(LeaveLedgerEntry).where(
+                LeaveLedgerEntry.payroll_cycle_id == cycle_id,
+                LeaveLedgerEntry.employee_id.in_(employee_ids)
+            )
+        )
+        for employee_id in employee_ids:
+            employee_deltas = deltas.setdefault(employee_id, {})
+            for column, days in balances[employee_id]["posted"].get(month, {}).items():
+                employee_deltas[column] = employee_deltas.get(column, Decimal(0)) - days
+
+    if ledger_rows:
+        db.execute(
+            insert(LeaveLedgerEntry),
+            [{"year": year, **row} for row in ledger_rows]
+        )
+
+    for row in ledger_rows:
+        column = LEDGER_BALANCE_COLUMNS[row["transaction_type"]]
+        employee_deltas = deltas.setdefault(row["employee_id"], {})
+        employee_deltas[column] = employee_deltas.get(column, Decimal(0)) + row["days"]
+
+    _apply_balance_deltas(deltas, year, db)
+
+
+def reverse_cycle_ledger(cycle_id: int, db: Session, employee_ids: Optional[List[int]] = None) -> None:
+    """
+    Take a cycle's ledger rows back out of the balances and delete them.
+
+    Args:
+        cycle_id: PayrollCycle ID
+        db: Database session
+        employee_ids: Only reverse these employees' rows (all rows if None)
+    """
+    criteria = [LeaveLedgerEntry.payroll_cycle_id == cycle_id]
+    if employee_ids is not None:
+        criteria.append(LeaveLedgerEntry.employee_id.in_(employee_ids))
+
+    rows = db.query(
+        LeaveLedgerEntry.employee_id,
+        LeaveLedgerEntry.year,
+        LeaveLedgerEntry.transaction_type,
+        func.sum(LeaveLedgerEntry.days).label("days")
+    ).filter(*criteria).group_by(
+        LeaveLedgerEntry.employee_id,
+        LeaveLedgerEntry.year,
+        LeaveLedgerEntry.transaction_type
+    ).all()
+
+    if not rows:
+        return
+
+    deltas_by_year = {}
+    for row in rows:
+        deltas = deltas_by_year.setdefault(row.year, {}).setdefault(row.employee_id, {})
+        deltas[LEDGER_BALANCE_COLUMNS[row.transaction_type]] = -row.days
+
+    for year, deltas in deltas_by_year.items():
+        _apply_balance_deltas(deltas, year, db)
+
+    db.execute(delete(LeaveLedgerEntry).where(*criteria))
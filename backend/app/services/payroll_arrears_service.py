@@ -0,0 +1,327 @@
+from typing import Dict, List, Optional
+from datetime import date
+from contextlib import ExitStack
+from decimal import Decimal
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, delete, func, insert, update
+from calendar import monthrange
+from app.models.employees import Employee
+from app.models.payroll_cycles import PayrollCycle, PayrollCycleStatus
+from app.models.payroll_entries import PayrollEntry
+from app.models.payroll_arrears import PayrollArrear
+from app.models.salary_components import ComponentType
+from app.services.payroll_batch import UNITS_PER_DAY, prorate, to_units, from_units
+from app.services.payroll_service import load_posted_arrears, period_components
+from app.services.payroll_locks import payroll_run_lock
+from app.services.salary_structure_index import load_salary_structure_index
+from app.services.salary_component_plan import compile_component_plan
+
+_entry_table = PayrollEntry.__table__
+
+# Sets an entry's arrears and moves its net pay by the same amount
+_apply_entry_arrears = update(_entry_table).where(
+    _entry_table.c.id == bindparam("entry_id")
+).values(
+    arrears=bindparam("entry_arrears"),
+    net_pay=_entry_table.c.gross_earnings - _entry_table.c.total_deductions + bindparam("entry_arrears")
+)
+
+
+def _month_key(year: int, month: int) -> int:
+    return year * 12 + month - 1
+
+
+def _target_cycles(
+    college_ids: List[int],
+    year: int,
+    month: int,
+    db: Session
+) -> Dict[int, PayrollCycle]:
+    """Get or create each college's open cycle for the month arrears are paid in."""
+    cycles = {
+        cycle.college_id: cycle for cycle in db.query(PayrollCycle).filter(
+            PayrollCycle.college_id.in_(college_ids),
+            PayrollCycle.year == year,
+            PayrollCycle.month == month
+        ).all()
+    }
+
+    for college_id in college_ids:
+        cycle = cycles.get(college_id)
+        if cycle is None:
+            cycles[college_id] = PayrollCycle(
+                college_id=college_id,
+                year=year,
+                month=month,
+                total_working_days=0,
+                status=PayrollCycleStatus.DRAFT
+            )
+            db.add(cycles[college_id])
+        elif cycle.status == PayrollCycleStatus.LOCKED:
+            raise ValueError(
+                f"Payroll cycle for {college_id}-{year}-{month} is locked; arrears cannot be posted"
+            )
+    db.flush()
+
+    return cycles
+
+
+def calculate_month_arrears(
+    employees: List[Employee],
+    paid: List,
+    components: Dict
+) -> np.ndarray:
+    """
+    Difference between what a month's salary structures pay now and what was paid.
+
+    Each employee keeps the LOP days of the paid entry; loss of pay is
+    recomputed on the revised gross with the payroll kernel's rounding.
+
+    Args:
+        employees: Employees paid in the month, one per row
+        paid: The paid entries' rows (gross_earnings, total_deductions,
+            lop_days, total_working_days), in the same order
+        components: employee_id -> list of component amount dictionaries
+            effective for the month
+
+    Returns:
+        Array of the net pay difference per employee in paise
+    """
+    size = len(employees)
+    gross = np.zeros(size, dtype=np.int64)
+    deductions = np.zeros(size, dtype=np.int64)
+    for row, employee in enumerate(employees):
+        for comp_data in components.get(employee.id, []):
+            if comp_data["component_type"] == ComponentType.EARNING:
+                gross[row] += to_units(comp_data["amount"])
+            else:
+                deductions[row] += to_units(comp_data["amount"])
+
+    lop_days = np.asarray([to_units(entry.lop_days) for entry in paid], dtype=np.int64)
+    working_days = np.asarray(
+        [entry.total_working_days * UNITS_PER_DAY for entry in paid], dtype=np.int64
+    )
+    paid_net = np.asarray(
+        [to_units(entry.gross_earnings - entry.total_deductions) for entry in paid],
+        dtype=np.int64
+    )
+
+    return gross - deductions - prorate(gross, lop_days, working_days) - paid_net
+
+
+def post_salary_arrears(
+    effective_from: date,
+    db: Session,
+    employee_ids: Optional[List[int]] = None,
+    college_id: Optional[int] = None,
+    as_of: Optional[date] = None
+) -> Dict:
+    """
+    Pay the arrears of a retroactive salary revision in the current cycle.
+
+    Locked cycles from the month of effective_from up to the month before
+    as_of were paid on the old structures. Their entries are found in one
+    query, the structures now effective for each month are evaluated for
+    all affected employees at once (a revision taking effect mid-month
+    counts each version for the days it was in force, see
+    SalaryStructureIndex.components_during), and the difference (less any
+    arrears already paid for that month in other cycles) is posted as one
+    payroll_arrears row per employee and month into the college's cycle
+    for as_of. Computed cycles that are not locked yet are not touched here;
+    they pick up the revision when they are recalculated.
+
+    Posting again for the same months replaces the rows previously posted
+    into the same cycle, and the cycle's existing entries get their
+    arrears and net pay updated in place.
+
+    Args:
+        effective_from: First day the revised structures apply
+        db: Database session
+        employee_ids: Employees revised (every active employee if None)
+        college_id: Only revise this college's employees
+        as_of: Date whose month the arrears are paid in (today if None)
+
+    Returns:
+        Dictionary with the month paid in, the cycles posted into, the
+        number of employees and months with arrears and their total
+
+    Raises:
+        ValueError: If a cycle the arrears are paid in is locked
+        PayrollRunInProgressError: If one of those cycles is being calculated
+    """
+    as_of = as_of or date.today()
+    target_key = _month_key(as_of.year, as_of.month)
+
+    summary = {
+        "effective_from": effective_from,
+        "year": as_of.year,
+        "month": as_of.month,
+        "payroll_cycle_ids": [],
+        "employees": 0,
+        "months": 0,
+        "total_arrears": Decimal("0.00")
+    }
+
+    employee_filter = [Employee.is_active == True]
+    if employee_ids is not None:
+        employee_filter.append(Employee.id.in_(employee_ids))
+    if college_id is not None:
+        employee_filter.append(Employee.college_id == college_id)
+
+    # Step 1: Every paid (employee, month) since the revision, in one query
+    cycle_key = PayrollCycle.year * 12 + PayrollCycle.month - 1
+    paid_rows = db.query(
+        PayrollEntry.employee_id,
+        PayrollEntry.gross_earnings,
+        PayrollEntry.total_deductions,
+        PayrollEntry.lop_days,
+        PayrollCycle.id.label("cycle_id"),
+        PayrollCycle.college_id,
+        PayrollCycle.year,
+        PayrollCycle.month,
+        PayrollCycle.total_working_days
+    ).join(
+        PayrollCycle, PayrollCycle.id == PayrollEntry.payroll_cycle_id
+    ).join(
+        Employee, Employee.id == PayrollEntry.employee_id
+    ).filter(
+        *employee_filter,
+        PayrollCycle.status == PayrollCycleStatus.LOCKED,
+        cycle_key >= _month_key(effective_from.year, effective_from.month),
+        cycle_key < target_key
+    ).order_by(
+        PayrollCycle.year, PayrollCycle.month, PayrollEntry.employee_id
+    ).all()
+
+    if not paid_rows:
+        return summary
+
+    college_ids = sorted({row.college_id for row in paid_rows})
+    affected_ids = sorted({row.employee_id for row in paid_rows})
+
+    with ExitStack() as locks:
+        for target_college_id in college_ids:
+            locks.enter_context(
+                payroll_run_lock(target_college_id, as_of.year, [as_of.month], db)
+            )
+
+        # Arrears posted into this month's open cycles are replaced; anything
+        # else posted for the same months has been settled
+        open_target_ids = [
+            row.id for row in db.query(PayrollCycle.id).filter(
+                PayrollCycle.college_id.in_(college_ids),
+                PayrollCycle.year == as_of.year,
+                PayrollCycle.month == as_of.month,
+                PayrollCycle.status != PayrollCycleStatus.LOCKED
+            ).all()
+        ]
+
+        # Step 2: Arrears already paid for those months in other cycles
+        paid_cycle_ids = sorted({row.cycle_id for row in paid_rows})
+        settled = {
+            (row.employee_id, row.arrears_cycle_id): row.amount
+            for row in db.query(
+                PayrollArrear.employee_id,
+                PayrollArrear.arrears_cycle_id,
+                func.sum(PayrollArrear.amount).label("amount")
+            ).filter(
+                PayrollArrear.employee_id.in_(affected_ids),
+                PayrollArrear.arrears_cycle_id.in_(paid_cycle_ids),
+                PayrollArrear.payroll_cycle_id.notin_(open_target_ids)
+            ).group_by(PayrollArrear.employee_id, PayrollArrear.arrears_cycle_id).all()
+        }
+
+        # Step 3: Revised structures for the whole span, evaluated month by
+        # month for every affected employee at once
+        first = paid_rows[0]
+        last = paid_rows[-1]
+        span_filter = [Employee.id.in_(affected_ids)]
+        structure_index = load_salary_structure_index(
+            span_filter,
+            date(first.year, first.month, 1),
+            date(last.year, last.month, monthrange(last.year, last.month)[1]),
+            db
+        )
+        plan = compile_component_plan(db)
+        employees = {
+            employee.id: employee
+            for employee in db.query(Employee).filter(*span_filter).all()
+        }
+
+        by_month = {}
+        for row in paid_rows:
+            by_month.setdefault((row.year, row.month), []).append(row)
+
+        arrears_rows = []
+        for (year, month), rows in by_month.items():
+            month_employees = [employees[row.employee_id] for row in rows]
+            components = period_components(
+                month_employees,
+                structure_index,
+                plan,
+                date(year, month, 1),
+                date(year, month, monthrange(year, month)[1])
+            )
+            differences = calculate_month_arrears(month_employees, rows, components)
+
+            for row, difference in zip(rows, differences):
+                amount = from_units(difference) - settled.get((row.employee_id, row.cycle_id), 0)
+                if amount:
+                    arrears_rows.append({
+                        "employee_id": row.employee_id,
+                        "college_id": row.college_id,
+                        "arrears_cycle_id": row.cycle_id,
+                        "amount": amount
+                    })
+
+        # Step 4: Replace what was posted into the target cycles for these
+        # months, then bring their existing entries up to date
+        targets = _target_cycles(
+            sorted({row["college_id"] for row in arrears_rows}),
+            as_of.year,
+            as_of.month,
+            db
+        )
+        for row in arrears_rows:
+            row["payroll_cycle_id"] = targets[row.pop("college_id")].id
+        target_ids = sorted(set(open_target_ids) | {cycle.id for cycle in targets.values()})
+
+        db.execute(
+            delete(PayrollArrear).where(
+                PayrollArrear.payroll_cycle_id.in_(open_target_ids),
+                PayrollArrear.employee_id.in_(affected_ids),
+                PayrollArrear.arrears_cycle_id.in_(paid_cycle_ids)
+            )
+        )
+        if arrears_rows:
+            db.execute(insert(PayrollArrear), arrears_rows)
+
+        posted = load_posted_arrears(target_ids, db)
+        entries = db.query(
+            PayrollEntry.id, PayrollEntry.payroll_cycle_id, PayrollEntry.employee_id
+        ).filter(
+            PayrollEntry.payroll_cycle_id.in_(target_ids),
+            PayrollEntry.employee_id.in_(affected_ids)
+        ).all()
+        entry_updates = [
+            {
+                "entry_id": entry.id,
+                "entry_arrears": posted.get(entry.payroll_cycle_id, {}).get(
+                    entry.employee_id, Decimal(0)
+                )
+            }
+            for entry in entries
+        ]
+        if entry_updates:
+            db.execute(_apply_entry_arrears, entry_updates)
+
+        db.commit()
+
+    summary.update({
+        "payroll_cycle_ids": sorted({row["payroll_cycle_id"] for row in arrears_rows}),
+        "employees": len({row["employee_id"] for row in arrears_rows}),
+        "months": len({row["arrears_cycle_id"] for row in arrears_rows}),
+        "total_arrears": sum((row["amount"] for row in arrears_rows), Decimal("0.00"))
+    })
+    return summary
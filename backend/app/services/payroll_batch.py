@@ -0,0 +1,219 @@
+from typing import Dict, List, Optional
+from decimal import Decimal
+import numpy as np
+from app.models.salary_components import ComponentType
+
+# Fixed-point scales used by the kernel: money is held in paise and day
+# counts in hundredths of a day (the precision of the Numeric(5, 2) columns).
+UNITS_PER_DAY = 100
+HALF_DAY_UNITS = UNITS_PER_DAY // 2
+
+# PayrollEntry columns produced by compute_payroll_batch
+ENTRY_FIELDS = (
+    "days_present",
+    "days_absent",
+    "paid_leaves_used",
+    "comp_leaves_used",
+    "lop_days",
+    "loss_of_pay",
+    "arrears",
+    "gross_earnings",
+    "total_deductions",
+    "net_pay",
+)
+
+
+def to_units(value) -> int:
+    """Convert a Decimal day count or rupee amount to an integer of 1/100ths."""
+    return int((Decimal(value) * 100).to_integral_value())
+
+
+def from_units(value) -> Decimal:
+    """Convert an integer of 1/100ths back to a two-place Decimal."""
+    return Decimal(int(value)).scaleb(-2)
+
+
+def prorate(amount, days, working_days):
+    """
+    The payroll rounding rule: amount * days / working_days, half-up to the paisa.
+
+    Used for loss of pay (a monthly amount prorated over LOP days) and
+    anything else paid per day. The per-day rate is never rounded on its
+    own; the product is divided once in exact integer arithmetic, so the
+    result matches ROUND(amount / working_days * days, 2) on a statement.
+    A period without working days prorates to zero.
+
+    Args:
+        amount: Monthly amount in paise (int or NumPy array)
+        days: Days to pay or deduct, in 1/100 day
+        working_days: Working days in the period, in 1/100 day
+
+    Returns:
+        Prorated amount in paise, same shape as the inputs
+    """
+    has_days = working_days > 0
+    safe_days = np.where(has_days, working_days, 1)
+    return np.where(has_days, (2 * days * amount + safe_days) // (2 * safe_days), 0)
+
+
+def build_payroll_batch(
+    employee_ids: List[int],
+    total_working_days,
+    attendance: Dict,
+    leave_balances: Dict,
+    components: Dict,
+    arrears: Optional[Dict] = None
+) -> Dict:
+    """
+    Arrange loaded payroll inputs as columnar arrays.
+
+    Args:
+        employee_ids: Employee IDs, one per row of the batch
+        total_working_days: Working days in the period, either one int for
+            the whole batch or a sequence with one value per employee
+        attendance: employee_id -> {"days_present", "weekend_work"} in
+            1/100 day (see load_attendance_counts)
+        leave_balances: employee_id -> opening leave balance dictionary
+        components: employee_id -> list of component amount dictionaries
+        arrears: employee_id -> arrears amount posted into the period
+
+    Returns:
+        Dictionary of NumPy arrays (days in 1/100 day, money in paise) plus
+        the flattened component rows for each employee
+    """
+    size = len(employee_ids)
+
+    days_present = np.zeros(size, dtype=np.int64)
+    weekend_work = np.zeros(size, dtype=np.int64)
+    paid_available = np.zeros(size, dtype=np.int64)
+    comp_available = np.zeros(size, dtype=np.int64)
+    arrears_amount = np.zeros(size, dtype=np.int64)
+    arrears = arrears or {}
+
+    component_row = []
+    component_id = []
+    component_earning = []
+    component_amount = []
+
+    for row, employee_id in enumerate(employee_ids):
+        employee_attendance = attendance.get(employee_id)
+        if employee_attendance:
+            days_present[row] = employee_attendance["days_present"]
+            weekend_work[row] = employee_attendance["weekend_work"]
+
+        balance = leave_balances.get(employee_id)
+        if balance is not None:
+            paid_available[row] = to_units(
+                balance["paid_leaves_total"] +
+                balance["carry_forward_leaves"] -
+                balance["paid_leaves_used"]
+            )
+            comp_available[row] = to_units(
+                balance["comp_leaves_earned"] -
+                balance["comp_leaves_used"]
+            )
+
+        if employee_id in arrears:
+            arrears_amount[row] = to_units(arrears[employee_id])
+
+        for comp_data in components.get(employee_id, []):
+            component_row.append(row)
+            component_id.append(comp_data["component_id"])
+            component_earning.append(comp_data["component_type"] == ComponentType.EARNING)
+            component_amount.append(to_units(comp_data["amount"]))
+
+    return {
+        "employee_id": np.asarray(employee_ids, dtype=np.int64),
+        "total_working_days": np.broadcast_to(
+            np.asarray(total_working_days, dtype=np.int64), (size,)
+        ),
+        "days_present": days_present,
+        "weekend_work": weekend_work,
+        "paid_available": paid_available,
+        "comp_available": comp_available,
+        "arrears": arrears_amount,
+        "component_row": np.asarray(component_row, dtype=np.int64),
+        "component_id": np.asarray(component_id, dtype=np.int64),
+        "component_earning": np.asarray(component_earning, dtype=bool),
+        "component_amount": np.asarray(component_amount, dtype=np.int64),
+    }
+
+
+def compute_payroll_batch(batch: Dict) -> Dict:
+    """
+    Compute payroll figures for every employee in a batch at once.
+
+    Credits weekend work as comp leave, applies the paid leave -> comp leave
+    -> loss of pay waterfall and totals earnings and deductions using
+    integer array operations. Loss of pay is gross prorated over the LOP
+    days (see prorate); arrears are paid on top of net pay.
+
+    Args:
+        batch: Arrays produced by build_payroll_batch
+
+    Returns:
+        Dictionary of NumPy arrays, one value per employee (days in 1/100
+        day, money in paise)
+    """
+    size = len(batch["employee_id"])
+    working_days = batch["total_working_days"] * UNITS_PER_DAY
+
+    days_present = batch["days_present"]
+    days_absent = working_days - days_present
+
+    # Weekend work earned this period is available immediately
+    comp_available = batch["comp_available"] + batch["weekend_work"]
+
+    # Leave waterfall: paid leaves first, then comp leaves, rest is LOP
+    remaining = np.maximum(days_absent, 0)
+    paid_leaves_used = np.minimum(remaining, np.maximum(batch["paid_available"], 0))
+    remaining = remaining - paid_leaves_used
+    comp_leaves_used = np.minimum(remaining, np.maximum(comp_available, 0))
+    lop_days = remaining - comp_leaves_used
+
+    # Earnings and deductions summed per employee
+    rows = batch["component_row"]
+    earning = batch["component_earning"]
+    amount = batch["component_amount"]
+
+    gross_earnings = np.zeros(size, dtype=np.int64)
+    component_deductions = np.zeros(size, dtype=np.int64)
+    np.add.at(gross_earnings, rows[earning], amount[earning])
+    np.add.at(component_deductions, rows[~earning], amount[~earning])
+
+    loss_of_pay = prorate(gross_earnings, lop_days, working_days)
+
+    total_deductions = component_deductions + loss_of_pay
+    net_pay = gross_earnings - total_deductions + batch["arrears"]
+
+    return {
+        "employee_id": batch["employee_id"],
+        "days_present": days_present,
+        "days_absent": days_absent,
+        "weekend_work": batch["weekend_work"],
+        "paid_leaves_used": paid_leaves_used,
+        "comp_leaves_used": comp_leaves_used,
+        "lop_days": lop_days,
+        "loss_of_pay": loss_of_pay,
+        "arrears": batch["arrears"],
+        "gross_earnings": gross_earnings,
+        "total_deductions": total_deductions,
+        "net_pay": net_pay,
+    }
+
+
+def batch_entry_values(result: Dict, row: int) -> Dict:
+    """
+    Convert one row of compute_payroll_batch output to PayrollEntry values.
+
+    Args:
+        result: Output of compute_payroll_batch
+        row: Row index
+
+    Returns:
+        Dictionary of PayrollEntry field values as Decimals
+    """
+    return {
+        field: from_units(result[field][row])
+        for field in ENTRY_FIELDS
+    }
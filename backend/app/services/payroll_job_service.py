@@ -0,0 +1,336 @@
+from typing import Dict, List, Optional
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models.colleges import College
+from app.models.payroll_cycles import PayrollCycle, PayrollCycleStatus
+from app.models.payroll_jobs import PayrollJob, PayrollJobStatus
+from app.services.payroll_service import calculate_payroll_range
+from app.services.payroll_locks import (
+    PayrollRunInProgressError,
+    ensure_payroll_run_not_in_progress
+)
+from app.config import settings
+
+# Worker pool shared by all payroll jobs of this process
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PAYROLL_JOB_WORKERS,
+    thread_name_prefix="payroll-job"
+)
+
+# (college_id, year, month) of every job of this process not yet finished,
+# so a repeated submission is refused before it is queued
+_active_cycles = set()
+_active_cycles_lock = Lock()
+
+
+def submit_payroll_job(
+    college_id: int,
+    year: int,
+    month: int,
+    db: Session,
+    employee_ids: Optional[List[int]] = None,
+    force: bool = False,
+    month_to: Optional[int] = None
+) -> PayrollJob:
+    """
+    Queue a payroll calculation to run on the background worker pool.
+
+    Args:
+        college_id: College ID
+        year: Year
+        month: Month
+        db: Database session
+        employee_ids: Employees to recalculate (all active employees if None)
+        force: Rebuild every entry even if its inputs are unchanged
+        month_to: Last month of a multi-month run (just month if None)
+
+    Returns:
+        PayrollJob object in PENDING status
+
+    Raises:
+        ValueError: If a cycle in the range is locked, or a partial run
+            targets a cycle that has not been calculated yet
+        PayrollRunInProgressError: If a job or run is already calculating
+            any of the college's cycles in the range
+    """
+    return _queue_payroll_job(
+        _executor, college_id, year, month, db, employee_ids, force, month_to
+    )
+
+
+def submit_group_payroll_jobs(
+    year: int,
+    month: int,
+    db: Session,
+    max_workers: Optional[int] = None,
+    month_to: Optional[int] = None
+) -> Dict:
+    """
+    Queue one background payroll job per college for a month (or range).
+
+    The group's jobs run on a pool of their own, so at most max_workers
+    colleges of the group are calculated at once. A college that cannot be
+    queued (locked cycle, run in progress) is reported and does not stop
+    the others.
+
+    Args:
+        year: Year
+        month: Month
+        db: Database session
+        max_workers: Maximum colleges calculated at once (defaults to and
+            is capped at settings.PAYROLL_MAX_WORKERS, as every college run
+            holds two pooled connections)
+        month_to: Last month of a multi-month run (just month if None)
+
+    Returns:
+        Dictionary with the queued PayrollJob objects and the colleges
+        that were not queued with the reason
+    """
+    college_ids = [row.id for row in db.query(College.id).order_by(College.id).all()]
+    workers = min(max_workers or settings.PAYROLL_MAX_WORKERS, settings.PAYROLL_MAX_WORKERS)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="payroll-group")
+    jobs = []
+    rejected = []
+    try:
+        for college_id in college_ids:
+            try:
+                jobs.append(_queue_payroll_job(
+                    executor, college_id, year, month, db, None, False, month_to
+                ))
+            except (ValueError, PayrollRunInProgressError) as e:
+                db.rollback()
+                rejected.append({"college_id": college_id, "error": str(e)})
+    finally:
+        # The queued jobs keep running; the pool's threads exit once they finish
+        executor.shutdown(wait=False)
+
+    return {
+        "year": year,
+        "month": month,
+        "month_to": month_to or month,
+        "jobs": jobs,
+        "rejected": rejected
+    }
+
+
+def _check_cycles(
+    college_id: int,
+    year: int,
+    months: List[int],
+    partial: bool,
+    db: Session
+) -> None:
+    """
+    Refuse a job the run itself would refuse, before it is queued.
+
+    Raises:
+        ValueError: If a cycle is locked, or a partial run targets a cycle
+            that has not been calculated yet
+    """
+    statuses = {
+        row.month: row.status for row in db.query(PayrollCycle.month, PayrollCycle.status).filter(
+            PayrollCycle.college_id == college_id,
+            PayrollCycle.year == year,
+            PayrollCycle.month.in_(months)
+        ).all()
+    }
+    for month in months:
+        if statuses.get(month) == PayrollCycleStatus.LOCKED:
+            raise ValueError(f"Payroll cycle for {college_id}-{year}-{month} is locked")
+        if partial and month not in statuses:
+            raise ValueError(
+                f"Payroll cycle for {college_id}-{year}-{month} has not been calculated yet"
+            )
+
+
+def _queue_payroll_job(
+    executor: ThreadPoolExecutor,
+    college_id: int,
+    year: int,
+    month: int,
+    db: Session,
+    employee_ids: Optional[List[int]],
+    force: bool,
+    month_to: Optional[int]
+) -> PayrollJob:
+    """Reserve a job's cycles, save it as PENDING and submit it to an executor."""
+    months = list(range(month, (month_to or month) + 1))
+    _check_cycles(college_id, year, months, employee_ids is not None, db)
+
+    cycle_keys = {(college_id, year, cycle_month) for cycle_month in months}
+    with _active_cycles_lock:
+        if _active_cycles & cycle_keys:
+            raise PayrollRunInProgressError(
+                f"A payroll run for college {college_id} {year} is already in progress"
+            )
+        _active_cycles.update(cycle_keys)
+
+    try:
+        # Runs started by other processes hold the cycles' run locks
+        ensure_payroll_run_not_in_progress(college_id, year, months, db)
+    except Exception:
+        _release_cycles(cycle_keys)
+        raise
+
+    job = PayrollJob(
+        college_id=college_id,
+        year=year,
+        month=month,
+        month_to=month_to,
+        status=PayrollJobStatus.PENDING,
+        phase="QUEUED",
+        employees_processed=0,
+        employees_total=0
+    )
+    try:
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        executor.submit(_run_payroll_job, job.id, employee_ids, force, cycle_keys)
+    except Exception:
+        _release_cycles(cycle_keys)
+        raise
+
+    return job
+
+
+def fail_interrupted_jobs() -> int:
+    """
+    Mark jobs left PENDING or RUNNING by a stopped server as FAILED.
+
+    A job whose cycles are still held by a run in another process is left
+    alone; on databases without advisory locks every unfinished job is
+    taken to be interrupted.
+
+    Returns:
+        Number of jobs marked FAILED
+    """
+    db = SessionLocal()
+    try:
+        unfinished = db.query(PayrollJob).filter(
+            PayrollJob.status.in_([PayrollJobStatus.PENDING, PayrollJobStatus.RUNNING])
+        ).all()
+
+        failed = 0
+        for job in unfinished:
+            months = list(range(job.month, (job.month_to or job.month) + 1))
+            try:
+                ensure_payroll_run_not_in_progress(job.college_id, job.year, months, db)
+            except PayrollRunInProgressError:
+                continue
+
+            # Claimed conditionally so a job that started meanwhile is kept
+            failed += db.query(PayrollJob).filter(
+                PayrollJob.id == job.id,
+                PayrollJob.status == job.status
+            ).update({
+                "status": PayrollJobStatus.FAILED,
+                "phase": "FAILED",
+                "error_message": "Interrupted by a server restart; submit the calculation again",
+                "finished_at": datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+
+        return failed
+    finally:
+        db.close()
+
+
+def _release_cycles(cycle_keys: set) -> None:
+    """Mark a job's cycles as free for the next submission."""
+    with _active_cycles_lock:
+        _active_cycles.difference_update(cycle_keys)
+
+
+def _update_job(job_id: int, **values) -> None:
+    """Write job progress in its own short transaction so readers see it immediately."""
+    db = SessionLocal()
+    try:
+        db.query(PayrollJob).filter(PayrollJob.id == job_id).update(values)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _run_payroll_job(
+    job_id: int,
+    employee_ids: Optional[List[int]],
+    force: bool,
+    cycle_keys: set
+) -> None:
+    """
+    Run a queued payroll job and record its progress and outcome.
+
+    Args:
+        job_id: PayrollJob ID
+        employee_ids: Employees to recalculate (all active employees if None)
+        force: Rebuild every entry even if its inputs are unchanged
+        cycle_keys: (college_id, year, month) of the job's cycles, released
+            when the job finishes
+    """
+    db = SessionLocal()
+    try:
+        job = db.query(PayrollJob).filter(PayrollJob.id == job_id).first()
+        college_id, year, month = job.college_id, job.year, job.month
+        month_to = job.month_to or job.month
+
+        # A job failed as interrupted before it started is not run
+        started = db.query(PayrollJob).filter(
+            PayrollJob.id == job_id,
+            PayrollJob.status == PayrollJobStatus.PENDING
+        ).update({
+            "status": PayrollJobStatus.RUNNING,
+            "phase": "STARTING",
+            "started_at": datetime.utcnow()
+        }, synchronize_session=False)
+        db.commit()
+        if not started:
+            return
+
+        def progress(cycle_id: int, phase: str, processed: int, total: int) -> None:
+            # Progress is informational; failing to record it must not fail the run
+            try:
+                _update_job(
+                    job_id,
+                    payroll_cycle_id=cycle_id,
+                    phase=phase,
+                    employees_processed=processed,
+                    employees_total=total
+                )
+            except Exception:
+                pass
+
+        calculate_payroll_range(
+            college_id,
+            year,
+            month,
+            month_to,
+            db,
+            employee_ids=employee_ids,
+            force=force,
+            progress=progress
+        )
+
+        _update_job(
+            job_id,
+            status=PayrollJobStatus.COMPLETED,
+            finished_at=datetime.utcnow()
+        )
+
+    except Exception as e:
+        _update_job(
+            job_id,
+            status=PayrollJobStatus.FAILED,
+            phase="FAILED",
+            error_message=str(e)[:1000],
+            finished_at=datetime.utcnow()
+        )
+
+    finally:
+        db.close()
+        _release_cycles(cycle_keys)
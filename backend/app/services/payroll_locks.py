@@ -0,0 +1,101 @@
+from typing import Iterator, List, Set, Tuple
+from contextlib import contextmanager
+from threading import Lock
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Advisory lock keys held by this process when the database has no
+# advisory locks (e.g. SQLite in development)
+_held_keys: Set[Tuple[int, int]] = set()
+_held_keys_lock = Lock()
+
+
+class PayrollRunInProgressError(Exception):
+    """Raised when another payroll run is already working on a cycle."""
+
+
+def _lock_keys(college_id: int, year: int, months: List[int]) -> List[Tuple[int, int]]:
+    """One (college_id, year * 100 + month) key per cycle, in a fixed order."""
+    return sorted((college_id, year * 100 + month) for month in set(months))
+
+
+@contextmanager
+def payroll_run_lock(college_id: int, year: int, months: List[int], db: Session) -> Iterator[None]:
+    """
+    Hold the run locks of a college's payroll cycles for the duration of a block.
+
+    On PostgreSQL this takes one session-level advisory lock per cycle on a
+    dedicated connection, so the locks survive the run's own commits, never
+    block other colleges, and are released by the server if the process
+    dies mid-run. Other databases fall back to a lock within this process.
+
+    Args:
+        college_id: College ID
+        year: Year
+        months: Months of the cycles the run works on
+        db: Database session whose engine holds the locks
+
+    Raises:
+        PayrollRunInProgressError: If another run holds any of the cycles
+    """
+    keys = _lock_keys(college_id, year, months)
+    bind = db.get_bind()
+
+    if bind.dialect.name != "postgresql":
+        with _held_keys_lock:
+            if _held_keys.intersection(keys):
+                raise PayrollRunInProgressError(
+                    f"A payroll run for college {college_id} {year} is already in progress"
+                )
+            _held_keys.update(keys)
+        try:
+            yield
+        finally:
+            with _held_keys_lock:
+                _held_keys.difference_update(keys)
+        return
+
+    connection = bind.connect()
+    acquired = []
+    try:
+        for key in keys:
+            locked = connection.execute(
+                text("SELECT pg_try_advisory_lock(:college_key, :cycle_key)"),
+                {"college_key": key[0], "cycle_key": key[1]}
+            ).scalar()
+            if not locked:
+                raise PayrollRunInProgressError(
+                    f"A payroll run for college {college_id} "
+                    f"{key[1] // 100}-{key[1] % 100:02d} is already in progress"
+                )
+            acquired.append(key)
+        # Session-level locks outlive the transaction; don't sit idle in one
+        connection.commit()
+
+        yield
+
+    finally:
+        for key in acquired:
+            connection.execute(
+                text("SELECT pg_advisory_unlock(:college_key, :cycle_key)"),
+                {"college_key": key[0], "cycle_key": key[1]}
+            )
+        connection.commit()
+        connection.close()
+
+
+def ensure_payroll_run_not_in_progress(college_id: int, year: int, months: List[int], db: Session) -> None:
+    """
+    Check that no run holds a college's cycles, without keeping the locks.
+
+    Args:
+        college_id: College ID
+        year: Year
+        months: Months of the cycles to check
+        db: Database session
+
+    Raises:
+        PayrollRunInProgressError: If another run holds any of the cycles
+    """
+    with payroll_run_lock(college_id, year, months, db):
+        pass
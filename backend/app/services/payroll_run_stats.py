@@ -0,0 +1,178 @@
+from typing import Dict, Iterator, List, Optional
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal
+from threading import local
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.models.payroll_cycles import PayrollCycle
+from app.models.payroll_runs import PayrollRun, PayrollRunStage
+
+# Recorder of the payroll run executing on the current thread, if any
+_current = local()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    recorder = getattr(_current, "recorder", None)
+    if recorder is not None:
+        recorder.count_statement()
+
+
+class PayrollRunRecorder:
+    """
+    Wall time, SQL statement count and row count per stage of a payroll run.
+
+    While recording, every SQL statement executed on the recording thread is
+    counted against the stage in progress. Entering the same stage again
+    (once per chunk, say) adds to its totals.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Dict] = {}
+        self.statements = 0
+        self.started_at = datetime.utcnow()
+        self._started = time.perf_counter()
+        self._stage: Optional[Dict] = None
+        self._paused = False
+
+    def __enter__(self) -> "PayrollRunRecorder":
+        _current.recorder = self
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _current.recorder = None
+
+    def count_statement(self) -> None:
+        if self._paused:
+            return
+        self.statements += 1
+        if self._stage is not None:
+            self._stage["statements"] += 1
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict]:
+        """
+        Time a block as (part of) a stage.
+
+        Yields the stage's totals; add the rows the block handled to
+        its "rows".
+        """
+        stage = self.stages.setdefault(name, {"seconds": 0.0, "statements": 0, "rows": 0})
+        outer = self._stage
+        self._stage = stage
+        started = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage["seconds"] += time.perf_counter() - started
+            self._stage = outer
+
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """Leave statements run by a block (e.g. progress reporting) uncounted."""
+        self._paused = True
+        try:
+            yield
+        finally:
+            self._paused = False
+
+    @property
+    def seconds(self) -> float:
+        return time.perf_counter() - self._started
+
+
+def save_run_stats(
+    recorder: PayrollRunRecorder,
+    college_id: int,
+    year: int,
+    month_from: int,
+    month_to: int,
+    status: str,
+    db: Session,
+    employees: int = 0,
+    chunks: int = 0,
+    entries_new: int = 0,
+    entries_updated: int = 0,
+    entries_unchanged: int = 0,
+    error_message: Optional[str] = None
+) -> None:
+    """
+    Persist a run's stage statistics as a PayrollRun with its stages.
+
+    Recording is informational: a failure here is rolled back and ignored
+    so it never fails the run itself.
+
+    Args:
+        recorder: The run's recorder
+        college_id: College ID
+        year: Year
+        month_from: First month of the run
+        month_to: Last month of the run
+        status: COMPLETED or FAILED
+        db: Database session
+        employees: Employees calculated
+        chunks: Chunks committed
+        entries_new: Entries created
+        entries_updated: Entries rewritten because their output changed
+        entries_unchanged: Entries left as stored
+        error_message: Why the run failed
+    """
+    try:
+        run = PayrollRun(
+            college_id=college_id,
+            year=year,
+            month_from=month_from,
+            month_to=month_to,
+            status=status,
+            employees=employees,
+            chunks=chunks,
+            entries_new=entries_new,
+            entries_updated=entries_updated,
+            entries_unchanged=entries_unchanged,
+            statements=recorder.statements,
+            seconds=_seconds(recorder.seconds),
+            error_message=error_message[:1000] if error_message else None,
+            started_at=recorder.started_at,
+            finished_at=datetime.utcnow(),
+            stages=[
+                PayrollRunStage(
+                    position=position,
+                    stage=name,
+                    seconds=_seconds(stage["seconds"]),
+                    statements=stage["statements"],
+                    rows=stage["rows"]
+                )
+                for position, (name, stage) in enumerate(recorder.stages.items())
+            ]
+        )
+        db.add(run)
+        db.commit()
+    except Exception:
+        db.rollback()
+
+
+def _seconds(value: float) -> Decimal:
+    return Decimal(str(round(value, 3)))
+
+
+def list_cycle_runs(cycle: PayrollCycle, db: Session, limit: int = 10) -> List[PayrollRun]:
+    """
+    Get the most recent runs that calculated a cycle, newest first.
+
+    Args:
+        cycle: PayrollCycle
+        db: Database session
+        limit: Maximum runs to return
+
+    Returns:
+        List of PayrollRun objects with their stages
+    """
+    return db.query(PayrollRun).filter(
+        PayrollRun.college_id == cycle.college_id,
+        PayrollRun.year == cycle.year,
+        PayrollRun.month_from <= cycle.month,
+        PayrollRun.month_to >= cycle.month
+    ).order_by(PayrollRun.id.desc()).limit(limit).all()
@@ -1,271 +1,1266 @@
-from typing import Optional
+from typing import Callable, Dict, List, Optional
 from decimal import Decimal
 from datetime import datetime, date
+import hashlib
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import bindparam, delete, func, insert, inspect, select, update
 from calendar import monthrange
 from app.models.payroll_cycles import PayrollCycle, PayrollCycleStatus
 from app.models.payroll_entries import PayrollEntry
 from app.models.payroll_entry_components import PayrollEntryComponent
+from app.models.payroll_arrears import PayrollArrear
+from app.models.payslips import Payslip
 from app.models.employees import Employee
-from app.models.employee_leave_balances import EmployeeLeaveBalance
-from app.models.employee_salary_structures import EmployeeSalaryStructure
+from app.models.leave_ledger_entries import LeaveTransactionType
 from app.models.attendance_records import AttendanceRecord, AttendanceStatus
-from app.models.holidays import Holiday
-from app.models.salary_components import SalaryComponent, ComponentType
-from app.utils.date_utils import get_working_days
+from app.services.payroll_batch import (
+    ENTRY_FIELDS,
+    HALF_DAY_UNITS,
+    UNITS_PER_DAY,
+    build_payroll_batch,
+    compute_payroll_batch,
+    batch_entry_values,
+    from_units
+)
+from app.services.leave_ledger_service import (
+    LEDGER_BALANCE_COLUMNS,
+    load_opening_balances,
+    create_missing_balances,
+    write_cycle_ledger,
+    reverse_cycle_ledger
+)
+from app.services.salary_structure_index import (
+    SalaryStructureIndex,
+    load_salary_structure_index
+)
+from app.services.working_calendar import get_working_calendar
+from app.services.salary_component_plan import compile_component_plan, evaluate_component_plan
+from app.services.payroll_locks import payroll_run_lock
+from app.services.payroll_run_stats import PayrollRunRecorder, save_run_stats
 from app.config import settings
 
+_entry_table = PayrollEntry.__table__
 
-def calculate_payroll(college_id: int, year: int, month: int, db: Session) -> PayrollCycle:
+# Stores the new input fingerprint of an entry whose output did not change
+_refresh_input_fingerprint = update(_entry_table).where(
+    _entry_table.c.id == bindparam("entry_id")
+).values(input_fingerprint=bindparam("entry_input_fingerprint"))
+
+
+def _employee_filters(college_id: int, employee_ids: Optional[List[int]] = None) -> List:
+    """Filter criteria selecting the college's active employees, optionally narrowed to a list."""
+    criteria = [
+        Employee.college_id == college_id,
+        Employee.is_active == True
+    ]
+    if employee_ids is not None:
+        criteria.append(Employee.id.in_(employee_ids))
+    return criteria
+
+
+def load_payroll_inputs(
+    college_id: int,
+    year: int,
+    start_date: date,
+    end_date: date,
+    db: Session,
+    employee_ids: Optional[List[int]] = None,
+    structure_index: Optional[SalaryStructureIndex] = None
+) -> Dict:
+    """
+    Load every input needed to calculate a college's payroll for one period.
+
+    Uses a fixed number of set-based queries regardless of headcount:
+    active employees, attendance counts aggregated per employee, opening
+    leave balances from the leave ledger and effective salary structures
+    joined to their components. Percentage components are then calculated
+    from the compiled component plan.
+
+    Args:
+        college_id: College ID
+        year: Year of the leave balances to load
+        start_date: First day of the period
+        end_date: Last day of the period
+        db: Database session
+        employee_ids: Only load these employees (all active employees if None)
+        structure_index: Salary structures already loaded for a range that
+            covers the period (loaded for the period if None)
+
+    Returns:
+        Dictionary with:
+        - employees: List of active Employee objects
+        - attendance: employee_id -> {"days_present", "weekend_work"} in
+          1/100 day
+        - leave_balances: employee_id -> opening leave balance dictionary
+          (see load_opening_balances)
+        - components: employee_id -> list of component amount dictionaries,
+          including calculated percentage components
+    """
+    employee_filter = _employee_filters(college_id, employee_ids)
+
+    employees = db.query(Employee).filter(
+        *employee_filter
+    ).order_by(Employee.id).all()
+
+    # Attendance counts per status, aggregated in SQL
+    attendance = load_attendance_counts(employee_filter, start_date, end_date, db).get(
+        start_date.month, {}
+    )
+
+    # Leave balances for the year as they stood at the start of the period
+    leave_balances = load_opening_balances(
+        employee_filter, [employee.id for employee in employees], year, start_date.month, db
+    )
+
+    # Effective salary structures with their components
+    if structure_index is None:
+        structure_index = load_salary_structure_index(employee_filter, start_date, end_date, db)
+
+    components = period_components(
+        employees, structure_index, compile_component_plan(db), start_date, end_date
+    )
+
+    return {
+        "employees": employees,
+        "attendance": attendance,
+        "leave_balances": leave_balances,
+        "components": components,
+    }
+
+
+def period_components(
+    employees: List[Employee],
+    structure_index: SalaryStructureIndex,
+    plan: List[Dict],
+    start_date: date,
+    end_date: date
+) -> Dict:
+    """Effective structure amounts plus the plan's percentage components for a period."""
+    components = {}
+    for employee in employees:
+        employee_components = structure_index.components_during(employee.id, start_date, end_date)
+        if employee_components:
+            components[employee.id] = employee_components
+
+    # Percentage components (PF, DA, ...) evaluated for the whole batch
+    return evaluate_component_plan(plan, employees, components)
+
+
+def load_attendance_counts(
+    employee_filter: List,
+    start_date: date,
+    end_date: date,
+    db: Session
+) -> Dict:
+    """
+    Aggregate attendance per employee and month in one grouped query.
+
+    Args:
+        employee_filter: Criteria on Employee selecting the employees
+        start_date: First day of the range
+        end_date: Last day of the range (within the same year)
+        db: Database session
+
+    Returns:
+        month -> employee_id -> {"days_present", "weekend_work"} as integers
+        in 1/100 day (a half day is HALF_DAY_UNITS)
+    """
+    present_count = func.count(AttendanceRecord.id).filter(
+        AttendanceRecord.status == AttendanceStatus.PRESENT
+    )
+    half_day_count = func.count(AttendanceRecord.id).filter(
+        AttendanceRecord.status == AttendanceStatus.HALF_DAY
+    )
+    weekend_work_count = func.count(AttendanceRecord.id).filter(
+        AttendanceRecord.status == AttendanceStatus.WEEKEND_WORK
+    )
+    record_month = func.extract("month", AttendanceRecord.date)
+
+    attendance_rows = db.query(
+        AttendanceRecord.employee_id,
+        record_month.label("month"),
+        present_count.label("present"),
+        half_day_count.label("half_day"),
+        weekend_work_count.label("weekend_work")
+    ).join(
+        Employee, Employee.id == AttendanceRecord.employee_id
+    ).filter(
+        *employee_filter,
+        AttendanceRecord.date >= start_date,
+        AttendanceRecord.date <= end_date
+    ).group_by(AttendanceRecord.employee_id, record_month).all()
+
+    attendance = {}
+    for row in attendance_rows:
+        attendance.setdefault(int(row.month), {})[row.employee_id] = {
+            "days_present": (
+                (row.present + row.weekend_work) * UNITS_PER_DAY +
+                row.half_day * HALF_DAY_UNITS
+            ),
+            "weekend_work": row.weekend_work * UNITS_PER_DAY,
+        }
+
+    return attendance
+
+
+def get_range_working_days(
+    college_id: int,
+    year: int,
+    month_from: int,
+    month_to: int,
+    db: Session
+) -> Dict:
+    """
+    Get the date range and working days of every month in a range for a college.
+
+    Working days come from the college's cached working-day calendar.
+
+    Args:
+        college_id: College ID
+        year: Year
+        month_from: First month
+        month_to: Last month
+        db: Database session
+
+    Returns:
+        month -> (start_date, end_date, total_working_days)
+    """
+    calendar = get_working_calendar(college_id, year, db)
+
+    periods = {}
+    for month in range(month_from, month_to + 1):
+        _, last_day = monthrange(year, month)
+        periods[month] = (
+            date(year, month, 1),
+            date(year, month, last_day),
+            calendar.month_working_days(month)
+        )
+
+    return periods
+
+
+def get_period_working_days(college_id: int, year: int, month: int, db: Session):
+    """
+    Get a month's date range and its working days for a college.
+
+    Args:
+        college_id: College ID
+        year: Year
+        month: Month
+        db: Database session
+
+    Returns:
+        Tuple of (start_date, end_date, total_working_days)
+    """
+    return get_range_working_days(college_id, year, month, month, db)[month]
+
+
+def compute_entries(inputs: Dict, total_working_days: int):
+    """
+    Run the payroll kernel over loaded inputs without writing anything.
+
+    Args:
+        inputs: Output of load_payroll_inputs
+        total_working_days: Working days in the period
+
+    Returns:
+        Tuple of (entry_rows, ledger_rows): a list of (employee_id, entry
+        values) tuples, the values including their output fingerprint, and
+        the leave ledger rows (employee_id, transaction_type, days) the
+        entries post
+    """
+    calculated_ids = [employee.id for employee in inputs["employees"]]
+    batch = build_payroll_batch(
+        calculated_ids,
+        total_working_days,
+        inputs["attendance"],
+        inputs["leave_balances"],
+        inputs["components"],
+        inputs.get("arrears")
+    )
+    result = compute_payroll_batch(batch)
+
+    fingerprints = inputs.get("fingerprints", {})
+    entry_rows = []
+    ledger_rows = []
+    for row, employee_id in enumerate(calculated_ids):
+        entry_values = batch_entry_values(result, row)
+        if employee_id in fingerprints:
+            entry_values["input_fingerprint"] = fingerprints[employee_id]
+        entry_values["output_fingerprint"] = payroll_output_fingerprint(
+            entry_values,
+            int(result["weekend_work"][row]),
+            inputs["components"].get(employee_id, [])
+        )
+        entry_rows.append((employee_id, entry_values))
+
+        # Leave credited and debited by this entry
+        for transaction_type, days in (
+            (LeaveTransactionType.COMP_LEAVE_EARNED, from_units(result["weekend_work"][row])),
+            (LeaveTransactionType.PAID_LEAVE_USED, entry_values["paid_leaves_used"]),
+            (LeaveTransactionType.COMP_LEAVE_USED, entry_values["comp_leaves_used"]),
+        ):
+            if days:
+                ledger_rows.append({
+                    "employee_id": employee_id,
+                    "transaction_type": transaction_type,
+                    "days": days
+                })
+
+    return entry_rows, ledger_rows
+
+
+def payroll_input_fingerprint(
+    employee: Employee,
+    total_working_days: int,
+    attendance: Optional[Dict],
+    component_amounts: List[Dict],
+    leave_balance: Optional[Dict] = None,
+    arrears: Optional[Decimal] = None
+) -> str:
+    """
+    Hash the inputs an employee's payroll entry is calculated from.
+
+    Covers the employee master fields used by payroll, the working days
+    (which reflect the college's holidays), the attendance counts, the
+    opening leave balance, the effective salary structure and the arrears
+    posted into the period. Two runs with the same fingerprint produce the
+    same entry.
+
+    Args:
+        employee: Employee object
+        total_working_days: Working days in the period
+        attendance: Dictionary with days_present and weekend_work in 1/100
+            day, or None
+        component_amounts: List of component amount dictionaries
+        leave_balance: Opening leave balance dictionary, or None
+        arrears: Arrears posted into the period, or None
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    parts = [
+        employee.id,
+        employee.college_id,
+        employee.staff_type.value if employee.staff_type else None,
+        employee.date_of_joining,
+        employee.date_of_leaving,
+        employee.actual_basic,
+        total_working_days,
+    ]
+    if attendance:
+        parts.extend([attendance["days_present"], attendance["weekend_work"]])
+    if leave_balance:
+        parts.extend([
+            leave_balance["paid_leaves_total"],
+            leave_balance["carry_forward_leaves"],
+            leave_balance["paid_leaves_used"],
+            leave_balance["comp_leaves_earned"],
+            leave_balance["comp_leaves_used"]
+        ])
+    if arrears:
+        parts.extend(["arrears", arrears])
+    for comp_data in sorted(component_amounts, key=lambda c: (c["component_id"], c["amount"])):
+        parts.extend([
+            comp_data["component_id"],
+            comp_data["component_type"].value,
+            comp_data["amount"]
+        ])
+
+    return _fingerprint(parts)
+
+
+def payroll_output_fingerprint(entry_values: Dict, weekend_work: int, component_amounts: List[Dict]) -> str:
+    """
+    Hash everything a payroll entry writes.
+
+    Covers the entry's figures, the weekend work it credits as comp leave
+    and its component rows, i.e. the entry, its components and its leave
+    ledger rows. An entry whose output fingerprint is unchanged does not
+    need to be written again.
+
+    Args:
+        entry_values: PayrollEntry values from batch_entry_values
+        weekend_work: Weekend work credited, in 1/100 day
+        component_amounts: List of component amount dictionaries
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    parts = [entry_values[field] for field in ENTRY_FIELDS]
+    parts.append(weekend_work)
+    for comp_data in sorted(component_amounts, key=lambda c: (c["component_id"], c["amount"])):
+        parts.extend([
+            comp_data["component_id"],
+            comp_data["component_type"].value,
+            comp_data["amount"]
+        ])
+
+    return _fingerprint(parts)
+
+
+def _fingerprint(parts: List) -> str:
+    """SHA-256 of the parts; equal Decimals hash alike whatever their scale."""
+    return hashlib.sha256("|".join(
+        str(part.normalize()) if isinstance(part, Decimal) else str(part) for part in parts
+    ).encode()).hexdigest()
+
+
+def load_posted_arrears(cycle_ids: List[int], db: Session) -> Dict:
+    """
+    Load the arrears posted into some cycles (see payroll_arrears_service).
+
+    Args:
+        cycle_ids: PayrollCycle IDs
+        db: Database session
+
+    Returns:
+        cycle_id -> employee_id -> total arrears paid in the cycle
+    """
+    rows = db.query(
+        PayrollArrear.payroll_cycle_id,
+        PayrollArrear.employee_id,
+        func.sum(PayrollArrear.amount).label("amount")
+    ).filter(
+        PayrollArrear.payroll_cycle_id.in_(cycle_ids)
+    ).group_by(PayrollArrear.payroll_cycle_id, PayrollArrear.employee_id).all()
+
+    posted = {}
+    for row in rows:
+        posted.setdefault(row.payroll_cycle_id, {})[row.employee_id] = row.amount
+    return posted
+
+
+def _load_stored_fingerprints(cycle_ids: List[int], db: Session) -> Dict:
+    """
+    Load the fingerprints stored on the entries of some cycles.
+
+    Args:
+        cycle_ids: PayrollCycle IDs
+        db: Database session
+
+    Returns:
+        cycle_id -> employee_id -> row with the stored entry's id,
+        input_fingerprint, output_fingerprint and the leave it used
+        (paid_leaves_used, comp_leaves_used)
+    """
+    rows = db.query(
+        PayrollEntry.id,
+        PayrollEntry.payroll_cycle_id,
+        PayrollEntry.employee_id,
+        PayrollEntry.input_fingerprint,
+        PayrollEntry.output_fingerprint,
+        PayrollEntry.paid_leaves_used,
+        PayrollEntry.comp_leaves_used
+    ).filter(PayrollEntry.payroll_cycle_id.in_(cycle_ids)).all()
+
+    stored = {}
+    for row in rows:
+        stored.setdefault(row.payroll_cycle_id, {})[row.employee_id] = row
+    return stored
+
+
+def _clean_entries(inputs: Dict, stored: Dict) -> Dict:
+    """
+    Find the employees whose stored entry is calculated from the same inputs.
+
+    Only entries that also carry an output fingerprint qualify, i.e. ones
+    written whole by this engine; their inputs decide their output, so
+    they need not be recalculated.
+
+    Args:
+        inputs: Payroll inputs with the employees' input fingerprints
+        stored: employee_id -> stored entry row (see _load_stored_fingerprints)
+
+    Returns:
+        employee_id -> stored entry row of every clean employee
+    """
+    clean = {}
+    for employee_id, fingerprint in inputs["fingerprints"].items():
+        entry = stored.get(employee_id)
+        if (
+            entry is not None
+            and entry.output_fingerprint is not None
+            and entry.input_fingerprint == fingerprint
+        ):
+            clean[employee_id] = entry
+    return clean
+
+
+def _classify_entries(entry_rows: List, stored: Dict, counts: Dict):
+    """
+    Split calculated entries into those to write and those already stored.
+
+    An entry is new if the cycle has none for the employee, unchanged if
+    the stored entry has the same output fingerprint and updated otherwise.
+    Unchanged entries whose inputs moved only get their input fingerprint
+    refreshed.
+
+    Args:
+        entry_rows: List of (employee_id, entry values) tuples
+        stored: employee_id -> stored entry row (see _load_stored_fingerprints)
+        counts: Dictionary with entries_new, entries_updated and
+            entries_unchanged, incremented in place
+
+    Returns:
+        Tuple of (entry rows to write, input fingerprint refresh parameters)
+    """
+    written = []
+    refreshed = []
+    for employee_id, values in entry_rows:
+        entry = stored.get(employee_id)
+        if entry is None:
+            counts["entries_new"] += 1
+        elif entry.output_fingerprint != values["output_fingerprint"]:
+            counts["entries_updated"] += 1
+        else:
+            counts["entries_unchanged"] += 1
+            if entry.input_fingerprint != values.get("input_fingerprint"):
+                refreshed.append({
+                    "entry_id": entry.id,
+                    "entry_input_fingerprint": values.get("input_fingerprint")
+                })
+            continue
+        written.append((employee_id, values))
+    return written, refreshed
+
+
+def calculate_payroll(
+    college_id: int,
+    year: int,
+    month: int,
+    db: Session,
+    employee_ids: Optional[List[int]] = None,
+    force: bool = False,
+    progress: Optional[Callable[[int, str, int, int], None]] = None,
+    chunk_size: Optional[int] = None
+) -> PayrollCycle:
     """
     Calculate payroll for a specific college, year, and month.
 
     This is the core payroll calculation engine that:
     1. Creates or updates a payroll cycle
     2. Calculates working days
-    3. Processes each employee's attendance
-    4. Applies leave waterfall logic
-    5. Calculates salary components
-    6. Creates payroll entries
+    3. Loads attendance, leave balances and salary structures in bulk
+    4. Applies leave waterfall logic and salary components for all
+       employees at once (see app.services.payroll_batch)
+    5. Creates payroll entries and posts their leave to the leave ledger
+
+    The number of queries issued is independent of the number of employees.
+
+    Recalculating an existing cycle is incremental: each entry stores a
+    fingerprint of its inputs and one of everything it writes. Employees
+    whose input fingerprint matches their stored entry are not recalculated
+    at all; of the rest, only entries whose output fingerprint changed (or
+    that are new to the cycle) are written back with their components and
+    leave ledger rows. Pass force=True to rebuild every entry instead.
+
+    When employee_ids is given only those employees are recalculated: their
+    entries are updated in place (or created) and their component rows are
+    replaced, while every other entry in the cycle is left untouched.
+
+    Employees are written and committed in chunks with a checkpoint on the
+    cycle, so an interrupted run resumes where it stopped
+    (see calculate_payroll_range).
 
     Args:
         college_id: College ID
         year: Year
         month: Month
         db: Database session
+        employee_ids: Employees to recalculate (all active employees if None)
+        force: Rebuild every entry even if its inputs are unchanged
+        progress: Optional callback called as progress(cycle_id, phase,
+            employees_processed, employees_total) when a phase starts
+        chunk_size: Employees per committed chunk
+            (defaults to settings.PAYROLL_CHUNK_SIZE)
 
     Returns:
         PayrollCycle object
     """
-    # Step 1: Get or create PayrollCycle
-    cycle = db.query(PayrollCycle).filter(
-        PayrollCycle.college_id == college_id,
-        PayrollCycle.year == year,
-        PayrollCycle.month == month
-    ).first()
+    return calculate_payroll_range(
+        college_id, year, month, month, db,
+        employee_ids=employee_ids,
+        force=force,
+        progress=progress,
+        chunk_size=chunk_size
+    )[0]
 
-    if cycle:
-        if cycle.status == PayrollCycleStatus.LOCKED:
-            raise ValueError(f"Payroll cycle for {college_id}-{year}-{month} is locked")
 
-        # Delete existing entries if recalculating
-        db.query(PayrollEntry).filter(PayrollEntry.payroll_cycle_id == cycle.id).delete()
-        db.commit()
-    else:
-        cycle = PayrollCycle(
-            college_id=college_id,
-            year=year,
-            month=month,
-            total_working_days=0,
-            status=PayrollCycleStatus.DRAFT
-        )
-        db.add(cycle)
-        db.flush()
+def calculate_payroll_range(
+    college_id: int,
+    year: int,
+    month_from: int,
+    month_to: int,
+    db: Session,
+    employee_ids: Optional[List[int]] = None,
+    force: bool = False,
+    progress: Optional[Callable[[int, str, int, int], None]] = None,
+    chunk_size: Optional[int] = None
+) -> List[PayrollCycle]:
+    """
+    Calculate payroll for a college over a range of months of one year.
 
-    # Update status to PROCESSING
-    cycle.status = PayrollCycleStatus.PROCESSING
-    db.commit()
+    Holidays, employees, attendance, salary structures and leave balances
+    for the whole range are loaded once. Months are calculated in order with
+    each month's leave carried forward to the next in memory. Per month this
+    behaves like calculate_payroll (incremental, partial or forced).
 
-    try:
-        # Step 2: Get holidays for this college and month
-        start_date = date(year, month, 1)
-        _, last_day = monthrange(year, month)
-        end_date = date(year, month, last_day)
-
-        holidays = db.query(Holiday).filter(
-            Holiday.college_id == college_id,
-            Holiday.date >= start_date,
-            Holiday.date <= end_date
-        ).all()
-
-        holiday_dates = [h.date for h in holidays]
-
-        # Step 3: Calculate total working days
-        total_working_days = get_working_days(
-            year,
-            month,
-            holiday_dates,
-            settings.WEEKEND_DAYS
+    Employees are processed in chunks in employee ID order. Each chunk's
+    entries and ledger rows for every month are written and committed
+    together, and the last employee committed is recorded on the cycles as
+    a checkpoint. If a run fails or is killed the cycles stay DRAFT with
+    their checkpoint, and the next run resumes after it; force=True starts
+    over instead. Cycles are marked COMPLETED only once every chunk is in.
+
+    The run holds a lock on each of the college's cycles in the range (see
+    app.services.payroll_locks), so a second run of the same cycles fails
+    immediately while other colleges calculate in parallel.
+
+    Args:
+        college_id: College ID
+        year: Year
+        month_from: First month
+        month_to: Last month
+        db: Database session
+        employee_ids: Employees to recalculate (all active employees if None)
+        force: Rebuild every entry even if its inputs are unchanged
+        progress: Optional callback called as progress(cycle_id, phase,
+            employees_processed, employees_total) when a phase starts;
+            employee counts cover every month of the range
+        chunk_size: Employees per committed chunk
+            (defaults to settings.PAYROLL_CHUNK_SIZE)
+
+    Returns:
+        List of PayrollCycle objects, one per month
+
+    Raises:
+        ValueError: If the range is invalid, a cycle is locked, or a partial
+            recalculation targets a cycle that has not been calculated
+        PayrollRunInProgressError: If another run is calculating any of
+            the college's cycles in the range
+    """
+    if not 1 <= month_from <= month_to <= 12:
+        raise ValueError(f"Invalid month range {month_from}-{month_to}")
+
+    with payroll_run_lock(college_id, year, list(range(month_from, month_to + 1)), db):
+        return _calculate_payroll_range(
+            college_id, year, month_from, month_to, db,
+            employee_ids, force, progress, chunk_size
         )
 
-        cycle.total_working_days = total_working_days
-        db.commit()
 
-        # Step 4: Get all active employees for this college
-        employees = db.query(Employee).filter(
-            Employee.college_id == college_id,
-            Employee.is_active == True
-        ).all()
-
-        # Step 5: Process each employee
-        for employee in employees:
-            # Get attendance records for the month
-            attendance_records = db.query(AttendanceRecord).filter(
-                AttendanceRecord.employee_id == employee.id,
-                AttendanceRecord.date >= start_date,
-                AttendanceRecord.date <= end_date
+def _calculate_payroll_range(
+    college_id: int,
+    year: int,
+    month_from: int,
+    month_to: int,
+    db: Session,
+    employee_ids: Optional[List[int]] = None,
+    force: bool = False,
+    progress: Optional[Callable[[int, str, int, int], None]] = None,
+    chunk_size: Optional[int] = None
+) -> List[PayrollCycle]:
+    """Calculate a range of months; the caller holds the cycles' run locks."""
+    with PayrollRunRecorder() as recorder:
+        run = {
+            "employees": 0,
+            "chunks": 0,
+            "entries_new": 0,
+            "entries_updated": 0,
+            "entries_unchanged": 0,
+        }
+        try:
+            cycles = _run_payroll_range(
+                college_id, year, month_from, month_to, db,
+                employee_ids, force, progress, chunk_size, recorder, run
+            )
+        except Exception as e:
+            with recorder.paused():
+                save_run_stats(
+                    recorder, college_id, year, month_from, month_to, "FAILED", db,
+                    error_message=str(e), **run
+                )
+            raise
+
+        with recorder.paused():
+            save_run_stats(
+                recorder, college_id, year, month_from, month_to, "COMPLETED", db, **run
+            )
+        return cycles
+
+
+def _run_payroll_range(
+    college_id: int,
+    year: int,
+    month_from: int,
+    month_to: int,
+    db: Session,
+    employee_ids: Optional[List[int]],
+    force: bool,
+    progress: Optional[Callable[[int, str, int, int], None]],
+    chunk_size: Optional[int],
+    recorder: PayrollRunRecorder,
+    run: Dict
+) -> List[PayrollCycle]:
+    """Body of a payroll run, timing each stage on the run's recorder."""
+    months = list(range(month_from, month_to + 1))
+    partial = employee_ids is not None
+    chunk_size = max(chunk_size or settings.PAYROLL_CHUNK_SIZE, 1)
+    report_cycle_id = None
+
+    def report(phase: str, processed: int = 0, total: int = 0) -> None:
+        if progress:
+            with recorder.paused():
+                progress(report_cycle_id, phase, processed, total)
+
+    def commit() -> None:
+        with recorder.stage("commit"):
+            db.commit()
+
+    # Step 1: Get or create the PayrollCycles
+    with recorder.stage("cycle_setup") as stage:
+        cycles = {
+            cycle.month: cycle for cycle in db.query(PayrollCycle).filter(
+                PayrollCycle.college_id == college_id,
+                PayrollCycle.year == year,
+                PayrollCycle.month >= month_from,
+                PayrollCycle.month <= month_to
             ).all()
+        }
 
-            # Calculate days present and weekend work
-            days_present = Decimal(0)
-            weekend_work_count = Decimal(0)
-
-            for record in attendance_records:
-                if record.status == AttendanceStatus.PRESENT:
-                    days_present += Decimal(1)
-                elif record.status == AttendanceStatus.HALF_DAY:
-                    days_present += Decimal("0.5")
-                elif record.status == AttendanceStatus.WEEKEND_WORK:
-                    weekend_work_count += Decimal(1)
-                    days_present += Decimal(1)
-
-            # Calculate days absent (only counting working days)
-            days_absent = Decimal(total_working_days) - days_present
-
-            # Get or create employee leave balance for this year
-            leave_balance = db.query(EmployeeLeaveBalance).filter(
-                EmployeeLeaveBalance.employee_id == employee.id,
-                EmployeeLeaveBalance.year == year
-            ).first()
-
-            if not leave_balance:
-                # Create leave balance if it doesn't exist
-                leave_balance = EmployeeLeaveBalance(
-                    employee_id=employee.id,
-                    year=year,
-                    paid_leaves_total=Decimal(settings.DEFAULT_PAID_LEAVES_PER_YEAR),
-                    paid_leaves_used=Decimal(0),
-                    comp_leaves_earned=Decimal(0),
-                    comp_leaves_used=Decimal(0),
-                    carry_forward_leaves=Decimal(0)
+        for month in months:
+            cycle = cycles.get(month)
+            if cycle and cycle.status == PayrollCycleStatus.LOCKED:
+                raise ValueError(f"Payroll cycle for {college_id}-{year}-{month} is locked")
+            if cycle is None and partial:
+                raise ValueError(
+                    f"Payroll cycle for {college_id}-{year}-{month} has not been calculated yet"
                 )
-                db.add(leave_balance)
-                db.flush()
-
-            # Credit comp leaves for weekend work
-            leave_balance.comp_leaves_earned += weekend_work_count
-
-            # Apply leave waterfall for absences
-            remaining_absences = days_absent
-            paid_leaves_used = Decimal(0)
-            comp_leaves_used = Decimal(0)
-            unpaid_leaves = Decimal(0)
-
-            # Calculate available leaves
-            paid_leaves_available = (
-                leave_balance.paid_leaves_total +
-                leave_balance.carry_forward_leaves -
-                leave_balance.paid_leaves_used
-            )
-            comp_leaves_available = (
-                leave_balance.comp_leaves_earned -
-                leave_balance.comp_leaves_used
+
+        # An interrupted run is resumed after the checkpoint every cycle reached
+        resume_after = 0
+        if not partial and not force and len(cycles) == len(months):
+            resume_after = min(cycle.checkpoint_employee_id or 0 for cycle in cycles.values())
+
+        if force and not partial and cycles:
+            # Delete existing entries if rebuilding
+            for cycle in cycles.values():
+                _delete_entries(cycle.id, db)
+                cycle.checkpoint_employee_id = None
+            commit()
+
+        # Entries are updated in place unless the cycles are being rebuilt
+        in_place = partial or not force
+
+        # A failed in-place run leaves the rest of each cycle as it was
+        # (PROCESSING is only left behind by a run that was killed)
+        previous_status = {
+            month: (
+                cycle.status
+                if in_place and cycle.status != PayrollCycleStatus.PROCESSING
+                else PayrollCycleStatus.DRAFT
             )
+            for month, cycle in cycles.items()
+        }
 
-            # First, use paid leaves
-            if remaining_absences > 0 and paid_leaves_available > 0:
-                used = min(remaining_absences, paid_leaves_available)
-                paid_leaves_used = used
-                remaining_absences -= used
-
-            # Then, use comp leaves
-            if remaining_absences > 0 and comp_leaves_available > 0:
-                used = min(remaining_absences, comp_leaves_available)
-                comp_leaves_used = used
-                remaining_absences -= used
-
-            # Remaining are unpaid leaves
-            unpaid_leaves = remaining_absences
-
-            # Calculate per-day salary
-            per_day_salary = employee.monthly_gross / Decimal(total_working_days)
-
-            # Calculate loss of pay
-            loss_of_pay = unpaid_leaves * per_day_salary
-
-            # Get employee's salary structure (active components)
-            salary_structures = db.query(EmployeeSalaryStructure).filter(
-                EmployeeSalaryStructure.employee_id == employee.id,
-                EmployeeSalaryStructure.effective_from <= end_date,
-                and_(
-                    EmployeeSalaryStructure.effective_to.is_(None) |
-                    (EmployeeSalaryStructure.effective_to >= start_date)
+        for month in months:
+            if month not in cycles:
+                cycles[month] = PayrollCycle(
+                    college_id=college_id,
+                    year=year,
+                    month=month,
+                    total_working_days=0,
+                    status=PayrollCycleStatus.DRAFT
                 )
-            ).all()
+                db.add(cycles[month])
+                previous_status[month] = PayrollCycleStatus.DRAFT
 
-            # Calculate earnings and deductions
-            gross_earnings = Decimal(0)
-            total_deductions = Decimal(0)
-            component_amounts = []
+        # Update status to PROCESSING
+        for cycle in cycles.values():
+            cycle.status = PayrollCycleStatus.PROCESSING
+        stage["rows"] += len(cycles)
+    commit()
+    report_cycle_id = cycles[month_from].id
+    report("LOADING_INPUTS")
 
-            for structure in salary_structures:
-                component = structure.salary_component
-                amount = structure.amount
+    chunks_committed = False
+    try:
+        # Steps 2-3: Get holidays and calculate total working days
+        with recorder.stage("holiday_load") as stage:
+            periods = get_range_working_days(college_id, year, month_from, month_to, db)
 
-                component_amounts.append({
-                    "component_id": component.id,
-                    "component_type": component.component_type,
-                    "amount": amount
-                })
+            for month, cycle in cycles.items():
+                cycle.total_working_days = periods[month][2]
+            stage["rows"] += len(periods)
+        commit()
+
+        # Step 4: Load employees, attendance, structures and leave balances
+        # for the whole range
+        range_start = periods[month_from][0]
+        range_end = periods[month_to][1]
+        employee_filter = _employee_filters(college_id, employee_ids)
+
+        with recorder.stage("employee_load") as stage:
+            employees = db.query(Employee).filter(
+                *employee_filter
+            ).order_by(Employee.id).all()
+            active_ids = [employee.id for employee in employees]
+            stage["rows"] += len(employees)
 
-                if component.component_type == ComponentType.EARNING:
-                    gross_earnings += amount
-                else:
-                    total_deductions += amount
-
-            # Add loss of pay to deductions
-            total_deductions += loss_of_pay
-
-            # Calculate net pay
-            net_pay = gross_earnings - total_deductions
-
-            # Create PayrollEntry
-            payroll_entry = PayrollEntry(
-                payroll_cycle_id=cycle.id,
-                employee_id=employee.id,
-                days_present=days_present,
-                days_absent=days_absent,
-                paid_leaves_used=paid_leaves_used,
-                comp_leaves_used=comp_leaves_used,
-                unpaid_leaves=unpaid_leaves,
-                loss_of_pay=loss_of_pay,
-                gross_earnings=gross_earnings,
-                total_deductions=total_deductions,
-                net_pay=net_pay
+        with recorder.stage("attendance_aggregation") as stage:
+            attendance = load_attendance_counts(employee_filter, range_start, range_end, db)
+            stage["rows"] += sum(len(month_attendance) for month_attendance in attendance.values())
+
+        with recorder.stage("structure_load"):
+            structure_index = load_salary_structure_index(employee_filter, range_start, range_end, db)
+            plan = compile_component_plan(db)
+
+        with recorder.stage("leave_balance_load") as stage:
+            balances = load_opening_balances(
+                employee_filter, [employee.id for employee in employees], year, month_from, db
             )
+            stage["rows"] += len(balances)
+
+        with recorder.stage("stored_entry_load") as stage:
+            stored_fingerprints = _load_stored_fingerprints(
+                [cycle.id for cycle in cycles.values()], db
+            )
+            posted_arrears = load_posted_arrears([cycle.id for cycle in cycles.values()], db)
+            stage["rows"] += sum(len(stored) for stored in stored_fingerprints.values())
+
+        # Employees past the checkpoint, split into chunks
+        pending = [
+            employee for employee, employee_id in zip(employees, active_ids)
+            if employee_id > resume_after
+        ]
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        if not partial:
+            chunks_done = 0
+            if resume_after:
+                chunks_done = min(cycle.chunks_completed for cycle in cycles.values())
+            for cycle in cycles.values():
+                cycle.chunks_completed = chunks_done
+                cycle.chunks_total = chunks_done + len(chunks)
+
+        total = len(pending) * len(months)
+        processed = 0
+        for position, chunk in enumerate(chunks):
+            if position:
+                # The previous chunk's commit expired these employees; reload
+                # them in one query instead of one query per employee (their
+                # identity keys are read without touching expired attributes)
+                with recorder.stage("employee_load"):
+                    db.query(Employee).filter(
+                        Employee.id.in_([inspect(employee).identity[0] for employee in chunk])
+                    ).all()
+
+            # Step 5: Compute each month of the chunk as one columnar batch,
+            # carrying leave forward from month to month; the chunk's entry
+            # counts join the run's only once the chunk is committed
+            carried = {employee.id: dict(balances[employee.id]) for employee in chunk}
+            chunk_counts = {"entries_new": 0, "entries_updated": 0, "entries_unchanged": 0}
+            month_writes = []
+            ledger_rows = []
+            for month in months:
+                cycle = cycles[month]
+                report_cycle_id = cycle.id
+                report("CALCULATING", processed, total)
+
+                with recorder.stage("leave_waterfall") as stage:
+                    start_date, end_date, total_working_days = periods[month]
+                    inputs = {
+                        "employees": chunk,
+                        "attendance": attendance.get(month, {}),
+                        "leave_balances": {
+                            employee_id: dict(balance) for employee_id, balance in carried.items()
+                        },
+                        "components": period_components(
+                            chunk, structure_index, plan, start_date, end_date
+                        ),
+                        "arrears": posted_arrears.get(cycle.id, {}),
+                    }
+                    inputs["fingerprints"] = {
+                        employee.id: payroll_input_fingerprint(
+                            employee,
+                            total_working_days,
+                            inputs["attendance"].get(employee.id),
+                            inputs["components"].get(employee.id, []),
+                            inputs["leave_balances"][employee.id],
+                            inputs["arrears"].get(employee.id)
+                        )
+                        for employee in chunk
+                    }
+
+                    # Employees whose stored entry was calculated from the
+                    # same inputs are not recalculated; their stored leave is
+                    # carried forward instead
+                    stored = stored_fingerprints.get(cycle.id, {}) if in_place else {}
+                    if not force:
+                        clean = _clean_entries(inputs, stored)
+                        inputs["employees"] = [
+                            employee for employee in chunk if employee.id not in clean
+                        ]
+                        chunk_counts["entries_unchanged"] += len(clean)
+                        for employee_id, entry in clean.items():
+                            balance = carried[employee_id]
+                            weekend_work = inputs["attendance"].get(employee_id, {}).get("weekend_work", 0)
+                            balance["comp_leaves_earned"] += from_units(weekend_work)
+                            balance["paid_leaves_used"] += entry.paid_leaves_used
+                            balance["comp_leaves_used"] += entry.comp_leaves_used
 
-            db.add(payroll_entry)
-            db.flush()
+                    entry_rows, month_ledger = compute_entries(inputs, total_working_days)
 
-            # Create PayrollEntryComponent records
-            for comp_data in component_amounts:
-                entry_component = PayrollEntryComponent(
-                    payroll_entry_id=payroll_entry.id,
-                    salary_component_id=comp_data["component_id"],
-                    component_type=comp_data["component_type"],
-                    amount=comp_data["amount"]
+                    # Next month opens with this month's leave posted
+                    for row in month_ledger:
+                        column = LEDGER_BALANCE_COLUMNS[row["transaction_type"]]
+                        carried[row["employee_id"]][column] += row["days"]
+
+                    # Only entries whose output changed are written back
+                    entry_rows, refreshed = _classify_entries(entry_rows, stored, chunk_counts)
+                    selected = {employee_id for employee_id, _ in entry_rows}
+
+                    month_writes.append((cycle, entry_rows, inputs["components"], refreshed))
+                    ledger_rows.extend(
+                        {"payroll_cycle_id": cycle.id, **row}
+                        for row in month_ledger
+                        if row["employee_id"] in selected
+                    )
+                    stage["rows"] += len(chunk)
+                processed += len(chunk)
+
+            # Step 6: Write the chunk's entries, components and leave ledger
+            # rows in bulk and commit them with the checkpoint
+            report("WRITING_ENTRIES", processed, total)
+
+            with recorder.stage("entry_writes") as stage:
+                recalculated = []
+                for cycle, entry_rows, components, refreshed in month_writes:
+                    written_ids = [employee_id for employee_id, _ in entry_rows]
+                    existing_entries = {}
+                    if in_place:
+                        existing_entries = _prepare_existing_entries(cycle.id, written_ids, db)
+                    _write_entries(cycle.id, entry_rows, existing_entries, components, db)
+                    if refreshed:
+                        db.execute(_refresh_input_fingerprint, refreshed)
+                    recalculated.append((cycle.id, cycle.month, written_ids))
+                    stage["rows"] += len(entry_rows)
+
+            with recorder.stage("ledger_writes") as stage:
+                create_missing_balances(
+                    {employee.id: balances[employee.id] for employee in chunk}, year, db
                 )
-                db.add(entry_component)
+                write_cycle_ledger(year, recalculated, ledger_rows, balances, db)
+                stage["rows"] += len(ledger_rows)
 
-            # Update leave balance
-            leave_balance.paid_leaves_used += paid_leaves_used
-            leave_balance.comp_leaves_used += comp_leaves_used
+            if not partial:
+                for cycle in cycles.values():
+                    cycle.checkpoint_employee_id = chunk[-1].id
+                    cycle.chunks_completed += 1
+                chunks_committed = True
+            commit()
+            run["employees"] += len(chunk)
+            run["chunks"] += 1
+            for key, count in chunk_counts.items():
+                run[key] += count
 
-        # Step 6: Mark cycle as completed
-        cycle.status = PayrollCycleStatus.COMPLETED
-        db.commit()
+        # Step 7: Remove entries of employees no longer active, then mark the
+        # cycles as completed once every chunk is in
+        with recorder.stage("cleanup") as stage:
+            active = set(active_ids)
+            for month, cycle in cycles.items():
+                removed_ids = [
+                    employee_id for employee_id in stored_fingerprints.get(cycle.id, {})
+                    if employee_id not in active
+                    and (not partial or employee_id in employee_ids)
+                ]
+                if removed_ids:
+                    _delete_entries(cycle.id, db, removed_ids)
+                    stage["rows"] += len(removed_ids)
+
+                if partial:
+                    # A partial run never finishes a cycle: one left DRAFT by
+                    # an interrupted or failed full run stays DRAFT
+                    cycle.status = previous_status[month]
+                    continue
 
-        return cycle
+                if cycle.chunks_completed != cycle.chunks_total:
+                    raise ValueError(
+                        f"Payroll cycle {cycle.id} has {cycle.chunks_completed} of "
+                        f"{cycle.chunks_total} chunks"
+                    )
+                cycle.status = PayrollCycleStatus.COMPLETED
+                cycle.checkpoint_employee_id = None
+        commit()
+        report("COMPLETED", total, total)
+
+        return [cycles[month] for month in months]
 
     except Exception as e:
-        # Rollback on error
+        # Rollback the chunk in progress; committed chunks stay and the
+        # cycles are left DRAFT so the next run resumes after them
         db.rollback()
-        cycle.status = PayrollCycleStatus.DRAFT
+        for month, cycle in cycles.items():
+            if chunks_committed or (not partial and cycle.checkpoint_employee_id):
+                cycle.status = PayrollCycleStatus.DRAFT
+            else:
+                cycle.status = previous_status[month]
         db.commit()
         raise e
 
 
+def preview_payroll(
+    college_id: int,
+    year: int,
+    month: int,
+    db: Session,
+    employee_ids: Optional[List[int]] = None
+) -> Dict:
+    """
+    Run the payroll engine in memory and compare it with the stored cycle.
+
+    Nothing is written: the cycle status, payroll entries and leave balances
+    are left as they are. Leave is taken from the same opening balances a
+    real run would use, including the default balance for employees who
+    have none for the year yet.
+
+    Args:
+        college_id: College ID
+        year: Year
+        month: Month
+        db: Database session
+        employee_ids: Employees to preview (all active employees if None)
+
+    Returns:
+        Dictionary with the computed entries, each carrying its change
+        against the stored entry ("NEW", "CHANGED", "UNCHANGED") and the
+        differing fields, plus stored entries that would be removed
+    """
+    start_date, end_date, total_working_days = get_period_working_days(
+        college_id, year, month, db
+    )
+
+    inputs = load_payroll_inputs(
+        college_id, year, start_date, end_date, db, employee_ids
+    )
+
+    cycle = db.query(PayrollCycle).filter(
+        PayrollCycle.college_id == college_id,
+        PayrollCycle.year == year,
+        PayrollCycle.month == month
+    ).first()
+    if cycle:
+        inputs["arrears"] = load_posted_arrears([cycle.id], db).get(cycle.id, {})
+
+    entry_rows, _ = compute_entries(inputs, total_working_days)
+
+    # Currently stored entries and component amounts, one query each
+    stored_entries = {}
+    stored_components = {}
+    if cycle:
+        entry_query = db.query(PayrollEntry).filter(PayrollEntry.payroll_cycle_id == cycle.id)
+        component_query = db.query(
+            PayrollEntry.employee_id,
+            PayrollEntryComponent.salary_component_id,
+            PayrollEntryComponent.amount
+        ).join(
+            PayrollEntry, PayrollEntry.id == PayrollEntryComponent.payroll_entry_id
+        ).filter(PayrollEntry.payroll_cycle_id == cycle.id)
+
+        if employee_ids is not None:
+            entry_query = entry_query.filter(PayrollEntry.employee_id.in_(employee_ids))
+            component_query = component_query.filter(PayrollEntry.employee_id.in_(employee_ids))
+
+        stored_entries = {entry.employee_id: entry for entry in entry_query.all()}
+        for row in component_query.all():
+            stored_components.setdefault(row.employee_id, {})[row.salary_component_id] = row.amount
+
+    entries = []
+    counts = {"NEW": 0, "CHANGED": 0, "UNCHANGED": 0}
+    for employee_id, values in entry_rows:
+        components = {
+            comp_data["component_id"]: comp_data
+            for comp_data in inputs["components"].get(employee_id, [])
+        }
+        differences = {}
+        stored = stored_entries.get(employee_id)
+
+        if stored is None:
+            change = "NEW"
+        else:
+            for field in ENTRY_FIELDS:
+                if getattr(stored, field) != values[field]:
+                    differences[field] = {
+                        "stored": getattr(stored, field),
+                        "calculated": values[field]
+                    }
+
+            old_amounts = stored_components.get(employee_id, {})
+            for component_id in sorted(set(old_amounts) | set(components)):
+                old_amount = old_amounts.get(component_id)
+                new_amount = components[component_id]["amount"] if component_id in components else None
+                if old_amount != new_amount:
+                    differences[f"component_{component_id}"] = {
+                        "stored": old_amount,
+                        "calculated": new_amount
+                    }
+
+            change = "CHANGED" if differences else "UNCHANGED"
+
+        counts[change] += 1
+        entries.append({
+            "employee_id": employee_id,
+            **{field: values[field] for field in ENTRY_FIELDS},
+            "components": [
+                {
+                    "salary_component_id": comp_data["component_id"],
+                    "component_type": comp_data["component_type"],
+                    "amount": comp_data["amount"]
+                }
+                for comp_data in components.values()
+            ],
+            "change": change,
+            "differences": differences
+        })
+
+    calculated_ids = {employee_id for employee_id, _ in entry_rows}
+    removed_ids = sorted(set(stored_entries) - calculated_ids)
+
+    return {
+        "college_id": college_id,
+        "year": year,
+        "month": month,
+        "payroll_cycle_id": cycle.id if cycle else None,
+        "total_working_days": total_working_days,
+        "new": counts["NEW"],
+        "changed": counts["CHANGED"],
+        "unchanged": counts["UNCHANGED"],
+        "removed_employee_ids": removed_ids,
+        "entries": entries
+    }
+
+
+def _prepare_existing_entries(cycle_id: int, employee_ids: List[int], db: Session) -> Dict[int, int]:
+    """
+    Get the listed employees' existing entries ready to be recalculated.
+
+    Component rows of those entries are deleted so they can be re-linked.
+
+    Args:
+        cycle_id: PayrollCycle ID
+        employee_ids: Employees being recalculated
+        db: Database session
+
+    Returns:
+        Dictionary of employee_id -> PayrollEntry ID to update in place
+    """
+    if not employee_ids:
+        return {}
+
+    entries = db.query(PayrollEntry.id, PayrollEntry.employee_id).filter(
+        PayrollEntry.payroll_cycle_id == cycle_id,
+        PayrollEntry.employee_id.in_(employee_ids)
+    ).all()
+
+    existing_entries = {entry.employee_id: entry.id for entry in entries}
+
+    if existing_entries:
+        db.execute(
+            delete(PayrollEntryComponent).where(
+                PayrollEntryComponent.payroll_entry_id.in_(list(existing_entries.values()))
+            )
+        )
+
+    return existing_entries
+
+
+def _delete_entries(cycle_id: int, db: Session, employee_ids: Optional[List[int]] = None) -> None:
+    """
+    Delete a cycle's entries with their components and payslips in set-based statements.
+
+    The leave the entries posted is taken back out of the leave balances.
+
+    Args:
+        cycle_id: PayrollCycle ID
+        db: Database session
+        employee_ids: Only delete these employees' entries (all entries if None)
+    """
+    entry_ids = select(PayrollEntry.id).where(PayrollEntry.payroll_cycle_id == cycle_id)
+    if employee_ids is not None:
+        entry_ids = entry_ids.where(PayrollEntry.employee_id.in_(employee_ids))
+
+    db.execute(
+        delete(PayrollEntryComponent).where(PayrollEntryComponent.payroll_entry_id.in_(entry_ids))
+    )
+    db.execute(
+        delete(Payslip).where(Payslip.payroll_entry_id.in_(entry_ids))
+    )
+    db.execute(
+        delete(PayrollEntry).where(PayrollEntry.id.in_(entry_ids)),
+        execution_options={"synchronize_session": False}
+    )
+    reverse_cycle_ledger(cycle_id, db, employee_ids)
+
+
+def _write_entries(
+    cycle_id: int,
+    entry_rows: List,
+    existing_entries: Dict[int, int],
+    components: Dict,
+    db: Session
+) -> None:
+    """
+    Persist calculated entries and their components with batched statements.
+
+    New entries are inserted with one multi-row INSERT ... RETURNING to get
+    their IDs, existing entries are updated with one executemany UPDATE and
+    all component rows are inserted in a single batch.
+
+    Args:
+        cycle_id: PayrollCycle ID
+        entry_rows: List of (employee_id, entry values) tuples
+        existing_entries: employee_id -> PayrollEntry ID to update in place
+        components: employee_id -> list of component amount dictionaries
+        db: Database session
+    """
+    entry_ids = dict(existing_entries)
+
+    new_rows = [
+        {"payroll_cycle_id": cycle_id, "employee_id": employee_id, **values}
+        for employee_id, values in entry_rows
+        if employee_id not in existing_entries
+    ]
+    updated_rows = [
+        {"id": existing_entries[employee_id], **values}
+        for employee_id, values in entry_rows
+        if employee_id in existing_entries
+    ]
+
+    if new_rows:
+        inserted = db.execute(
+            insert(PayrollEntry).returning(PayrollEntry.id, PayrollEntry.employee_id),
+            new_rows
+        )
+        entry_ids.update({row.employee_id: row.id for row in inserted})
+
+    if updated_rows:
+        db.execute(update(PayrollEntry), updated_rows)
+
+    component_rows = [
+        {
+            "payroll_entry_id": entry_ids[employee_id],
+            "salary_component_id": comp_data["component_id"],
+            "component_type": comp_data["component_type"],
+            "amount": comp_data["amount"]
+        }
+        for employee_id, _ in entry_rows
+        for comp_data in components.get(employee_id, [])
+    ]
+
+    if component_rows:
+        db.execute(insert(PayrollEntryComponent), component_rows)
+
+
 def lock_payroll_cycle(cycle_id: int, db: Session) -> PayrollCycle:
     """
     Lock a payroll cycle to prevent further modifications.
@@ -276,20 +1271,27 @@ def lock_payroll_cycle(cycle_id: int, db: Session) -> PayrollCycle:
 
     Returns:
         PayrollCycle object
+
+    Raises:
+        ValueError: If the cycle does not exist or is not COMPLETED
+        PayrollRunInProgressError: If the cycle is being calculated
     """
     cycle = db.query(PayrollCycle).filter(PayrollCycle.id == cycle_id).first()
 
     if not cycle:
         raise ValueError(f"Payroll cycle with ID {cycle_id} not found")
 
-    if cycle.status == PayrollCycleStatus.LOCKED:
-        raise ValueError(f"Payroll cycle {cycle_id} is already locked")
+    with payroll_run_lock(cycle.college_id, cycle.year, [cycle.month], db):
+        db.refresh(cycle)
+
+        if cycle.status == PayrollCycleStatus.LOCKED:
+            raise ValueError(f"Payroll cycle {cycle_id} is already locked")
 
-    if cycle.status != PayrollCycleStatus.COMPLETED:
-        raise ValueError(f"Cannot lock payroll cycle {cycle_id} - it must be in COMPLETED status")
+        if cycle.status != PayrollCycleStatus.COMPLETED:
+            raise ValueError(f"Cannot lock payroll cycle {cycle_id} - it must be in COMPLETED status")
 
-    cycle.status = PayrollCycleStatus.LOCKED
-    cycle.locked_at = datetime.utcnow()
-    db.commit()
+        cycle.status = PayrollCycleStatus.LOCKED
+        cycle.locked_at = datetime.utcnow()
+        db.commit()
 
     return cycle
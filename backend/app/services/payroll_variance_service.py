@@ -0,0 +1,343 @@
+from typing import Dict, List, Optional
+from decimal import Decimal
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import case, func, or_, select
+from app.models.employees import Employee
+from app.models.payroll_cycles import PayrollCycle
+from app.models.payroll_entries import PayrollEntry
+from app.models.payroll_entry_components import PayrollEntryComponent
+from app.models.salary_components import SalaryComponent
+
+# PayrollEntry figures compared between the two cycles
+VARIANCE_FIELDS = (
+    "gross_earnings",
+    "total_deductions",
+    "loss_of_pay",
+    "lop_days",
+    "arrears",
+    "net_pay",
+)
+
+# Orderings accepted by compute_payroll_variance
+VARIANCE_SORTS = (
+    "net_pay_change",
+    "abs_net_pay_change",
+    "net_pay_percent_change",
+    "lop_days_change",
+    "employee_code",
+)
+
+
+def find_baseline_cycle(cycle: PayrollCycle, db: Session) -> Optional[PayrollCycle]:
+    """
+    Get the same college's cycle for the month before a cycle.
+
+    Args:
+        cycle: PayrollCycle being compared
+        db: Database session
+
+    Returns:
+        Previous month's PayrollCycle, or None if it was never calculated
+    """
+    year, month = (cycle.year - 1, 12) if cycle.month == 1 else (cycle.year, cycle.month - 1)
+    return db.query(PayrollCycle).filter(
+        PayrollCycle.college_id == cycle.college_id,
+        PayrollCycle.year == year,
+        PayrollCycle.month == month
+    ).first()
+
+
+def _amount(value) -> Decimal:
+    """A figure missing from one of the cycles counts as zero."""
+    return Decimal(0) if value is None else value
+
+
+def _by_cycle(column, cycle_id: int):
+    """Sum of a column over the rows of one cycle (NULL if it has none)."""
+    return func.sum(case((PayrollEntry.payroll_cycle_id == cycle_id, column)))
+
+
+def compute_payroll_variance(
+    cycle_id: int,
+    db: Session,
+    baseline_cycle_id: Optional[int] = None,
+    min_change: Optional[Decimal] = None,
+    min_percent_change: Optional[Decimal] = None,
+    min_component_change: Optional[Decimal] = None,
+    include_unchanged: bool = False,
+    sort: str = "abs_net_pay_change",
+    descending: bool = True,
+    skip: int = 0,
+    limit: Optional[int] = None
+) -> Dict:
+    """
+    Compare a cycle's entries with a baseline cycle, employee by employee.
+
+    Both cycles' entries are aggregated side by side in one grouped pass over
+    payroll_entries, with the thresholds, ordering and paging applied in the
+    database; the component deltas of the returned employees are then
+    computed in one grouped pass over payroll_entry_components. Employees
+    present in only one of the cycles are reported as NEW or REMOVED; an
+    employee whose totals match but whose components moved (e.g. pay
+    shifted from one allowance to another) is CHANGED.
+
+    Args:
+        cycle_id: PayrollCycle ID to compare
+        db: Database session
+        baseline_cycle_id: Cycle to compare against (defaults to the same
+            college's previous month)
+        min_change: Only employees whose net pay moved by at least this much
+        min_percent_change: Only employees whose net pay moved by at least
+            this percentage of the baseline (new employees always qualify)
+        min_component_change: Only report component deltas of at least this
+            much (every changed component if None)
+        include_unchanged: Also return employees with no change at all,
+            in their totals or their components
+        sort: One of VARIANCE_SORTS
+        descending: Sort in descending order
+        skip: Employees to skip
+        limit: Maximum employees to return (all if None)
+
+    Returns:
+        Dictionary with both cycle IDs, the number of matching employees and
+        their entries (employee, status, per-field baseline/current/change,
+        net pay percent change and component deltas)
+
+    Raises:
+        ValueError: If a cycle does not exist, no baseline can be found, or
+            sort is unknown
+    """
+    if sort not in VARIANCE_SORTS:
+        raise ValueError(f"sort must be one of {', '.join(VARIANCE_SORTS)}")
+
+    cycle = db.query(PayrollCycle).filter(PayrollCycle.id == cycle_id).first()
+    if not cycle:
+        raise ValueError(f"Payroll cycle with ID {cycle_id} not found")
+
+    if baseline_cycle_id is None:
+        baseline = find_baseline_cycle(cycle, db)
+        if not baseline:
+            raise ValueError(f"Payroll cycle {cycle_id} has no previous month to compare with")
+        baseline_cycle_id = baseline.id
+    elif not db.query(PayrollCycle.id).filter(PayrollCycle.id == baseline_cycle_id).first():
+        raise ValueError(f"Payroll cycle with ID {baseline_cycle_id} not found")
+
+    # Step 1: Both cycles' figures per employee in one grouped pass
+    current = {field: _by_cycle(getattr(PayrollEntry, field), cycle_id) for field in VARIANCE_FIELDS}
+    previous = {
+        field: _by_cycle(getattr(PayrollEntry, field), baseline_cycle_id)
+        for field in VARIANCE_FIELDS
+    }
+    change = {
+        field: func.coalesce(current[field], 0) - func.coalesce(previous[field], 0)
+        for field in VARIANCE_FIELDS
+    }
+    in_current = func.count(case((PayrollEntry.payroll_cycle_id == cycle_id, 1)))
+    in_baseline = func.count(case((PayrollEntry.payroll_cycle_id == baseline_cycle_id, 1)))
+    percent_change = case(
+        (previous["net_pay"] != 0, change["net_pay"] * 100 / func.abs(previous["net_pay"]))
+    )
+    components_changed = _components_changed(cycle_id, baseline_cycle_id)
+
+    query = db.query(
+        PayrollEntry.employee_id,
+        Employee.employee_code,
+        Employee.name,
+        in_current.label("in_current"),
+        in_baseline.label("in_baseline"),
+        percent_change.label("net_pay_percent_change"),
+        components_changed.label("components_changed"),
+        func.count().over().label("total"),
+        *[current[field].label(f"current_{field}") for field in VARIANCE_FIELDS],
+        *[previous[field].label(f"baseline_{field}") for field in VARIANCE_FIELDS]
+    ).join(
+        Employee, Employee.id == PayrollEntry.employee_id
+    ).filter(
+        PayrollEntry.payroll_cycle_id.in_([cycle_id, baseline_cycle_id])
+    ).group_by(
+        PayrollEntry.employee_id, Employee.employee_code, Employee.name
+    )
+
+    # Step 2: Thresholds, applied to the grouped rows
+    if not include_unchanged:
+        query = query.having(
+            or_(
+                in_current != in_baseline,
+                components_changed,
+                *[change[field] != 0 for field in VARIANCE_FIELDS]
+            )
+        )
+    if min_change is not None:
+        query = query.having(func.abs(change["net_pay"]) >= min_change)
+    if min_percent_change is not None:
+        query = query.having(
+            (in_baseline == 0) | (func.abs(percent_change) >= min_percent_change)
+        )
+
+    # Step 3: Ordering and paging
+    order = {
+        "net_pay_change": change["net_pay"],
+        "abs_net_pay_change": func.abs(change["net_pay"]),
+        "net_pay_percent_change": func.coalesce(func.abs(percent_change), 0),
+        "lop_days_change": change["lop_days"],
+        "employee_code": Employee.employee_code,
+    }[sort]
+    query = query.order_by(order.desc() if descending else order.asc(), PayrollEntry.employee_id)
+    query = query.offset(skip)
+    if limit is not None:
+        query = query.limit(limit)
+
+    rows = query.all()
+
+    # Step 4: Component deltas of the returned employees in one grouped pass
+    components = _component_variance(
+        cycle_id,
+        baseline_cycle_id,
+        [row.employee_id for row in rows],
+        min_component_change,
+        db
+    )
+
+    entries = []
+    for row in rows:
+        if not row.in_baseline:
+            change_status = "NEW"
+        elif not row.in_current:
+            change_status = "REMOVED"
+        else:
+            change_status = "CHANGED"
+
+        changes = {}
+        for field in VARIANCE_FIELDS:
+            baseline_value = getattr(row, f"baseline_{field}")
+            current_value = getattr(row, f"current_{field}")
+            changes[field] = {
+                "baseline": baseline_value,
+                "current": current_value,
+                "change": _amount(current_value) - _amount(baseline_value)
+            }
+        if (
+            change_status == "CHANGED"
+            and not row.components_changed
+            and not any(value["change"] for value in changes.values())
+        ):
+            change_status = "UNCHANGED"
+
+        percent = row.net_pay_percent_change
+        entries.append({
+            "employee_id": row.employee_id,
+            "employee_code": row.employee_code,
+            "employee_name": row.name,
+            "status": change_status,
+            "net_pay_percent_change": (
+                None if percent is None else Decimal(percent).quantize(Decimal("0.01"))
+            ),
+            "changes": changes,
+            "components": components.get(row.employee_id, [])
+        })
+
+    return {
+        "payroll_cycle_id": cycle_id,
+        "baseline_cycle_id": baseline_cycle_id,
+        "total": rows[0].total if rows else 0,
+        "entries": entries
+    }
+
+
+def _components_changed(cycle_id: int, baseline_cycle_id: int):
+    """
+    EXISTS over an employee's component deltas between two cycles.
+
+    Correlated on PayrollEntry.employee_id of the enclosing grouped query,
+    so it can be selected and filtered on per employee.
+
+    Args:
+        cycle_id: PayrollCycle ID being compared
+        baseline_cycle_id: Baseline PayrollCycle ID
+
+    Returns:
+        Boolean SQL expression, true if any component amount differs
+    """
+    component_entry = aliased(PayrollEntry)
+
+    def by_cycle(target_cycle_id: int):
+        return func.coalesce(func.sum(case(
+            (component_entry.payroll_cycle_id == target_cycle_id, PayrollEntryComponent.amount)
+        )), 0)
+
+    return select(PayrollEntryComponent.salary_component_id).join(
+        component_entry, component_entry.id == PayrollEntryComponent.payroll_entry_id
+    ).where(
+        component_entry.payroll_cycle_id.in_([cycle_id, baseline_cycle_id]),
+        component_entry.employee_id == PayrollEntry.employee_id
+    ).group_by(
+        PayrollEntryComponent.salary_component_id
+    ).having(
+        by_cycle(cycle_id) != by_cycle(baseline_cycle_id)
+    ).exists()
+
+
+def _component_variance(
+    cycle_id: int,
+    baseline_cycle_id: int,
+    employee_ids: List[int],
+    min_component_change: Optional[Decimal],
+    db: Session
+) -> Dict[int, List[Dict]]:
+    """
+    Per-component deltas between two cycles for some employees.
+
+    Args:
+        cycle_id: PayrollCycle ID being compared
+        baseline_cycle_id: Baseline PayrollCycle ID
+        employee_ids: Employees to compare
+        min_component_change: Smallest delta reported (any change if None)
+        db: Database session
+
+    Returns:
+        employee_id -> list of component delta dictionaries
+    """
+    if not employee_ids:
+        return {}
+
+    current = _by_cycle(PayrollEntryComponent.amount, cycle_id)
+    previous = _by_cycle(PayrollEntryComponent.amount, baseline_cycle_id)
+    change = func.coalesce(current, 0) - func.coalesce(previous, 0)
+
+    query = db.query(
+        PayrollEntry.employee_id,
+        SalaryComponent.id,
+        SalaryComponent.name,
+        SalaryComponent.component_type,
+        current.label("current"),
+        previous.label("baseline")
+    ).join(
+        PayrollEntry, PayrollEntry.id == PayrollEntryComponent.payroll_entry_id
+    ).join(
+        SalaryComponent, SalaryComponent.id == PayrollEntryComponent.salary_component_id
+    ).filter(
+        PayrollEntry.payroll_cycle_id.in_([cycle_id, baseline_cycle_id]),
+        PayrollEntry.employee_id.in_(employee_ids)
+    ).group_by(
+        PayrollEntry.employee_id,
+        SalaryComponent.id,
+        SalaryComponent.name,
+        SalaryComponent.component_type
+    )
+
+    if min_component_change is None:
+        query = query.having(change != 0)
+    else:
+        query = query.having(func.abs(change) >= min_component_change)
+
+    components = {}
+    for row in query.order_by(PayrollEntry.employee_id, SalaryComponent.id).all():
+        components.setdefault(row.employee_id, []).append({
+            "salary_component_id": row.id,
+            "component_name": row.name,
+            "component_type": row.component_type,
+            "baseline": row.baseline,
+            "current": row.current,
+            "change": _amount(row.current) - _amount(row.baseline)
+        })
+    return components
@@ -0,0 +1,231 @@
+from typing import Dict, List
+import numpy as np
+from sqlalchemy.orm import Session
+from app.models.employees import Employee, StaffType
+from app.models.salary_components import SalaryComponent, ComponentType, AppliesTo
+from app.services.payroll_batch import to_units, from_units
+from app.config import settings
+
+# Bases a percentage component can refer to besides other components by name
+BASE_BASIC = "BASIC"
+BASE_GROSS = "GROSS"
+
+# Staff types in a fixed order so they can be held as small integer codes
+STAFF_TYPES = list(StaffType)
+
+
+def _parse_terms(percentage_of: str) -> List[str]:
+    """Split a percentage_of expression such as "BASIC+DA" into its terms."""
+    return [term.strip() for term in (percentage_of or BASE_BASIC).split("+") if term.strip()]
+
+
+def compile_component_plan(db: Session) -> List[Dict]:
+    """
+    Compile the percentage salary components into a dependency-ordered plan.
+
+    percentage_of is BASIC, GROSS or a "+" separated sum of those and other
+    component names (e.g. "BASIC+Dearness Allowance (DA)"). BASIC is the
+    component named settings.BASIC_COMPONENT_NAME and GROSS is the total of
+    all earnings, so a step is ordered after every percentage component it
+    depends on.
+
+    Args:
+        db: Database session
+
+    Returns:
+        List of plan steps, each a dictionary with component_id,
+        component_type, staff_types (None for all staff), is_default, rate
+        (percentage in 1/100ths) and terms (dictionaries with gross,
+        component_ids and basic flags)
+
+    Raises:
+        ValueError: If percentage components depend on each other in a cycle
+            or refer to an unknown component
+    """
+    components = db.query(SalaryComponent).order_by(SalaryComponent.id).all()
+
+    ids_by_name = {}
+    for component in components:
+        ids_by_name.setdefault(component.name.strip().lower(), []).append(component.id)
+    earning_ids = tuple(
+        component.id for component in components
+        if component.component_type == ComponentType.EARNING
+    )
+
+    steps = {}
+    depends_on = {}
+    for component in components:
+        if not component.is_percentage:
+            continue
+
+        terms = []
+        referenced = set()
+        for term in _parse_terms(component.percentage_of):
+            if term.upper() == BASE_GROSS:
+                terms.append({"gross": True, "component_ids": (), "basic": False})
+                referenced.update(
+                    component_id for component_id in earning_ids
+                    if component_id != component.id
+                )
+                continue
+
+            is_basic = term.upper() == BASE_BASIC
+            name = settings.BASIC_COMPONENT_NAME if is_basic else term
+            term_ids = tuple(ids_by_name.get(name.strip().lower(), ()))
+            if not term_ids and not is_basic:
+                raise ValueError(
+                    f"Salary component '{component.name}' refers to unknown component '{term}'"
+                )
+            terms.append({"gross": False, "component_ids": term_ids, "basic": is_basic})
+            referenced.update(term_ids)
+
+        steps[component.id] = {
+            "component_id": component.id,
+            "component_type": component.component_type,
+            "staff_types": (
+                None if component.applies_to in (None, AppliesTo.ALL)
+                else {StaffType(component.applies_to.value)}
+            ),
+            "is_default": bool(component.is_default),
+            "rate": to_units(component.percentage_value or 0),
+            "terms": terms,
+        }
+        depends_on[component.id] = referenced
+
+    # Topological order over the percentage components only; references to
+    # fixed components are inputs, not dependencies
+    for component_id, referenced in depends_on.items():
+        depends_on[component_id] = {ref for ref in referenced if ref in steps}
+
+    plan = []
+    resolved = set()
+    while len(plan) < len(steps):
+        ready = [
+            component_id for component_id in steps
+            if component_id not in resolved and depends_on[component_id] <= resolved
+        ]
+        if not ready:
+            names = sorted(
+                component.name for component in components
+                if component.id in steps and component.id not in resolved
+            )
+            raise ValueError(f"Circular percentage salary components: {', '.join(names)}")
+        for component_id in ready:
+            plan.append(steps[component_id])
+            resolved.add(component_id)
+
+    return plan
+
+
+def evaluate_component_plan(
+    plan: List[Dict],
+    employees: List[Employee],
+    components: Dict
+) -> Dict:
+    """
+    Apply a compiled component plan to a batch of employees.
+
+    Each step is evaluated for the whole batch at once on integer paise
+    arrays and rounded half-up to the paisa. Calculated amounts replace any
+    structure amount stored for a percentage component. An employee gets a
+    percentage component only if their structure in force includes it (or
+    the component is marked default), its staff type applies and its base
+    is above zero; employees without any structure get none. When an
+    employee has no basic pay component, BASIC falls back to
+    Employee.actual_basic.
+
+    Args:
+        plan: Output of compile_component_plan
+        employees: Employees in the batch
+        components: employee_id -> list of fixed component amount dictionaries
+
+    Returns:
+        employee_id -> list of component amount dictionaries including the
+        calculated percentage components
+    """
+    if not plan:
+        return components
+
+    size = len(employees)
+    row_of = {employee.id: row for row, employee in enumerate(employees)}
+    planned_ids = {step["component_id"] for step in plan}
+
+    staff_code = np.asarray(
+        [STAFF_TYPES.index(employee.staff_type) for employee in employees],
+        dtype=np.int64
+    )
+    actual_basic = np.asarray(
+        [to_units(employee.actual_basic or 0) for employee in employees],
+        dtype=np.int64
+    )
+
+    # Fixed amounts as one paise column per component, and which employees'
+    # structures include each percentage component
+    amounts = {}
+    present = {}
+    in_structure = {}
+    has_structure = np.zeros(size, dtype=bool)
+    gross = np.zeros(size, dtype=np.int64)
+    fixed = {}
+    for employee_id, comp_rows in components.items():
+        row = row_of.get(employee_id)
+        if row is None or not comp_rows:
+            continue
+        has_structure[row] = True
+        for comp_data in comp_rows:
+            component_id = comp_data["component_id"]
+            if component_id in planned_ids:
+                in_structure.setdefault(component_id, np.zeros(size, dtype=bool))[row] = True
+                continue
+            fixed.setdefault(employee_id, []).append(comp_data)
+            value = to_units(comp_data["amount"])
+            amounts.setdefault(component_id, np.zeros(size, dtype=np.int64))[row] += value
+            present.setdefault(component_id, np.zeros(size, dtype=bool))[row] = True
+            if comp_data["component_type"] == ComponentType.EARNING:
+                gross[row] += value
+
+    calculated = []
+    for step in plan:
+        base = np.zeros(size, dtype=np.int64)
+        for term in step["terms"]:
+            if term["gross"]:
+                base += gross
+                continue
+
+            value = np.zeros(size, dtype=np.int64)
+            has_value = np.zeros(size, dtype=bool)
+            for component_id in term["component_ids"]:
+                if component_id in amounts:
+                    value += amounts[component_id]
+                    has_value |= present[component_id]
+            if term["basic"]:
+                value = np.where(has_value, value, actual_basic)
+            base += value
+
+        applies = has_structure & (base > 0)
+        if not step["is_default"]:
+            applies &= in_structure.get(step["component_id"], np.zeros(size, dtype=bool))
+        if step["staff_types"] is not None:
+            applies &= np.isin(staff_code, [STAFF_TYPES.index(s) for s in step["staff_types"]])
+        amount = np.where(applies, (2 * base * step["rate"] + 10000) // 20000, 0)
+
+        amounts[step["component_id"]] = amount
+        present[step["component_id"]] = applies
+        if step["component_type"] == ComponentType.EARNING:
+            gross = gross + amount
+        calculated.append((step, amount, applies))
+
+    result = {}
+    for row, employee in enumerate(employees):
+        comp_rows = list(fixed.get(employee.id, []))
+        for step, amount, applies in calculated:
+            if applies[row]:
+                comp_rows.append({
+                    "component_id": step["component_id"],
+                    "component_type": step["component_type"],
+                    "amount": from_units(amount[row])
+                })
+        if comp_rows:
+            result[employee.id] = comp_rows
+
+    return result
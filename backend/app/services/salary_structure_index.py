@@ -0,0 +1,170 @@
+from typing import Dict, List, Tuple
+from bisect import bisect_right
+from datetime import date, timedelta
+from sqlalchemy.orm import Session
+from app.models.employees import Employee
+from app.models.employee_salary_structures import EmployeeSalaryStructure
+from app.models.salary_components import SalaryComponent
+from app.services.payroll_batch import from_units, to_units
+
+
+class SalaryStructureIndex:
+    """
+    In-memory interval index over employees' effective-dated salary structures.
+
+    Each employee's timeline is cut into segments at every effective_from and
+    the day after every effective_to; a segment holds the structures active
+    throughout it. Looking up the structures active during a period is a
+    binary search for its first and last segment.
+    """
+
+    def __init__(self, structure_rows: List):
+        """
+        Build the index from salary structure rows.
+
+        Args:
+            structure_rows: Rows with id, employee_id, component_id,
+                component_type, amount, effective_from and effective_to
+        """
+        by_employee = {}
+        for row in structure_rows:
+            by_employee.setdefault(row.employee_id, []).append(row)
+
+        self._breakpoints = {}
+        self._segments = {}
+        for employee_id, rows in by_employee.items():
+            boundaries = set()
+            for row in rows:
+                boundaries.add(row.effective_from)
+                if row.effective_to is not None:
+                    boundaries.add(row.effective_to + timedelta(days=1))
+            breakpoints = sorted(boundaries)
+
+            segments = []
+            for start in breakpoints:
+                segments.append(tuple(
+                    row for row in rows
+                    if row.effective_from <= start and (
+                        row.effective_to is None or row.effective_to >= start
+                    )
+                ))
+
+            self._breakpoints[employee_id] = breakpoints
+            self._segments[employee_id] = segments
+
+    def structures_during(self, employee_id: int, start_date: date, end_date: date) -> List[Tuple]:
+        """
+        Get an employee's structures effective at any time during a period.
+
+        Args:
+            employee_id: Employee ID
+            start_date: First day of the period
+            end_date: Last day of the period
+
+        Returns:
+            (structure row, days it is in force within the period) tuples,
+            ordered by structure id
+        """
+        breakpoints = self._breakpoints.get(employee_id)
+        if not breakpoints:
+            return []
+
+        last = bisect_right(breakpoints, end_date) - 1
+        if last < 0:
+            return []
+        first = max(bisect_right(breakpoints, start_date) - 1, 0)
+
+        found = {}
+        for segment in self._segments[employee_id][first:last + 1]:
+            for row in segment:
+                found[row.id] = row
+
+        structures = []
+        for structure_id in sorted(found):
+            row = found[structure_id]
+            in_force_from = max(row.effective_from, start_date)
+            in_force_to = min(row.effective_to or end_date, end_date)
+            structures.append((row, (in_force_to - in_force_from).days + 1))
+        return structures
+
+    def components_during(self, employee_id: int, start_date: date, end_date: date) -> List[Dict]:
+        """
+        Get an employee's component amounts effective during a period.
+
+        A component revised within the period appears once, at the average
+        of its versions weighted by the days each was in force, rounded
+        half-up to the paisa (e.g. 30000 for 15 days and 36000 for 16 days
+        of a 31-day month is 33096.77). A component in force for only part
+        of the period keeps its amount; absent days are handled by the
+        attendance and leave calculation.
+
+        Args:
+            employee_id: Employee ID
+            start_date: First day of the period
+            end_date: Last day of the period
+
+        Returns:
+            List of component amount dictionaries (component_id,
+            component_type, amount), one per component
+        """
+        versions = {}
+        for row, days in self.structures_during(employee_id, start_date, end_date):
+            versions.setdefault(row.component_id, []).append((row, days))
+
+        components = []
+        for component_id, component_versions in versions.items():
+            row = component_versions[-1][0]
+            amount = row.amount
+            if len(component_versions) > 1:
+                weighted = sum(to_units(version.amount) * days for version, days in component_versions)
+                total_days = sum(days for _, days in component_versions)
+                amount = from_units((2 * weighted + total_days) // (2 * total_days))
+            components.append({
+                "component_id": component_id,
+                "component_type": row.component_type,
+                "amount": amount
+            })
+        return components
+
+
+def load_salary_structure_index(
+    employee_filter: List,
+    start_date: date,
+    end_date: date,
+    db: Session
+) -> SalaryStructureIndex:
+    """
+    Load every structure overlapping a date range into one SalaryStructureIndex.
+
+    Built once per run so that multi-month and arrears calculations can look
+    up any month inside the range without querying again.
+
+    Args:
+        employee_filter: Criteria on Employee selecting whose structures to load
+        start_date: First day of the range
+        end_date: Last day of the range
+        db: Database session
+
+    Returns:
+        SalaryStructureIndex over the loaded structures
+    """
+    structure_rows = db.query(
+        EmployeeSalaryStructure.id,
+        EmployeeSalaryStructure.employee_id,
+        EmployeeSalaryStructure.amount,
+        EmployeeSalaryStructure.effective_from,
+        EmployeeSalaryStructure.effective_to,
+        SalaryComponent.id.label("component_id"),
+        SalaryComponent.component_type
+    ).join(
+        SalaryComponent, SalaryComponent.id == EmployeeSalaryStructure.salary_component_id
+    ).join(
+        Employee, Employee.id == EmployeeSalaryStructure.employee_id
+    ).filter(
+        *employee_filter,
+        EmployeeSalaryStructure.effective_from <= end_date,
+        EmployeeSalaryStructure.effective_to.is_(None) |
+        (EmployeeSalaryStructure.effective_to >= start_date)
+    ).order_by(EmployeeSalaryStructure.employee_id, EmployeeSalaryStructure.id).all()
+
+    return SalaryStructureIndex(structure_rows)
@@ -0,0 +1,138 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import date, timedelta
+from threading import Lock
+from sqlalchemy.orm import Session
+from app.models.holidays import Holiday
+from app.config import settings
+
+# Day kinds held in WorkingCalendar.day_kinds
+WORKING_DAY = 0
+WEEKEND = 1
+HOLIDAY = 2
+
+# (college_id, year) -> WorkingCalendar, shared by every session of this process
+_calendars: Dict[Tuple[int, int], "WorkingCalendar"] = {}
+_calendars_lock = Lock()
+
+# college_id -> invalidation count, so a calendar built from holidays read
+# before an invalidation is never cached after it
+_generations: Dict[int, int] = {}
+
+
+class WorkingCalendar:
+    """
+    Precomputed working-day calendar of one college for one year.
+
+    day_kinds has one entry per day of the year (WORKING_DAY, WEEKEND or
+    HOLIDAY) and prefix[n] is the number of working days among the first n
+    days, so the working days of any date range are one subtraction.
+    """
+
+    def __init__(self, year: int, holiday_dates: List[date], weekend_days: List[int]):
+        """
+        Build the calendar.
+
+        Args:
+            year: Calendar year
+            holiday_dates: The college's holidays in the year
+            weekend_days: List of weekday indices (0=Monday, 6=Sunday)
+        """
+        self.year = year
+        self.first_day = date(year, 1, 1)
+        days = (date(year + 1, 1, 1) - self.first_day).days
+
+        holidays = set(holiday_dates)
+        weekend = set(weekend_days)
+
+        self.day_kinds = bytearray(days)
+        self.prefix = [0] * (days + 1)
+        for offset in range(days):
+            day = self.first_day + timedelta(days=offset)
+            if day.weekday() in weekend:
+                self.day_kinds[offset] = WEEKEND
+            elif day in holidays:
+                self.day_kinds[offset] = HOLIDAY
+            self.prefix[offset + 1] = self.prefix[offset] + (self.day_kinds[offset] == WORKING_DAY)
+
+    def _offset(self, day: date) -> int:
+        if day.year != self.year:
+            raise ValueError(f"{day} is outside the {self.year} calendar")
+        return (day - self.first_day).days
+
+    def day_kind(self, day: date) -> int:
+        """Get whether a date is a working day, weekend or holiday."""
+        return self.day_kinds[self._offset(day)]
+
+    def is_working_day(self, day: date) -> bool:
+        """Check whether a date is a working day."""
+        return self.day_kind(day) == WORKING_DAY
+
+    def working_days(self, start_date: date, end_date: date) -> int:
+        """
+        Count the working days in a date range of the calendar's year.
+
+        Args:
+            start_date: First day of the range
+            end_date: Last day of the range (inclusive)
+
+        Returns:
+            Number of working days, 0 for an empty range
+        """
+        if end_date < start_date:
+            return 0
+        return self.prefix[self._offset(end_date) + 1] - self.prefix[self._offset(start_date)]
+
+    def month_working_days(self, month: int) -> int:
+        """Count the working days in a month of the calendar's year."""
+        start_date = date(self.year, month, 1)
+        end_date = date(self.year + 1, 1, 1) if month == 12 else date(self.year, month + 1, 1)
+        return self.working_days(start_date, end_date - timedelta(days=1))
+
+
+def get_working_calendar(college_id: int, year: int, db: Session) -> WorkingCalendar:
+    """
+    Get a college's working-day calendar for a year, building it on first use.
+
+    Calendars are cached in process until invalidate_working_calendar is
+    called for the college; the holidays router does so on every change.
+
+    Args:
+        college_id: College ID
+        year: Calendar year
+        db: Database session
+
+    Returns:
+        WorkingCalendar for the college and year
+    """
+    key = (college_id, year)
+    calendar = _calendars.get(key)
+    if calendar is not None:
+        return calendar
+
+    generation = _generations.get(college_id, 0)
+    holidays = db.query(Holiday.date).filter(
+        Holiday.college_id == college_id,
+        Holiday.date >= date(year, 1, 1),
+        Holiday.date < date(year + 1, 1, 1)
+    ).all()
+
+    calendar = WorkingCalendar(year, [h.date for h in holidays], settings.WEEKEND_DAYS)
+    with _calendars_lock:
+        if _generations.get(college_id, 0) == generation:
+            _calendars[key] = calendar
+    return calendar
+
+
+def invalidate_working_calendar(college_id: int, year: Optional[int] = None) -> None:
+    """
+    Drop cached calendars of a college so they are rebuilt on next use.
+
+    Args:
+        college_id: College ID
+        year: Only drop this year's calendar (every year if None)
+    """
+    with _calendars_lock:
+        _generations[college_id] = _generations.get(college_id, 0) + 1
+        for key in list(_calendars):
+            if key[0] == college_id and (year is None or key[1] == year):
+                del _calendars[key]
@@ -1,14 +1,48 @@
-from typing import Dict, List
-from datetime import datetime
+from typing import Callable, Iterator, List, Optional, Tuple
+from datetime import date, datetime
 import openpyxl
 from sqlalchemy.orm import Session
-from app.models.employees import Employee
 from app.models.attendance_records import AttendanceStatus
+from app.services.employee_codes import resolve_employee_codes
+
+# Cell codes accepted in an attendance sheet
+ATTENDANCE_CODES = {
+    "P": AttendanceStatus.PRESENT,
+    "A": AttendanceStatus.ABSENT,
+    "H": AttendanceStatus.HALF_DAY,
+    "WW": AttendanceStatus.WEEKEND_WORK,
+    "HD": AttendanceStatus.HOLIDAY,
+    "L": AttendanceStatus.LEAVE,
+}
+
+
+def _parse_attendance_date(value) -> Optional[date]:
+    """Date of a sheet row from a date cell or YYYY-MM-DD / DD-MM-YYYY text."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        for date_format in ("%Y-%m-%d", "%d-%m-%Y"):
+            try:
+                return datetime.strptime(value.strip(), date_format).date()
+            except ValueError:
+                continue
+    return None
 
 
-def parse_attendance_excel(file_path: str, college_id: int, db: Session) -> Dict:
+def iter_attendance_excel(
+    file_path: str,
+    college_id: int,
+    db: Session,
+    errors: List[str],
+    progress: Optional[Callable[[int, Optional[int]], None]] = None
+) -> Iterator[Tuple[int, date, AttendanceStatus]]:
     """
-    Parse attendance Excel file and return structured data.
+    Stream attendance records out of an Excel file, row by row.
+
+    The workbook is opened in read-only mode, so cells are read as the rows
+    are iterated and memory stays flat however large the sheet is.
 
     Expected format:
     - Row 1: Headers with employee codes or names
@@ -21,107 +55,78 @@ def parse_attendance_excel(file_path: str, college_id: int, db: Session) -> Dict
         file_path: Path to the Excel file
         college_id: College ID for validating employees
         db: Database session
+        errors: List the parse errors are appended to as they are found
+        progress: Optional callback called as progress(rows_read, rows_total)
+            after each data row; rows_total is the row count the sheet
+            declares, or None if it declares none
 
-    Returns:
-        Dictionary with:
-        - records: List of attendance record dictionaries
-        - errors: List of error messages
-        - count: Number of successful records
+    Yields:
+        (employee_id, date, status) tuples
     """
-    records = []
-    errors = []
+    try:
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    except Exception as e:
+        errors.append(f"Error parsing Excel file: {str(e)}")
+        return
 
     try:
-        workbook = openpyxl.load_workbook(file_path, data_only=True)
         sheet = workbook.active
-
-        # Parse header row to get employee codes
-        header_row = list(sheet.iter_rows(min_row=1, max_row=1, values_only=True))[0]
-        employee_codes = []
+        rows_total = sheet.max_row - 1 if sheet.max_row and sheet.max_row > 1 else None
+        # Some writers store a wrong sheet size; read rows until the data ends
+        sheet.reset_dimensions()
+        rows = sheet.iter_rows(values_only=True)
+
+        # Parse header row to get employee codes (start from column B)
+        header_row = next(rows, None) or ()
+        header_codes = {
+            col_idx: str(header_row[col_idx]).strip()
+            for col_idx in range(1, len(header_row))
+            if header_row[col_idx] and str(header_row[col_idx]).strip()
+        }
+
+        # Validate employees exist and belong to the college, all at once
+        employee_ids = resolve_employee_codes(college_id, header_codes.values(), db)
         employee_map = {}
-
-        # Start from column B (index 1)
-        for col_idx in range(1, len(header_row)):
-            emp_code = str(header_row[col_idx]).strip() if header_row[col_idx] else None
-            if emp_code:
-                employee_codes.append(emp_code)
-
-                # Validate employee exists and belongs to college
-                employee = db.query(Employee).filter(
-                    Employee.employee_code == emp_code,
-                    Employee.college_id == college_id,
-                    Employee.is_active == True
-                ).first()
-
-                if employee:
-                    employee_map[col_idx] = employee.id
-                else:
-                    errors.append(f"Employee code '{emp_code}' not found or not active in college")
+        for col_idx, emp_code in header_codes.items():
+            if emp_code in employee_ids:
+                employee_map[col_idx] = employee_ids[emp_code]
+            else:
+                errors.append(f"Employee code '{emp_code}' not found or not active in college")
 
         # Parse data rows
-        for row_idx, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
-            if not row[0]:  # Skip if date column is empty
+        for row_idx, row in enumerate(rows, start=2):
+            if progress:
+                progress(row_idx - 1, rows_total)
+            if not row or not row[0]:  # Skip if date column is empty
                 continue
 
             # Parse date from first column
-            attendance_date = None
-            if isinstance(row[0], datetime):
-                attendance_date = row[0].date()
-            elif isinstance(row[0], str):
-                try:
-                    attendance_date = datetime.strptime(row[0].strip(), "%Y-%m-%d").date()
-                except ValueError:
-                    try:
-                        attendance_date = datetime.strptime(row[0].strip(), "%d-%m-%Y").date()
-                    except ValueError:
-                        errors.append(f"Row {row_idx}: Invalid date format '{row[0]}'")
-                        continue
-
+            attendance_date = _parse_attendance_date(row[0])
             if not attendance_date:
-                errors.append(f"Row {row_idx}: Could not parse date")
+                if isinstance(row[0], str):
+                    errors.append(f"Row {row_idx}: Invalid date format '{row[0]}'")
+                else:
+                    errors.append(f"Row {row_idx}: Could not parse date")
                 continue
 
-            # Parse attendance status for each employee
-            for col_idx in range(1, len(row)):
-                if col_idx not in employee_map:
-                    continue
-
-                cell_value = str(row[col_idx]).strip().upper() if row[col_idx] else ""
+            # Parse attendance status for each employee; read-only rows stop
+            # at their last value, so missing trailing cells are empty
+            for col_idx, employee_id in employee_map.items():
+                value = row[col_idx] if col_idx < len(row) else None
+                cell_value = str(value).strip().upper() if value else ""
 
                 if not cell_value:
                     # Empty cell treated as absent
-                    status = AttendanceStatus.ABSENT
-                elif cell_value == "P":
-                    status = AttendanceStatus.PRESENT
-                elif cell_value == "A":
-                    status = AttendanceStatus.ABSENT
-                elif cell_value == "H":
-                    status = AttendanceStatus.HALF_DAY
-                elif cell_value == "WW":
-                    status = AttendanceStatus.WEEKEND_WORK
-                elif cell_value == "HD":
-                    status = AttendanceStatus.HOLIDAY
-                elif cell_value == "L":
-                    status = AttendanceStatus.LEAVE
+                    yield employee_id, attendance_date, AttendanceStatus.ABSENT
+                elif cell_value in ATTENDANCE_CODES:
+                    yield employee_id, attendance_date, ATTENDANCE_CODES[cell_value]
                 else:
                     errors.append(
                         f"Row {row_idx}, Col {col_idx + 1}: Invalid status '{cell_value}'"
                     )
-                    continue
-
-                records.append({
-                    "employee_id": employee_map[col_idx],
-                    "date": attendance_date,
-                    "status": status
-                })
-
-        workbook.close()
 
     except Exception as e:
         errors.append(f"Error parsing Excel file: {str(e)}")
 
-    return {
-        "records": records,
-        "errors": errors,
-        "count": len(records)
-    }
+    finally:
+        workbook.close()
@@ -0,0 +1,123 @@
+from typing import BinaryIO, Tuple
+import hashlib
+from fastapi import UploadFile, status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+
+# Room left in a request body for the multipart boundaries and part headers
+# around a file of exactly MAX_UPLOAD_SIZE bytes
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an uploaded file is larger than MAX_UPLOAD_SIZE."""
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Refuse request bodies over the upload limit before they are spooled.
+
+    Starlette reads a multipart body into temporary files before any route
+    code runs, so a limit checked in the route only applies once the whole
+    body has been received. This middleware answers 413 without reading the
+    body when Content-Length is over MAX_UPLOAD_SIZE (plus
+    MULTIPART_OVERHEAD), and counts the bytes of bodies sent without one
+    (chunked), cutting them off as soon as they pass the limit.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = settings.MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            await self._refuse(limit, scope, receive, send)
+            return
+
+        received = 0
+        refused = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, refused
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    refused = True
+                    raise UploadTooLargeError(f"Request body is larger than the {limit} byte limit")
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal response_started
+            # The app's answer to a body cut off mid-read (e.g. a parse error) is dropped
+            if refused and not response_started:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not refused:
+                raise
+
+        if refused and not response_started:
+            await self._refuse(limit, scope, receive, send)
+
+    @staticmethod
+    async def _refuse(limit: int, scope: Scope, receive: Receive, send: Send) -> None:
+        response = JSONResponse(
+            {"detail": f"Request body is larger than the {limit} byte upload limit"},
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            headers={"Connection": "close"}
+        )
+        await response(scope, receive, send)
+
+
+async def receive_upload(file: UploadFile, destination: BinaryIO) -> Tuple[int, str]:
+    """
+    Copy an uploaded file into a binary file object in fixed-size chunks.
+
+    By the time this runs Starlette has already spooled the file to a
+    temporary file; UploadSizeLimitMiddleware is what keeps that spool
+    bounded. This copies the spooled file holding one chunk in memory at a
+    time and enforces the exact per-file limit: the copy stops as soon as
+    more than settings.MAX_UPLOAD_SIZE bytes have been read, and files
+    whose size is already known to be over the limit are refused before
+    anything is copied.
+
+    Args:
+        file: Uploaded file
+        destination: File object opened for binary writing
+
+    Returns:
+        Tuple of the file's size in bytes and the hex SHA-256 of its content
+
+    Raises:
+        UploadTooLargeError: If the file is larger than MAX_UPLOAD_SIZE
+    """
+    limit = settings.MAX_UPLOAD_SIZE
+    if file.size is not None and file.size > limit:
+        raise UploadTooLargeError(f"File is larger than the {limit} byte upload limit")
+
+    size = 0
+    digest = hashlib.sha256()
+    while True:
+        chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > limit:
+            raise UploadTooLargeError(f"File is larger than the {limit} byte upload limit")
+        digest.update(chunk)
+        destination.write(chunk)
+
+    return size, digest.hexdigest()
@@ -0,0 +1,34 @@
+import os
+import tempfile
+
+# The app builds its engine from settings at import time, so point it at a
+# throwaway SQLite database (and storage) before anything imports app
+_test_root = tempfile.mkdtemp(prefix="payroll-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_test_root, 'payroll.db')}"
+os.environ["DEBUG"] = "false"
+for _name in ("STORAGE_PATH", "UPLOAD_PATH", "PAYSLIP_PATH", "REPORT_PATH"):
+    os.environ[_name] = os.path.join(_test_root, _name.lower())
+    os.makedirs(os.environ[_name], exist_ok=True)
+
+import pytest
+from app.database import Base, SessionLocal, engine
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+from app.services import working_calendar
+from app.services.employee_codes import invalidate_employee_codes
+
+
+@pytest.fixture
+def db():
+    """A session on a freshly created schema, dropped again after the test."""
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+        # Process-wide caches would otherwise outlive the rows they were built from
+        with working_calendar._calendars_lock:
+            working_calendar._calendars.clear()
+            working_calendar._generations.clear()
+        invalidate_employee_codes()
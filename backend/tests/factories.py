@@ -0,0 +1,124 @@
+"""Helpers that create the rows a payroll test needs."""
+from calendar import monthrange
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import (
+    AttendanceRecord,
+    AttendanceStatus,
+    College,
+    ComponentType,
+    Employee,
+    EmployeeSalaryStructure,
+    SalaryComponent,
+    StaffType,
+)
+
+
+def make_college(db: Session, code: str = "C1") -> College:
+    college = College(serial_number=1, college_code=code, name=f"College {code}")
+    db.add(college)
+    db.flush()
+    return college
+
+
+def make_component(
+    db: Session,
+    name: str,
+    component_type: ComponentType = ComponentType.EARNING,
+    **values
+) -> SalaryComponent:
+    component = SalaryComponent(name=name, component_type=component_type, **values)
+    db.add(component)
+    db.flush()
+    return component
+
+
+def make_employee(
+    db: Session,
+    college: College,
+    code: str,
+    structure: Optional[Dict[SalaryComponent, str]] = None,
+    effective_from: date = date(2025, 1, 1),
+    staff_type: StaffType = StaffType.TEACHING,
+    **values
+) -> Employee:
+    """An employee with one structure row per component, in force from effective_from."""
+    employee = Employee(
+        employee_code=code,
+        name=f"Employee {code}",
+        staff_type=staff_type,
+        college_id=college.id,
+        date_of_joining=date(2020, 1, 1),
+        **values
+    )
+    db.add(employee)
+    db.flush()
+    for component, amount in (structure or {}).items():
+        add_structure(db, employee, component, amount, effective_from)
+    return employee
+
+
+def add_structure(
+    db: Session,
+    employee: Employee,
+    component: SalaryComponent,
+    amount: str,
+    effective_from: date,
+    effective_to: Optional[date] = None
+) -> EmployeeSalaryStructure:
+    structure = EmployeeSalaryStructure(
+        employee_id=employee.id,
+        salary_component_id=component.id,
+        amount=Decimal(amount),
+        effective_from=effective_from,
+        effective_to=effective_to
+    )
+    db.add(structure)
+    db.flush()
+    return structure
+
+
+def working_dates(year: int, month: int) -> Iterable[date]:
+    """Weekdays of a month (the test colleges have no holidays)."""
+    day = date(year, month, 1)
+    while day.month == month:
+        if day.weekday() not in settings.WEEKEND_DAYS:
+            yield day
+        day += timedelta(days=1)
+
+
+def mark_attendance(
+    db: Session,
+    employee: Employee,
+    year: int,
+    month: int,
+    absent: int = 0,
+    half_days: int = 0,
+    weekend_work: int = 0
+) -> None:
+    """
+    Record a month of attendance: present on every working day except the
+    first `absent` (absent) and the next `half_days` (half day), plus
+    `weekend_work` worked weekend days.
+    """
+    for position, day in enumerate(working_dates(year, month)):
+        if position < absent:
+            status = AttendanceStatus.ABSENT
+        elif position < absent + half_days:
+            status = AttendanceStatus.HALF_DAY
+        else:
+            status = AttendanceStatus.PRESENT
+        db.add(AttendanceRecord(employee_id=employee.id, date=day, status=status))
+
+    weekends = [
+        date(year, month, day) for day in range(1, monthrange(year, month)[1] + 1)
+        if date(year, month, day).weekday() in settings.WEEKEND_DAYS
+    ]
+    for day in weekends[:weekend_work]:
+        db.add(AttendanceRecord(
+            employee_id=employee.id, date=day, status=AttendanceStatus.WEEKEND_WORK
+        ))
+    db.flush()
@@ -0,0 +1,132 @@
+from datetime import date
+import openpyxl
+import pytest
+from app.config import settings
+from app.models import AttendanceRecord, AttendanceStatus, AttendanceUpload, UploadStatus
+from app.services.attendance_service import process_attendance_upload
+from app.utils.excel_parser import iter_attendance_excel
+from tests.factories import make_college, make_employee
+
+
+@pytest.fixture
+def college(db):
+    college = make_college(db)
+    for code in ("E1", "E2", "E3"):
+        make_employee(db, college, code)
+    db.commit()
+    return college
+
+
+def write_sheet(path, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+
+def upload(db, college, file_path):
+    attendance_upload = AttendanceUpload(
+        college_id=college.id, year=2026, month=3,
+        file_name="attendance.xlsx", file_path=file_path, status=UploadStatus.PENDING
+    )
+    db.add(attendance_upload)
+    db.commit()
+    return attendance_upload.id
+
+
+def statuses(db):
+    return {
+        (record.employee_id, record.date.day): record.status
+        for record in db.query(AttendanceRecord).all()
+    }
+
+
+def test_parser_streams_records_and_collects_errors(db, college, tmp_path):
+    path = write_sheet(tmp_path / "attendance.xlsx", [
+        ["Date", "E1", "E2", "NOPE"],
+        [date(2026, 3, 2), "P", "h", "P"],
+        ["03-03-2026", None, "WW"],
+        ["not a date", "P", "P", "P"],
+        [date(2026, 3, 4), "X", "L", "P"],
+    ])
+    errors = []
+    progress = []
+
+    records = list(iter_attendance_excel(
+        path, college.id, db, errors, progress=lambda rows, total: progress.append((rows, total))
+    ))
+
+    e1, e2 = 1, 2
+    assert records == [
+        (e1, date(2026, 3, 2), AttendanceStatus.PRESENT),
+        (e2, date(2026, 3, 2), AttendanceStatus.HALF_DAY),
+        (e1, date(2026, 3, 3), AttendanceStatus.ABSENT),
+        (e2, date(2026, 3, 3), AttendanceStatus.WEEKEND_WORK),
+        (e2, date(2026, 3, 4), AttendanceStatus.LEAVE),
+    ]
+    assert errors == [
+        "Employee code 'NOPE' not found or not active in college",
+        "Row 4: Invalid date format 'not a date'",
+        "Row 5, Col 2: Invalid status 'X'",
+    ]
+    assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+
+def test_upload_is_written_in_batches_and_reupload_updates(db, college, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ATTENDANCE_BATCH_SIZE", 4)
+    days = [date(2026, 3, day) for day in (2, 3, 4)]
+    path = write_sheet(tmp_path / "attendance.xlsx", [
+        ["Date", "E1", "E2", "E3"],
+        *[[day, "P", "A", "H"] for day in days],
+    ])
+
+    result = process_attendance_upload(upload(db, college, path), db)
+    assert result["success"]
+    assert (result["records_created"], result["records_updated"]) == (9, 0)
+    assert statuses(db)[(3, 4)] == AttendanceStatus.HALF_DAY
+
+    # The same days again, with a later row of the file overriding an earlier one
+    path = write_sheet(tmp_path / "corrected.xlsx", [
+        ["Date", "E1", "E2", "E3"],
+        *[[day, "P", "P", "P"] for day in days],
+        [days[0], "A", "P", "P"],
+    ])
+    progress = []
+    result = process_attendance_upload(
+        upload(db, college, path), db, progress=lambda rows, total: progress.append(rows)
+    )
+    assert result["records_created"] == 0
+    db.expire_all()
+    assert db.query(AttendanceRecord).count() == 9
+    assert statuses(db)[(1, 2)] == AttendanceStatus.ABSENT
+    assert statuses(db)[(3, 4)] == AttendanceStatus.PRESENT
+    # Progress is reported once per written batch (4 + 4 + 4 records)
+    assert len(progress) == 3
+
+
+def test_upload_with_errors_writes_nothing(db, college, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ATTENDANCE_BATCH_SIZE", 2)
+    path = write_sheet(tmp_path / "attendance.xlsx", [
+        ["Date", "E1", "E2"],
+        [date(2026, 3, 2), "P", "P"],
+        [date(2026, 3, 3), "P", "P"],
+        [date(2026, 3, 4), "P", "??"],
+    ])
+    upload_id = upload(db, college, path)
+
+    result = process_attendance_upload(upload_id, db)
+
+    assert not result["success"]
+    assert db.query(AttendanceRecord).count() == 0
+    assert db.get(AttendanceUpload, upload_id).status == UploadStatus.FAILED
+
+
+def test_upload_is_processed_once(db, college, tmp_path):
+    path = write_sheet(tmp_path / "attendance.xlsx", [["Date", "E1"], [date(2026, 3, 2), "P"]])
+    upload_id = upload(db, college, path)
+
+    process_attendance_upload(upload_id, db)
+    with pytest.raises(ValueError):
+        process_attendance_upload(upload_id, db)
@@ -0,0 +1,79 @@
+from datetime import date
+from decimal import Decimal
+import pytest
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.main import app
+from app.models import ComponentType, PayrollArrear, PayrollEntry
+from app.services.payroll_arrears_service import post_salary_arrears
+from app.services.payroll_service import calculate_payroll, lock_payroll_cycle
+from tests.factories import add_structure, make_college, make_component, make_employee, mark_attendance
+
+
+@pytest.fixture
+def paid_march(db):
+    """An employee paid 30000 basic + 6100 DA for March 2025 in a locked cycle."""
+    college = make_college(db)
+    basic = make_component(db, settings.BASIC_COMPONENT_NAME)
+    da = make_component(db, "Dearness Allowance (DA)")
+    employee = make_employee(
+        db, college, "E1", {basic: "30000", da: "6100"}, effective_from=date(2025, 1, 1)
+    )
+    mark_attendance(db, employee, 2025, 3)
+    db.commit()
+
+    cycle = calculate_payroll(college.id, 2025, 3, db)
+    lock_payroll_cycle(cycle.id, db)
+    entry = db.query(PayrollEntry).filter(PayrollEntry.payroll_cycle_id == cycle.id).one()
+    assert entry.net_pay == Decimal("36100.00")
+    return {"employee": employee, "cycle": cycle, "basic": basic, "da": da}
+
+
+def arrears_for(db, cycle):
+    db.expire_all()
+    return [row.amount for row in db.query(PayrollArrear).filter(
+        PayrollArrear.arrears_cycle_id == cycle.id
+    ).all()]
+
+
+def test_mid_month_revision_pays_only_the_revised_days(db, paid_march):
+    employee = paid_march["employee"]
+    revised = [
+        {"component": paid_march["basic"], "amount": "36000"},
+        {"component": paid_march["da"], "amount": "6100"},
+    ]
+
+    response = TestClient(app).put(
+        f"/api/v1/employees/{employee.id}/salary-structure",
+        json={"structures": [
+            {
+                "employee_id": employee.id,
+                "salary_component_id": structure["component"].id,
+                "amount": structure["amount"],
+                "effective_from": "2025-03-16",
+            }
+            for structure in revised
+        ]}
+    )
+    assert response.status_code == 200
+
+    # Basic was 30000 for 15 days and 36000 for 16 days of March:
+    # 33096.77 + 6100 - 36100 paid
+    assert arrears_for(db, paid_march["cycle"]) == [Decimal("3096.77")]
+
+
+def test_reposting_replaces_the_open_cycle_arrears(db, paid_march):
+    employee = paid_march["employee"]
+    for structure in employee.salary_structures:
+        structure.effective_to = date(2025, 2, 28)
+    add_structure(db, employee, paid_march["basic"], "36000", date(2025, 3, 1))
+    add_structure(db, employee, paid_march["da"], "6100", date(2025, 3, 1))
+    db.commit()
+
+    for _ in range(2):
+        summary = post_salary_arrears(
+            date(2025, 3, 1), db, employee_ids=[employee.id], as_of=date(2025, 5, 10)
+        )
+
+    assert summary["total_arrears"] == Decimal("6000.00")
+    assert arrears_for(db, paid_march["cycle"]) == [Decimal("6000.00")]
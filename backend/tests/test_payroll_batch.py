@@ -0,0 +1,139 @@
+from decimal import Decimal
+import numpy as np
+from app.models import ComponentType
+from app.services.payroll_batch import (
+    batch_entry_values,
+    build_payroll_batch,
+    compute_payroll_batch,
+    from_units,
+    prorate,
+    to_units,
+)
+
+
+def balance(paid_total="12", paid_used="0", comp_earned="0", comp_used="0", carry_forward="0"):
+    return {
+        "paid_leaves_total": Decimal(paid_total),
+        "paid_leaves_used": Decimal(paid_used),
+        "comp_leaves_earned": Decimal(comp_earned),
+        "comp_leaves_used": Decimal(comp_used),
+        "carry_forward_leaves": Decimal(carry_forward),
+    }
+
+
+def components(*amounts):
+    """Component rows from (amount, component_type) pairs."""
+    return [
+        {"component_id": position, "component_type": component_type, "amount": Decimal(amount)}
+        for position, (amount, component_type) in enumerate(amounts, start=1)
+    ]
+
+
+def compute_one(working_days, present, leave_balance, employee_components, weekend_work=0, arrears=None):
+    batch = build_payroll_batch(
+        [1],
+        working_days,
+        {1: {"days_present": to_units(present), "weekend_work": to_units(weekend_work)}},
+        {1: leave_balance},
+        {1: employee_components},
+        {1: Decimal(arrears)} if arrears else None
+    )
+    return batch_entry_values(compute_payroll_batch(batch), 0)
+
+
+def test_units_round_trip():
+    assert to_units(Decimal("12345.67")) == 1234567
+    assert to_units(Decimal("0.5")) == 50
+    assert from_units(1234567) == Decimal("12345.67")
+
+
+def test_prorate_rounds_half_up_once():
+    # 1000.00 over 3 of 22 days is 136.3636..., 100.00 over 1 of 8 is 12.50
+    assert prorate(100000, 300, 2200) == 13636
+    assert prorate(10000, 100, 800) == 1250
+    # Exactly half a paisa rounds up: 0.01 over 1 of 2 days
+    assert prorate(1, 100, 200) == 1
+    # A period without working days prorates to zero
+    assert prorate(100000, 300, 0) == 0
+
+
+def test_prorate_is_elementwise():
+    result = prorate(np.array([100000, 220000]), np.array([300, 1100]), np.array([2200, 2200]))
+    assert result.tolist() == [13636, 110000]
+
+
+def test_full_attendance_pays_gross_less_deductions():
+    values = compute_one(
+        22, 22, balance(),
+        components(("30000", ComponentType.EARNING), ("1800", ComponentType.DEDUCTION))
+    )
+    assert values["days_absent"] == Decimal("0.00")
+    assert values["lop_days"] == Decimal("0.00")
+    assert values["gross_earnings"] == Decimal("30000.00")
+    assert values["total_deductions"] == Decimal("1800.00")
+    assert values["net_pay"] == Decimal("28200.00")
+
+
+def test_waterfall_uses_paid_then_comp_then_lop():
+    # Present 16 of 22 working days plus 1 weekend day, so 5 days absent:
+    # 2 paid leaves left, 1 comp leave banked plus the weekend day's, 1 LOP
+    values = compute_one(
+        22, Decimal("16") + 1, balance(paid_used="10", comp_earned="1"),
+        components(("22000", ComponentType.EARNING)),
+        weekend_work=1
+    )
+    assert values["days_absent"] == Decimal("5.00")
+    assert values["paid_leaves_used"] == Decimal("2.00")
+    assert values["comp_leaves_used"] == Decimal("2.00")
+    assert values["lop_days"] == Decimal("1.00")
+    assert values["loss_of_pay"] == Decimal("1000.00")
+    assert values["net_pay"] == Decimal("21000.00")
+
+
+def test_half_days_and_carry_forward_count_towards_paid_leave():
+    values = compute_one(
+        20, Decimal("18.5"), balance(paid_total="1", carry_forward="0.5"),
+        components(("20000", ComponentType.EARNING))
+    )
+    assert values["days_absent"] == Decimal("1.50")
+    assert values["paid_leaves_used"] == Decimal("1.50")
+    assert values["lop_days"] == Decimal("0.00")
+
+
+def test_loss_of_pay_is_gross_prorated_half_up():
+    values = compute_one(
+        22, 19, balance(paid_total="0"),
+        components(("1000", ComponentType.EARNING), ("100", ComponentType.DEDUCTION))
+    )
+    assert values["lop_days"] == Decimal("3.00")
+    assert values["loss_of_pay"] == Decimal("136.36")
+    assert values["total_deductions"] == Decimal("236.36")
+    assert values["net_pay"] == Decimal("763.64")
+
+
+def test_arrears_are_paid_on_top_of_net():
+    values = compute_one(
+        22, 22, balance(), components(("30000", ComponentType.EARNING)), arrears="3096.77"
+    )
+    assert values["arrears"] == Decimal("3096.77")
+    assert values["net_pay"] == Decimal("33096.77")
+
+
+def test_batch_rows_are_independent():
+    batch = build_payroll_batch(
+        [1, 2],
+        [22, 20],
+        {
+            1: {"days_present": to_units(22), "weekend_work": 0},
+            2: {"days_present": to_units(10), "weekend_work": 0},
+        },
+        {1: balance(), 2: balance(paid_total="0")},
+        {
+            1: components(("22000", ComponentType.EARNING)),
+            2: components(("20000", ComponentType.EARNING)),
+        }
+    )
+    result = compute_payroll_batch(batch)
+    assert batch_entry_values(result, 0)["net_pay"] == Decimal("22000.00")
+    assert batch_entry_values(result, 1)["lop_days"] == Decimal("10.00")
+    assert batch_entry_values(result, 1)["net_pay"] == Decimal("10000.00")
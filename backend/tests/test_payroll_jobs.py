@@ -0,0 +1,104 @@
+import pytest
+from app.models import PayrollCycle, PayrollCycleStatus, PayrollJob, PayrollJobStatus
+from app.services import payroll_job_service
+from app.services.payroll_job_service import fail_interrupted_jobs
+from app.services.payroll_locks import PayrollRunInProgressError, payroll_run_lock
+from app.services.payroll_service import calculate_payroll
+from tests.factories import make_college
+
+
+class RecordingExecutor:
+    """Stands in for a worker pool; keeps submitted jobs instead of running them."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+
+
+@pytest.fixture
+def college(db):
+    college = make_college(db)
+    db.commit()
+    return college
+
+
+def queue(db, college, month, executor, month_to=None):
+    return payroll_job_service._queue_payroll_job(
+        executor, college.id, 2026, month, db, None, False, month_to
+    )
+
+
+def test_run_lock_refuses_overlapping_cycles_only(db, college):
+    with payroll_run_lock(college.id, 2026, [3, 4], db):
+        with pytest.raises(PayrollRunInProgressError):
+            with payroll_run_lock(college.id, 2026, [4], db):
+                pass
+        with pytest.raises(PayrollRunInProgressError):
+            calculate_payroll(college.id, 2026, 3, db)
+
+        # Other months and other colleges are not held
+        with payroll_run_lock(college.id, 2026, [5], db):
+            pass
+        with payroll_run_lock(college.id + 1, 2026, [3], db):
+            pass
+
+    with payroll_run_lock(college.id, 2026, [3, 4], db):
+        pass
+
+
+def test_repeated_submission_is_refused_until_the_job_finishes(db, college):
+    executor = RecordingExecutor()
+    job = queue(db, college, 3, executor, month_to=4)
+    assert job.status == PayrollJobStatus.PENDING
+
+    try:
+        with pytest.raises(PayrollRunInProgressError):
+            queue(db, college, 4, executor)
+        assert db.query(PayrollJob).count() == 1
+        assert len(executor.submitted) == 1
+    finally:
+        job_id, employee_ids, force, cycle_keys = executor.submitted[0]
+        payroll_job_service._release_cycles(cycle_keys)
+
+    queue(db, college, 4, executor)
+    payroll_job_service._release_cycles(executor.submitted[1][3])
+    assert db.query(PayrollJob).count() == 2
+
+
+def test_locked_cycle_is_refused_before_queueing(db, college):
+    db.add(PayrollCycle(
+        college_id=college.id, year=2026, month=3,
+        total_working_days=22, status=PayrollCycleStatus.LOCKED
+    ))
+    db.commit()
+    executor = RecordingExecutor()
+
+    with pytest.raises(ValueError):
+        queue(db, college, 3, executor)
+    assert executor.submitted == []
+    # The refused job reserved nothing
+    assert not payroll_job_service._active_cycles
+
+
+def test_interrupted_jobs_are_failed_and_never_started(db, college):
+    job = PayrollJob(
+        college_id=college.id, year=2026, month=3, status=PayrollJobStatus.RUNNING,
+        phase="CALCULATING", employees_processed=0, employees_total=0
+    )
+    queued = PayrollJob(
+        college_id=college.id, year=2026, month=4, status=PayrollJobStatus.PENDING,
+        phase="QUEUED", employees_processed=0, employees_total=0
+    )
+    db.add_all([job, queued])
+    db.commit()
+
+    assert fail_interrupted_jobs() == 2
+
+    # A worker picking up the failed job afterwards leaves it alone
+    payroll_job_service._run_payroll_job(queued.id, None, False, {(college.id, 2026, 4)})
+    db.expire_all()
+    assert job.status == PayrollJobStatus.FAILED
+    assert queued.status == PayrollJobStatus.FAILED
+    assert queued.started_at is None
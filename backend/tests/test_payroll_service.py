@@ -0,0 +1,159 @@
+from datetime import date
+from decimal import Decimal
+import pytest
+from app.config import settings
+from app.models import (
+    AttendanceRecord,
+    AttendanceStatus,
+    ComponentType,
+    EmployeeLeaveBalance,
+    PayrollCycleStatus,
+    PayrollEntry,
+    PayrollRun,
+)
+from app.services import payroll_service
+from app.services.payroll_service import calculate_payroll, calculate_payroll_range
+from tests.factories import make_college, make_component, make_employee, mark_attendance
+
+
+@pytest.fixture
+def college(db):
+    college = make_college(db)
+    basic = make_component(db, settings.BASIC_COMPONENT_NAME)
+    tax = make_component(db, "Professional Tax", ComponentType.DEDUCTION)
+    for position in range(5):
+        employee = make_employee(
+            db, college, f"E{position}", {basic: f"{22000 + position * 1100}", tax: "200"}
+        )
+        for month in (1, 2, 3):
+            mark_attendance(db, employee, 2026, month, absent=position)
+    db.commit()
+    return college
+
+
+def entries(db, month=None):
+    """employee_id -> PayrollEntry, of one month or every month (keyed by (month, employee_id))."""
+    db.expire_all()
+    rows = db.query(PayrollEntry).all()
+    if month is None:
+        return {(entry.payroll_cycle.month, entry.employee_id): entry for entry in rows}
+    return {entry.employee_id: entry for entry in rows if entry.payroll_cycle.month == month}
+
+
+def last_run(db):
+    return db.query(PayrollRun).order_by(PayrollRun.id.desc()).first()
+
+
+def test_calculates_every_active_employee(db, college):
+    cycle = calculate_payroll(college.id, 2026, 3, db)
+
+    assert cycle.status == PayrollCycleStatus.COMPLETED
+    assert cycle.total_working_days == 22
+    march = entries(db, 3)
+    assert len(march) == 5
+    first, last = sorted(march.values(), key=lambda entry: entry.employee_id)[::4]
+    assert first.net_pay == Decimal("21800.00")
+    assert last.paid_leaves_used == Decimal("4.00")
+    assert last.net_pay == Decimal("26200.00")
+    assert all(entry.input_fingerprint and entry.output_fingerprint for entry in march.values())
+
+
+def test_rerun_skips_employees_whose_inputs_are_unchanged(db, college):
+    calculate_payroll(college.id, 2026, 3, db)
+    before = {employee_id: entry.output_fingerprint for employee_id, entry in entries(db, 3).items()}
+
+    calculate_payroll(college.id, 2026, 3, db)
+    run = last_run(db)
+    assert (run.entries_new, run.entries_updated, run.entries_unchanged) == (0, 0, 5)
+
+    # One absence more for one employee recalculates only that employee
+    employee_id = min(before)
+    record = db.query(AttendanceRecord).filter(
+        AttendanceRecord.employee_id == employee_id,
+        AttendanceRecord.date >= date(2026, 3, 1),
+        AttendanceRecord.status == AttendanceStatus.PRESENT
+    ).first()
+    record.status = AttendanceStatus.ABSENT
+    db.commit()
+
+    calculate_payroll(college.id, 2026, 3, db)
+    run = last_run(db)
+    assert (run.entries_new, run.entries_updated, run.entries_unchanged) == (0, 1, 4)
+    after = {employee_id: entry.output_fingerprint for employee_id, entry in entries(db, 3).items()}
+    assert [key for key in before if before[key] != after[key]] == [employee_id]
+
+
+def test_force_rebuilds_every_entry(db, college):
+    calculate_payroll(college.id, 2026, 3, db)
+    before = {employee_id: entry.net_pay for employee_id, entry in entries(db, 3).items()}
+
+    calculate_payroll(college.id, 2026, 3, db, force=True)
+    run = last_run(db)
+    assert (run.entries_new, run.entries_unchanged) == (5, 0)
+    assert {employee_id: entry.net_pay for employee_id, entry in entries(db, 3).items()} == before
+
+
+def test_range_carries_leave_forward_month_to_month(db, college):
+    calculate_payroll_range(college.id, 2026, 1, 3, db)
+    by_range = {
+        key: (entry.paid_leaves_used, entry.lop_days, entry.net_pay)
+        for key, entry in entries(db).items()
+    }
+
+    # The employee absent 4 days a month has 12 paid leaves: 4 + 4 + 4
+    employee_id = max(employee_id for _, employee_id in by_range)
+    assert [by_range[(month, employee_id)][:2] for month in (1, 2, 3)] == [
+        (Decimal("4.00"), Decimal("0.00"))
+    ] * 3
+    balance = db.query(EmployeeLeaveBalance).filter(
+        EmployeeLeaveBalance.employee_id == employee_id,
+        EmployeeLeaveBalance.year == 2026
+    ).one()
+    assert balance.paid_leaves_used == Decimal("12.00")
+
+    # A fourth month would be loss of pay; each month calculated on its
+    # own reaches the same entries as the range
+    calculate_payroll_range(college.id, 2026, 1, 3, db, force=True)
+    for month in (1, 2, 3):
+        calculate_payroll(college.id, 2026, month, db, force=True)
+    assert {
+        key: (entry.paid_leaves_used, entry.lop_days, entry.net_pay)
+        for key, entry in entries(db).items()
+    } == by_range
+
+
+def test_interrupted_run_resumes_after_its_checkpoint(db, college, monkeypatch):
+    write_cycle_ledger = payroll_service.write_cycle_ledger
+    calls = []
+
+    def fail_second_chunk(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("connection lost")
+        return write_cycle_ledger(*args, **kwargs)
+
+    monkeypatch.setattr(payroll_service, "write_cycle_ledger", fail_second_chunk)
+    with pytest.raises(RuntimeError):
+        calculate_payroll(college.id, 2026, 3, db, chunk_size=2)
+
+    # The first chunk is committed and checkpointed; the rest rolled back
+    db.expire_all()
+    march = entries(db, 3)
+    cycle = next(iter(march.values())).payroll_cycle
+    assert cycle.status == PayrollCycleStatus.DRAFT
+    assert cycle.checkpoint_employee_id == max(march)
+    assert (cycle.chunks_completed, cycle.chunks_total) == (1, 3)
+    assert len(march) == 2
+    # The failed run's stats count only what it committed
+    run = last_run(db)
+    assert run.status == "FAILED"
+    assert (run.employees, run.chunks, run.entries_new) == (2, 1, 2)
+
+    monkeypatch.setattr(payroll_service, "write_cycle_ledger", write_cycle_ledger)
+    cycle = calculate_payroll(college.id, 2026, 3, db, chunk_size=2)
+
+    assert cycle.status == PayrollCycleStatus.COMPLETED
+    assert cycle.checkpoint_employee_id is None
+    run = last_run(db)
+    assert (run.employees, run.chunks, run.entries_new) == (3, 2, 3)
+    assert len(entries(db, 3)) == 5
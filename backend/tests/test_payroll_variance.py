@@ -0,0 +1,65 @@
+from datetime import date
+from decimal import Decimal
+import pytest
+from app.config import settings
+from app.services.payroll_service import calculate_payroll
+from app.services.payroll_variance_service import compute_payroll_variance
+from tests.factories import add_structure, make_college, make_component, make_employee, mark_attendance
+
+
+@pytest.fixture
+def march(db):
+    """March and February cycles of three employees; returns (March cycle ID, employees)."""
+    college = make_college(db)
+    basic = make_component(db, settings.BASIC_COMPONENT_NAME)
+    da = make_component(db, "Dearness Allowance (DA)")
+
+    # Pay moved from DA to basic in March, totals unchanged
+    shifted = make_employee(db, college, "E1")
+    add_structure(db, shifted, basic, "30000", date(2025, 1, 1), date(2026, 2, 28))
+    add_structure(db, shifted, da, "6000", date(2025, 1, 1), date(2026, 2, 28))
+    add_structure(db, shifted, basic, "31000", date(2026, 3, 1))
+    add_structure(db, shifted, da, "5000", date(2026, 3, 1))
+
+    unchanged = make_employee(db, college, "E2", {basic: "25000", da: "5000"})
+    on_leave = make_employee(db, college, "E3", {basic: "22000"})
+
+    for employee in (shifted, unchanged, on_leave):
+        mark_attendance(db, employee, 2026, 2)
+        mark_attendance(db, employee, 2026, 3, absent=14 if employee is on_leave else 0)
+    db.commit()
+
+    calculate_payroll(college.id, 2026, 2, db)
+    cycle = calculate_payroll(college.id, 2026, 3, db)
+    return cycle.id, {"shifted": shifted.id, "unchanged": unchanged.id, "on_leave": on_leave.id}
+
+
+def test_component_only_changes_are_reported(db, march):
+    cycle_id, employees = march
+
+    variance = compute_payroll_variance(cycle_id, db, sort="employee_code", descending=False)
+
+    entries = {entry["employee_id"]: entry for entry in variance["entries"]}
+    assert variance["total"] == 2
+    assert set(entries) == {employees["shifted"], employees["on_leave"]}
+
+    shifted = entries[employees["shifted"]]
+    assert shifted["status"] == "CHANGED"
+    assert shifted["changes"]["net_pay"]["change"] == 0
+    assert [component["change"] for component in shifted["components"]] == [
+        Decimal("1000.00"), Decimal("-1000.00")
+    ]
+    assert entries[employees["on_leave"]]["changes"]["lop_days"]["change"] == Decimal("2.00")
+
+
+def test_include_unchanged_returns_everyone(db, march):
+    cycle_id, employees = march
+
+    variance = compute_payroll_variance(cycle_id, db, include_unchanged=True)
+
+    statuses = {entry["employee_id"]: entry["status"] for entry in variance["entries"]}
+    assert statuses == {
+        employees["shifted"]: "CHANGED",
+        employees["unchanged"]: "UNCHANGED",
+        employees["on_leave"]: "CHANGED",
+    }
@@ -0,0 +1,106 @@
+from decimal import Decimal
+import pytest
+from app.config import settings
+from app.models import AppliesTo, ComponentType, PayrollEntry, StaffType
+from app.services.payroll_service import calculate_payroll
+from app.services.salary_component_plan import compile_component_plan, evaluate_component_plan
+from tests.factories import make_college, make_component, make_employee, mark_attendance
+
+
+@pytest.fixture
+def components(db):
+    return {
+        "basic": make_component(db, settings.BASIC_COMPONENT_NAME),
+        "da": make_component(db, "Dearness Allowance (DA)"),
+        "tax": make_component(db, "Professional Tax", ComponentType.DEDUCTION),
+        "pf": make_component(
+            db, "Provident Fund (PF)", ComponentType.DEDUCTION,
+            is_percentage=True, percentage_value=Decimal("12"), percentage_of="BASIC"
+        ),
+        "esi": make_component(
+            db, "ESI (Employee State Insurance)", ComponentType.DEDUCTION,
+            is_percentage=True, percentage_value=Decimal("0.75"), percentage_of="GROSS",
+            is_default=True
+        ),
+        "hra": make_component(
+            db, "House Rent Allowance (HRA)", is_percentage=True,
+            percentage_value=Decimal("10"), percentage_of="BASIC",
+            applies_to=AppliesTo.NON_TEACHING, is_default=True
+        ),
+    }
+
+
+def structure_rows(*pairs):
+    return [
+        {"component_id": component.id, "component_type": component.component_type, "amount": Decimal(amount)}
+        for component, amount in pairs
+    ]
+
+
+def evaluate(db, employees, structures):
+    return {
+        employee_id: {row["component_id"]: row["amount"] for row in rows}
+        for employee_id, rows in evaluate_component_plan(
+            compile_component_plan(db), employees, structures
+        ).items()
+    }
+
+
+def test_percentage_components_follow_the_structure(db, components):
+    college = make_college(db)
+    with_pf = make_employee(db, college, "E1")
+    without_pf = make_employee(db, college, "E2")
+    no_structure = make_employee(db, college, "E3", actual_basic=Decimal("30000"))
+
+    result = evaluate(db, [with_pf, without_pf, no_structure], {
+        with_pf.id: structure_rows((components["basic"], "30000"), (components["pf"], "0")),
+        without_pf.id: structure_rows((components["basic"], "30000"), (components["da"], "6000")),
+    })
+
+    # PF only where the structure includes it; ESI is default so everyone
+    # with a structure gets it; HRA is default but for non-teaching staff only
+    assert result[with_pf.id] == {
+        components["basic"].id: Decimal("30000.00"),
+        components["pf"].id: Decimal("3600.00"),
+        components["esi"].id: Decimal("225.00"),
+    }
+    assert result[without_pf.id] == {
+        components["basic"].id: Decimal("30000.00"),
+        components["da"].id: Decimal("6000.00"),
+        components["esi"].id: Decimal("270.00"),
+    }
+    # No structure, no components, whatever actual_basic says
+    assert no_structure.id not in result
+
+
+def test_zero_base_emits_no_row(db, components):
+    college = make_college(db)
+    deductions_only = make_employee(db, college, "E1")
+    non_teaching = make_employee(db, college, "E2", staff_type=StaffType.NON_TEACHING)
+
+    result = evaluate(db, [deductions_only, non_teaching], {
+        deductions_only.id: structure_rows((components["tax"], "200"), (components["pf"], "0")),
+        non_teaching.id: structure_rows((components["basic"], "20000")),
+    })
+
+    # No earnings: ESI has a zero base; PF falls back to an empty actual_basic
+    assert result[deductions_only.id] == {components["tax"].id: Decimal("200.00")}
+    assert result[non_teaching.id] == {
+        components["basic"].id: Decimal("20000.00"),
+        components["hra"].id: Decimal("2000.00"),
+        components["esi"].id: Decimal("165.00"),
+    }
+
+
+def test_employee_without_structure_is_not_paid_negative(db, components):
+    college = make_college(db)
+    employee = make_employee(db, college, "E1", actual_basic=Decimal("30000"))
+    mark_attendance(db, employee, 2026, 3)
+    db.commit()
+
+    calculate_payroll(college.id, 2026, 3, db)
+
+    entry = db.query(PayrollEntry).filter(PayrollEntry.employee_id == employee.id).one()
+    assert entry.total_deductions == Decimal("0.00")
+    assert entry.net_pay == Decimal("0.00")
+    assert entry.components == []
@@ -0,0 +1,76 @@
+from collections import namedtuple
+from datetime import date
+from decimal import Decimal
+from app.models import ComponentType
+from app.services.salary_structure_index import SalaryStructureIndex
+
+Structure = namedtuple(
+    "Structure",
+    "id employee_id component_id component_type amount effective_from effective_to"
+)
+
+BASIC = 1
+DA = 2
+PF = 3
+
+
+def structure(structure_id, component_id, amount, effective_from, effective_to=None, employee_id=1):
+    component_type = ComponentType.DEDUCTION if component_id == PF else ComponentType.EARNING
+    return Structure(
+        structure_id, employee_id, component_id, component_type,
+        Decimal(amount), effective_from, effective_to
+    )
+
+
+def amounts(index, start_date, end_date, employee_id=1):
+    return {
+        row["component_id"]: row["amount"]
+        for row in index.components_during(employee_id, start_date, end_date)
+    }
+
+
+MARCH = (date(2026, 3, 1), date(2026, 3, 31))
+
+index = SalaryStructureIndex([
+    structure(1, BASIC, "30000", date(2025, 1, 1), date(2026, 3, 15)),
+    structure(2, DA, "6000", date(2025, 1, 1)),
+    structure(3, BASIC, "36000", date(2026, 3, 16)),
+    structure(4, PF, "1800", date(2026, 3, 20)),
+    structure(5, BASIC, "25000", date(2026, 1, 1), employee_id=2),
+])
+
+
+def test_structures_carry_their_days_in_force():
+    found = [(row.id, days) for row, days in index.structures_during(1, *MARCH)]
+    assert found == [(1, 15), (2, 31), (3, 16), (4, 12)]
+
+
+def test_revised_component_appears_once_weighted_by_days():
+    # 30000 x 15 days + 36000 x 16 days over 31 days
+    assert amounts(index, *MARCH) == {
+        BASIC: Decimal("33096.77"),
+        DA: Decimal("6000"),
+        PF: Decimal("1800"),
+    }
+
+
+def test_periods_on_either_side_of_a_revision_get_one_version():
+    assert amounts(index, date(2026, 2, 1), date(2026, 2, 28)) == {
+        BASIC: Decimal("30000"),
+        DA: Decimal("6000"),
+    }
+    assert amounts(index, date(2026, 4, 1), date(2026, 4, 30))[BASIC] == Decimal("36000")
+
+
+def test_weighting_rounds_half_up_to_the_paisa():
+    half = SalaryStructureIndex([
+        structure(1, BASIC, "0.01", date(2026, 3, 1), date(2026, 3, 1)),
+        structure(2, BASIC, "0.02", date(2026, 3, 2), date(2026, 3, 2)),
+    ])
+    assert amounts(half, date(2026, 3, 1), date(2026, 3, 2)) == {BASIC: Decimal("0.02")}
+
+
+def test_employees_are_indexed_separately():
+    assert amounts(index, *MARCH, employee_id=2) == {BASIC: Decimal("25000")}
+    assert index.components_during(3, *MARCH) == []
+    assert index.components_during(1, date(2024, 1, 1), date(2024, 1, 31)) == []
@@ -0,0 +1,77 @@
+import os
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.main import app
+from app.models import AttendanceUpload
+from app.utils.uploads import MULTIPART_OVERHEAD, UploadSizeLimitMiddleware
+from tests.factories import make_college
+
+LIMIT = 1024
+
+
+@pytest.fixture(autouse=True)
+def small_limit(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE", LIMIT)
+
+
+@pytest.fixture
+def echo():
+    """A bare app behind the middleware, recording the bodies its route read."""
+    echo_app = FastAPI()
+    echo_app.add_middleware(UploadSizeLimitMiddleware)
+    echo_app.state.bodies = []
+
+    @echo_app.post("/echo")
+    async def read_body(request: Request):
+        body = await request.body()
+        echo_app.state.bodies.append(len(body))
+        return {"size": len(body)}
+
+    return echo_app
+
+
+def chunks(size, chunk_size=4096):
+    while size > 0:
+        yield b"x" * min(size, chunk_size)
+        size -= chunk_size
+
+
+def test_declared_oversized_body_is_refused_unread(echo):
+    response = TestClient(echo).post("/echo", content=b"x" * (LIMIT + MULTIPART_OVERHEAD + 1))
+
+    assert response.status_code == 413
+    assert echo.state.bodies == []
+
+
+def test_chunked_oversized_body_is_cut_off(echo):
+    response = TestClient(echo).post("/echo", content=chunks(LIMIT + MULTIPART_OVERHEAD + 1))
+
+    assert response.status_code == 413
+    assert echo.state.bodies == []
+
+
+def test_body_within_the_limit_passes(echo):
+    client = TestClient(echo)
+
+    assert client.post("/echo", content=b"x" * LIMIT).json() == {"size": LIMIT}
+    assert client.post("/echo", content=chunks(LIMIT)).json() == {"size": LIMIT}
+
+
+def test_attendance_upload_over_the_limit_is_refused(db):
+    college = make_college(db)
+    db.commit()
+    client = TestClient(app)
+    url = f"/api/v1/attendance/upload?college_id={college.id}&year=2026&month=3"
+
+    # Refused by the middleware before the body is read...
+    response = client.post(url, files={"file": ("a.xlsx", b"x" * (LIMIT + MULTIPART_OVERHEAD))})
+    assert response.status_code == 413
+    # ...or by the exact per-file check once it is
+    response = client.post(url, files={"file": ("a.xlsx", b"x" * (LIMIT + 1))})
+    assert response.status_code == 413
+    assert "1024 byte upload limit" in response.json()["detail"]
+
+    assert db.query(AttendanceUpload).count() == 0
+    assert not [name for name in os.listdir(settings.UPLOAD_PATH) if name.endswith(".part")]
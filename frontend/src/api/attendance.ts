@@ -20,6 +20,11 @@ export const attendanceApi = {
     return response.data;
   },
 
+  getUpload: async (uploadId: number) => {
+    const response = await apiClient.get<AttendanceUpload>(`/attendance/uploads/${uploadId}`);
+    return response.data;
+  },
+
   getRecords: async (employeeId?: number, year?: number, month?: number, skip = 0, limit = 100) => {
     const response = await apiClient.get<AttendanceRecord[]>('/attendance/records', {
       params: { employee_id: employeeId, year, month, skip, limit },
@@ -1,5 +1,5 @@
 import apiClient from './client';
-import { PayrollCycle, PayrollEntry } from '../types';
+import { PayrollCycle, PayrollEntry, PayrollJob, PayrollRun, PayrollVariance } from '../types';
 
 export const payrollApi = {
   getCycles: async (collegeId?: number, year?: number, month?: number) => {
@@ -15,7 +15,7 @@ export const payrollApi = {
   },
 
   calculate: async (collegeId: number, year: number, month: number) => {
-    const response = await apiClient.post<PayrollCycle>('/payroll/calculate', {
+    const response = await apiClient.post<PayrollJob>('/payroll/calculate', {
       college_id: collegeId,
       year,
       month,
@@ -23,6 +23,11 @@ export const payrollApi = {
     return response.data;
   },
 
+  getJob: async (jobId: number) => {
+    const response = await apiClient.get<PayrollJob>(`/payroll/jobs/${jobId}`);
+    return response.data;
+  },
+
   getEntries: async (cycleId?: number, employeeId?: number) => {
     const response = await apiClient.get<PayrollEntry[]>('/payroll/entries', {
       params: { payroll_cycle_id: cycleId, employee_id: employeeId },
@@ -30,6 +35,29 @@ export const payrollApi = {
     return response.data;
   },
 
+  getVariance: async (
+    cycleId: number,
+    params?: {
+      baseline_cycle_id?: number;
+      min_change?: number;
+      min_percent_change?: number;
+      sort?: string;
+      descending?: boolean;
+    }
+  ) => {
+    const response = await apiClient.get<PayrollVariance>(`/payroll/cycles/${cycleId}/variance`, {
+      params,
+    });
+    return response.data;
+  },
+
+  getCycleStats: async (cycleId: number, limit?: number) => {
+    const response = await apiClient.get<PayrollRun[]>(`/payroll/cycles/${cycleId}/stats`, {
+      params: { limit },
+    });
+    return response.data;
+  },
+
   lockCycle: async (cycleId: number) => {
     const response = await apiClient.post<PayrollCycle>(`/payroll/cycles/${cycleId}/lock`);
     return response.data;
@@ -58,6 +58,14 @@ const AttendanceUploadPage: React.FC = () => {
     fetchUploads();
   }, []);
 
+  // Uploads are processed in the background; refresh while any is unfinished
+  const processing = uploads.some(u => u.status === 'PENDING' || u.status === 'PROCESSING');
+  useEffect(() => {
+    if (!processing) return;
+    const timer = setInterval(fetchUploads, 2000);
+    return () => clearInterval(timer);
+  }, [processing]);
+
   const handleFileChange = (event: React.ChangeEvent<HTMLInputElement>) => {
     if (event.target.files && event.target.files[0]) {
       setFile(event.target.files[0]);
@@ -73,7 +81,7 @@ const AttendanceUploadPage: React.FC = () => {
     try {
       setUploading(true);
       await attendanceApi.upload(file, selectedCollege, month, year);
-      showSuccess('Attendance uploaded successfully');
+      showSuccess('Attendance uploaded; it is being processed');
       setFile(null);
       fetchUploads();
     } catch (error) {
@@ -94,6 +102,15 @@ const AttendanceUploadPage: React.FC = () => {
       valueFormatter: (params) => `${params.value}/${uploads.find(u => u.id === params.id)?.year}`,
     },
     { field: 'records_count', headerName: 'Records', width: 100 },
+    {
+      field: 'rows_processed',
+      headerName: 'Rows',
+      width: 120,
+      valueGetter: (params) =>
+        params.row.rows_total
+          ? `${params.row.rows_processed}/${params.row.rows_total}`
+          : params.row.rows_processed,
+    },
     {
       field: 'status',
       headerName: 'Status',
@@ -73,7 +73,7 @@ const PayrollDashboard: React.FC = () => {
     try {
       setCalculating(true);
       await payrollApi.calculate(selectedCollege, month, year);
-      showSuccess('Payroll calculated successfully');
+      showSuccess('Payroll calculation started');
       setDialogOpen(false);
       fetchCycles();
     } catch (error) {
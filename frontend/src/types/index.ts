@@ -204,10 +204,16 @@ export interface AttendanceUpload {
   month: number;
   file_name: string;
   file_path: string;
+  file_size?: number;
+  content_hash?: string;
   uploaded_at: string;
   status: 'PENDING' | 'PROCESSING' | 'COMPLETED' | 'FAILED';
   error_message?: string;
   records_count: number;
+  rows_processed: number;
+  rows_total?: number;
+  started_at?: string;
+  finished_at?: string;
 }
 
 export interface AttendanceRecord {
@@ -261,9 +267,90 @@ export interface PayrollCycle {
   created_at: string;
   updated_at: string;
   locked_at?: string;
+  checkpoint_employee_id?: number;
+  chunks_completed: number;
+  chunks_total: number;
   college_name?: string;
 }
 
+export type PayrollJobStatus = 'PENDING' | 'RUNNING' | 'COMPLETED' | 'FAILED';
+
+export interface PayrollJob {
+  id: number;
+  college_id: number;
+  year: number;
+  month: number;
+  month_to?: number;
+  payroll_cycle_id?: number;
+  status: PayrollJobStatus;
+  phase: string;
+  employees_processed: number;
+  employees_total: number;
+  error_message?: string;
+  created_at: string;
+  started_at?: string;
+  finished_at?: string;
+  elapsed_seconds?: number;
+}
+
+export type PayrollVarianceStatus = 'NEW' | 'REMOVED' | 'CHANGED' | 'UNCHANGED';
+
+export interface PayrollVarianceAmount {
+  baseline?: number;
+  current?: number;
+  change: number;
+}
+
+export interface PayrollVarianceComponent extends PayrollVarianceAmount {
+  salary_component_id: number;
+  component_name: string;
+  component_type: ComponentType;
+}
+
+export interface PayrollVarianceEntry {
+  employee_id: number;
+  employee_code?: string;
+  employee_name: string;
+  status: PayrollVarianceStatus;
+  net_pay_percent_change?: number;
+  changes: Record<string, PayrollVarianceAmount>;
+  components: PayrollVarianceComponent[];
+}
+
+export interface PayrollVariance {
+  payroll_cycle_id: number;
+  baseline_cycle_id: number;
+  total: number;
+  entries: PayrollVarianceEntry[];
+}
+
+export interface PayrollRunStage {
+  stage: string;
+  seconds: number;
+  statements: number;
+  rows: number;
+}
+
+export interface PayrollRun {
+  id: number;
+  college_id: number;
+  year: number;
+  month_from: number;
+  month_to: number;
+  status: 'COMPLETED' | 'FAILED';
+  employees: number;
+  chunks: number;
+  entries_new: number;
+  entries_updated: number;
+  entries_unchanged: number;
+  statements: number;
+  seconds: number;
+  error_message?: string;
+  started_at: string;
+  finished_at: string;
+  stages: PayrollRunStage[];
+}
+
 export interface PayrollEntry {
   id: number;
   payroll_cycle_id: number;
@@ -274,6 +361,7 @@ export interface PayrollEntry {
   comp_leaves_used: number;
   unpaid_leaves: number;
   loss_of_pay: number;
+  arrears: number;
   gross_earnings: number;
   total_deductions: number;
   net_pay: number;